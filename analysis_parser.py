@@ -0,0 +1,134 @@
+import argparse
+import re
+import sqlite3
+import time
+from typing import Dict, Any, List
+from config import CONFIG
+from keyword_matcher import get_matcher
+
+_FACT_PATTERN = re.compile(r'(claim|fact|statement)\s*(\d+)?\s*?:.*?(verified|disputed|false|true|unverifiable)', re.I)
+_URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]*')
+
+
+def parse_perplexity_analysis(analysis: str) -> Dict[str, Any]:
+    """Parse sources, credibility, metadata assessment and fact verification from a Perplexity analysis in one pass"""
+    credibility_matcher = get_matcher("credibility_keywords")
+    sources = []
+    seen_sources = set()
+    assessment_lines = []
+    facts = []
+    metadata_assessment = {
+        'domain_credibility': 'Not assessed',
+        'author_credibility': 'Not assessed',
+        'date_relevance': 'Not assessed'
+    }
+    # Metadata fields take the matching line joined with the line after it
+    pending_field = None
+    pending_line = ''
+
+    def add_source(source: str):
+        if source not in seen_sources:
+            seen_sources.add(source)
+            sources.append(source)
+
+    for line in analysis.split('\n'):
+        lower = line.lower()
+
+        if pending_field:
+            metadata_assessment[pending_field] = f"{pending_line} {lower}".strip()
+            pending_field = None
+
+        for url in _URL_PATTERN.findall(line):
+            add_source(url)
+        if 'source:' in lower or 'reference:' in lower:
+            add_source(line.strip())
+
+        if credibility_matcher.contains_any(line):
+            assessment_lines.append(line.strip())
+
+        match = _FACT_PATTERN.search(line)
+        if match:
+            status = 'Verified' if match.group(3).lower() in ['verified', 'true'] else 'Disputed'
+            facts.append({'claim': line.strip(), 'status': status})
+
+        if 'domain' in lower and ('credib' in lower or 'reliab' in lower):
+            pending_field = 'domain_credibility'
+        elif 'author' in lower and ('credib' in lower or 'expert' in lower):
+            pending_field = 'author_credibility'
+        elif 'date' in lower or 'publication' in lower:
+            pending_field = 'date_relevance'
+        if pending_field:
+            pending_line = lower
+            metadata_assessment[pending_field] = lower.strip()
+
+    return {
+        'sources': sources,
+        'credibility_assessment': ' '.join(assessment_lines) or "Assessment not clearly stated",
+        'metadata_assessment': metadata_assessment,
+        'fact_verification': facts
+    }
+
+
+def check_parity(analysis: str, content_analyzer) -> List[str]:
+    """Compare the single-pass parser against the per-field extractors; returns the mismatching fields"""
+    parsed = parse_perplexity_analysis(analysis)
+    reference = {
+        'sources': content_analyzer._extract_sources_from_analysis(analysis),
+        'credibility_assessment': content_analyzer._extract_credibility_assessment(analysis),
+        'metadata_assessment': content_analyzer._extract_metadata_assessment(analysis),
+        'fact_verification': content_analyzer._extract_fact_verification(analysis)
+    }
+    mismatches = []
+    for field, expected in reference.items():
+        actual = parsed[field]
+        # The reference returns sources in set order, so compare them as sets
+        if field == 'sources':
+            actual, expected = set(actual), set(expected)
+        if actual != expected:
+            mismatches.append(field)
+    return mismatches
+
+
+def main():
+    from content_analyzer import ContentAnalyzer
+
+    parser = argparse.ArgumentParser(
+        description="Check the single-pass parser against the per-field extractors over stored Perplexity analyses"
+    )
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    rows = conn.execute(
+        "SELECT original_url, full_perplexity_analysis FROM url_verification_cache WHERE full_perplexity_analysis != ''"
+    ).fetchall()
+    conn.close()
+
+    content_analyzer = ContentAnalyzer()
+    failures = 0
+    for url, analysis in rows:
+        mismatches = check_parity(analysis, content_analyzer)
+        if mismatches:
+            failures += 1
+            print(f"MISMATCH {url}: {', '.join(mismatches)}")
+
+    start_time = time.time()
+    for _, analysis in rows:
+        parse_perplexity_analysis(analysis)
+    single_pass_time = time.time() - start_time
+
+    start_time = time.time()
+    for _, analysis in rows:
+        content_analyzer._extract_sources_from_analysis(analysis)
+        content_analyzer._extract_credibility_assessment(analysis)
+        content_analyzer._extract_metadata_assessment(analysis)
+        content_analyzer._extract_fact_verification(analysis)
+    reference_time = time.time() - start_time
+
+    print(f"{len(rows) - failures}/{len(rows)} stored analyses parse identically")
+    print(f"Single pass: {single_pass_time:.3f}s, per-field extractors: {reference_time:.3f}s")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+from config import CONFIG
+
+# Columns copied into the analytics files; the large text columns (extracted text, analysis, facts) stay behind
+STRING_COLUMNS = [
+    'url_hash', 'domain', 'confidence_level', 'extraction_model', 'cache_status', 'first_verified_at', 'last_accessed_at'
+]
+FLOAT_COLUMNS = [
+    'confidence_score', 'source_credibility_score', 'content_consistency_score',
+    'verification_coverage_score', 'processing_time_seconds'
+]
+INT_COLUMNS = ['content_length', 'openai_tokens_used', 'perplexity_calls_made', 'access_count']
+EXPORT_COLUMNS = STRING_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS
+
+MANIFEST = 'manifest.json'
+
+
+def _read_manifest(out_dir: str) -> Dict:
+    try:
+        with open(os.path.join(out_dir, MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'watermark': '', 'parts': []}
+
+
+def _write_manifest(out_dir: str, manifest: Dict):
+    tmp_path = os.path.join(out_dir, f"{MANIFEST}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST))
+
+
+def _to_columns(rows: List[Tuple]) -> Dict[str, np.ndarray]:
+    """Turn fetched rows (EXPORT_COLUMNS order) into typed numpy columns"""
+    columns = {}
+    for i, name in enumerate(EXPORT_COLUMNS):
+        values = [row[i] for row in rows]
+        if name in FLOAT_COLUMNS:
+            columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        elif name in INT_COLUMNS:
+            columns[name] = np.array([v or 0 for v in values], dtype=np.int64)
+        else:
+            columns[name] = np.array([str(v) if v is not None else '' for v in values], dtype=np.str_)
+    return columns
+
+
+def _write_part(out_dir: str, name: str, columns: Dict[str, np.ndarray]):
+    tmp_path = os.path.join(out_dir, f"{name}.tmp.npz")
+    np.savez_compressed(tmp_path, **columns)
+    os.replace(tmp_path, os.path.join(out_dir, name))
+
+
+def load_columns(out_dir: str = CONFIG["analytics_export_dir"]) -> Dict[str, np.ndarray]:
+    """Load every exported part, keeping only the newest copy of each URL"""
+    manifest = _read_manifest(out_dir)
+    parts = []
+    for name in manifest['parts']:
+        with np.load(os.path.join(out_dir, name), allow_pickle=False) as data:
+            parts.append({column: data[column] for column in EXPORT_COLUMNS})
+    if not parts:
+        return _to_columns([])
+
+    columns = {column: np.concatenate([part[column] for part in parts]) for column in EXPORT_COLUMNS}
+    # Parts are appended oldest first, so the last occurrence of a url_hash is its newest row
+    reversed_hashes = columns['url_hash'][::-1]
+    _, first_in_reversed = np.unique(reversed_hashes, return_index=True)
+    keep = np.sort(len(reversed_hashes) - 1 - first_in_reversed)
+    return {column: values[keep] for column, values in columns.items()}
+
+
+def export_columns(conn: sqlite3.Connection, out_dir: str, full: bool = False) -> Tuple[int, int]:
+    """Append rows accessed since the last export as a new part; returns (rows exported, parts on disk)"""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {'watermark': '', 'parts': []} if full else _read_manifest(out_dir)
+
+    cursor = conn.cursor()
+    # >= so rows touched within the watermark's second are not missed; load_columns drops the repeats
+    cursor.execute(
+        f"""
+        SELECT {', '.join(EXPORT_COLUMNS)} FROM url_verification_cache
+        WHERE COALESCE(last_accessed_at, '') >= ?
+        ORDER BY last_accessed_at
+        """,
+        (manifest['watermark'],)
+    )
+    rows = cursor.fetchall()
+    if rows:
+        name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{len(manifest['parts']):05d}.npz"
+        _write_part(out_dir, name, _to_columns(rows))
+        manifest['parts'].append(name)
+        manifest['watermark'] = max(manifest['watermark'], str(rows[-1][EXPORT_COLUMNS.index('last_accessed_at')] or ''))
+
+    if len(manifest['parts']) > CONFIG["analytics_max_parts"]:
+        # Fold the parts into one so readers do not pay for every small increment
+        _write_manifest(out_dir, manifest)
+        compacted = load_columns(out_dir)
+        name = f"part-{time.strftime('%Y%m%d%H%M%S')}-compacted.npz"
+        _write_part(out_dir, name, compacted)
+        manifest['parts'] = [name]
+
+    _write_manifest(out_dir, manifest)
+    for path in glob.glob(os.path.join(out_dir, 'part-*.npz')):
+        if os.path.basename(path) not in manifest['parts']:
+            os.remove(path)
+    return len(rows), len(manifest['parts'])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export url_verification_cache to columnar .npz files for analytics away from the live database"
+    )
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    parser.add_argument("--output", default=CONFIG["analytics_export_dir"])
+    parser.add_argument("--full", action="store_true", help="Re-export every row instead of rows accessed since the last run")
+    args = parser.parse_args()
+
+    # Read-only connection: the export never takes a write lock on the live database
+    conn = sqlite3.connect(f"file:{args.db_path}?mode=ro", uri=True)
+    start_time = time.time()
+    exported, parts = export_columns(conn, args.output, full=args.full)
+    conn.close()
+    print(f"Exported {exported} rows to {args.output} ({parts} parts) in {time.time() - start_time:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
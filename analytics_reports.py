@@ -0,0 +1,90 @@
+import argparse
+import time
+from typing import Dict, List, Any
+import numpy as np
+from analytics_export import load_columns
+from config import CONFIG
+
+
+def domain_score_distribution(columns: Dict[str, np.ndarray], top: int = 20) -> List[Dict[str, Any]]:
+    """Count, mean and p10/p50/p90 confidence per domain, most verified domains first"""
+    domains, inverse = np.unique(columns['domain'], return_inverse=True)
+    scores = columns['confidence_score']
+    counts = np.bincount(inverse, minlength=len(domains))
+    means = np.bincount(inverse, weights=scores, minlength=len(domains)) / np.maximum(counts, 1)
+
+    # Sort by (domain, score) once; each domain is then a contiguous sorted slice
+    order = np.lexsort((scores, inverse))
+    sorted_scores = scores[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    report = []
+    for i in np.argsort(-counts, kind='stable')[:top]:
+        domain_scores = sorted_scores[starts[i]:starts[i] + counts[i]]
+        p10, p50, p90 = np.percentile(domain_scores, [10, 50, 90])
+        report.append({
+            'domain': str(domains[i]), 'count': int(counts[i]), 'mean': float(means[i]),
+            'p10': float(p10), 'p50': float(p50), 'p90': float(p90)
+        })
+    return report
+
+
+def token_spend(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """OpenAI tokens and Perplexity calls per extraction model"""
+    models, inverse = np.unique(columns['extraction_model'], return_inverse=True)
+    tokens = np.bincount(inverse, weights=columns['openai_tokens_used'], minlength=len(models))
+    calls = np.bincount(inverse, weights=columns['perplexity_calls_made'], minlength=len(models))
+    counts = np.bincount(inverse, minlength=len(models))
+    return [
+        {
+            'extraction_model': str(models[i]) or 'unknown', 'verifications': int(counts[i]),
+            'openai_tokens': int(tokens[i]), 'perplexity_calls': int(calls[i]),
+            'tokens_per_verification': float(tokens[i] / counts[i])
+        }
+        for i in np.argsort(-tokens)
+    ]
+
+
+def processing_time_percentiles(columns: Dict[str, np.ndarray]) -> Dict[str, float]:
+    times = columns['processing_time_seconds']
+    times = times[~np.isnan(times)]
+    if not len(times):
+        return {}
+    p50, p90, p95, p99 = np.percentile(times, [50, 90, 95, 99])
+    return {'count': int(len(times)), 'p50': float(p50), 'p90': float(p90), 'p95': float(p95), 'p99': float(p99), 'max': float(times.max())}
+
+
+def confidence_levels(columns: Dict[str, np.ndarray]) -> Dict[str, int]:
+    levels, counts = np.unique(columns['confidence_level'], return_counts=True)
+    return {str(level): int(count) for level, count in zip(levels, counts)}
+
+
+REPORTS = {
+    'domains': domain_score_distribution,
+    'tokens': token_spend,
+    'latency': processing_time_percentiles,
+    'levels': confidence_levels
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Standard reports over the columnar verification history export")
+    parser.add_argument("--input", default=CONFIG["analytics_export_dir"])
+    parser.add_argument("--report", choices=sorted(REPORTS), nargs="*", default=sorted(REPORTS))
+    args = parser.parse_args()
+
+    start_time = time.time()
+    columns = load_columns(args.input)
+    print(f"Loaded {len(columns['url_hash'])} verifications in {time.time() - start_time:.3f}s")
+    if not len(columns['url_hash']):
+        return
+    for name in args.report:
+        start_time = time.time()
+        result = REPORTS[name](columns)
+        print(f"\n== {name} ({time.time() - start_time:.3f}s)")
+        for row in (result if isinstance(result, list) else [result]):
+            print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import os
+import socket
+import time
+from typing import Dict, Any
+from urllib.parse import urlparse
+from url_validator import URLValidator
+from content_scraper import ContentScraper
+from content_analyzer import ContentAnalyzer
+from llm_scheduler import PRIORITY_BATCH
+from database_manager import DatabaseManager
+from storage_backend import create_storage
+from job_queue import JobQueue
+from html_archive import HtmlArchive
+from verification_pipeline import VerificationPipeline
+from verification_result import VerificationResult
+from config import CONFIG
+
+
+class LeaseLostError(Exception):
+    """Raised when another worker took over a job whose lease expired"""
+
+
+class BatchWorker:
+    """Class to run queued verifications, resuming each job at its first incomplete stage"""
+
+    def __init__(self, worker_id: str, db_path: str = CONFIG.get("db_path", "cache.db")):
+        self.worker_id = worker_id
+        self.queue = JobQueue(db_path)
+        self.db_manager = DatabaseManager(db_path)
+        self.storage = create_storage(self.db_manager)
+        self.html_archive = HtmlArchive(self.db_manager.conn)
+        self.url_validator = URLValidator()
+        self.content_scraper = ContentScraper()
+        self.pipeline = VerificationPipeline(self.db_manager, self.storage, ContentAnalyzer(priority=PRIORITY_BATCH))
+
+    def _run_stage(self, job_id: int, stage: str, checkpoints: Dict[str, Any], run):
+        """Run a stage unless its artifact is already checkpointed, then checkpoint the result"""
+        if stage in checkpoints:
+            return checkpoints[stage]
+        if not self.queue.extend_lease(job_id, self.worker_id):
+            raise LeaseLostError(f"Lease lost on job {job_id} before stage {stage}")
+        artifact = run()
+        # Checkpoint immediately so a crash never pays for the same call twice
+        self.queue.save_checkpoint(job_id, stage, artifact)
+        checkpoints[stage] = artifact
+        return artifact
+
+    def fetch_stage(self, url: str) -> Dict[str, Any]:
+        is_valid, validation_msg = self.url_validator.validate_url(url)
+        if not is_valid:
+            raise RuntimeError(validation_msg)
+        success, html_content, fetch_metadata = self.content_scraper.fetch_html_content(url)
+        if not success:
+            raise RuntimeError(html_content)
+        content_hash = self.html_archive.put(url, html_content, fetch_metadata)
+        return {'html': html_content, 'fetch_metadata': fetch_metadata, 'content_hash': content_hash}
+
+    def clean_stage(self, url: str, raw: Dict[str, Any]) -> Dict[str, Any]:
+        cleaned_html, clean_stats, extracted_metadata = self.content_scraper.clean_html(raw['html'], url)
+        return {'cleaned_html': cleaned_html, 'clean_stats': clean_stats, 'metadata': extracted_metadata}
+
+    def process_job(self, job: Dict[str, Any]) -> VerificationResult:
+        """Run every stage of a job and store the verification result"""
+        start_time = time.time()
+        job_id, url = job['job_id'], job['url']
+        checkpoints = self.queue.load_checkpoints(job_id)
+
+        raw = self._run_stage(job_id, "raw_html", checkpoints, lambda: self.fetch_stage(url))
+        cleaned = self._run_stage(job_id, "cleaned_html", checkpoints, lambda: self.clean_stage(url, raw))
+        paragraphs = self.content_scraper.extract_paragraphs(cleaned['cleaned_html'])
+        # Checkpointed so a resumed job follows the same plan after its own earlier writes
+        plan = self._run_stage(
+            job_id, "reuse_plan", checkpoints, lambda: self.pipeline.plan_reuse(url, cleaned['cleaned_html'], paragraphs)
+        )
+        analyzed = self.pipeline.run_analysis(
+            url, cleaned['cleaned_html'], cleaned['metadata'], paragraphs, plan,
+            lambda stage, run: self._run_stage(job_id, stage, checkpoints, run)
+        )
+
+        extracted_metadata = cleaned['metadata']
+        result = VerificationResult(
+            url=url,
+            source_type=urlparse(url).netloc or "unknown",
+            domain=extracted_metadata.get('domain'),
+            title=extracted_metadata.get('title'),
+            author=extracted_metadata.get('author'),
+            publication_date=extracted_metadata.get('publication_date'),
+            content_type=raw['fetch_metadata'].get('content_type'),
+            content_length=raw['fetch_metadata'].get('content_length', 0),
+            raw_content_hash=raw.get('content_hash')
+        )
+        result.update(self.pipeline.result_fields(analyzed, paragraphs))
+        result.update(self.pipeline.score_and_record(url, analyzed, extracted_metadata))
+        self.pipeline.store(result, time.time() - start_time, cleaned['cleaned_html'])
+        return result
+
+    def run(self, max_jobs: int = 0, wait: bool = False, poll_seconds: float = 5.0) -> int:
+        """Process jobs until the queue is drained (or forever with wait); returns jobs completed"""
+        completed = 0
+        while not max_jobs or completed < max_jobs:
+            job = self.queue.lease(self.worker_id)
+            if not job:
+                if not wait:
+                    break
+                time.sleep(poll_seconds)
+                continue
+            try:
+                result = self.process_job(job)
+                self.queue.complete(job['job_id'], self.worker_id)
+                completed += 1
+                print(f"[{self.worker_id}] job {job['job_id']} {job['url']} -> {result['confidence_score']:.2%}")
+            except LeaseLostError as e:
+                print(f"[{self.worker_id}] {e}")
+            except Exception as e:
+                self.queue.fail(job['job_id'], self.worker_id, str(e))
+                print(f"[{self.worker_id}] job {job['job_id']} failed: {e}")
+        return completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crash-safe batch URL verification")
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue the URLs listed one per line in a file")
+    enqueue_parser.add_argument("url_file")
+    enqueue_parser.add_argument("--priority", type=int, default=0)
+
+    work_parser = subparsers.add_parser("work", help="Process queued jobs")
+    work_parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    work_parser.add_argument("--max-jobs", type=int, default=0)
+    work_parser.add_argument("--wait", action="store_true", help="Keep polling when the queue is empty")
+
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        queue = JobQueue(args.db_path)
+        count = 0
+        with open(args.url_file, encoding="utf-8") as f:
+            for line in f:
+                url = line.strip()
+                if url and not url.startswith('#'):
+                    queue.enqueue(url, args.priority)
+                    count += 1
+        print(f"Queued {count} URLs")
+    else:
+        worker = BatchWorker(args.worker_id, args.db_path)
+        completed = worker.run(args.max_jobs, args.wait)
+        print(f"Completed {completed} jobs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from confidence_calculator import ConfidenceCalculator
+from source_credibility_evaluator import SourceCredibilityEvaluator
+from scoring_features import FeatureStore
+from migrations import confidence_level_key, apply_migrations
+from config import CONFIG
+
+
+class BulkRescorer:
+    """Class to recompute confidence scores for the whole verification cache with vectorized NumPy operations
+
+    Scores are rebuilt from the stored scoring features rather than the stored component scores, which
+    already bake in the trusted-domain and word-count rules in force when they were computed.
+    """
+
+    def __init__(self, db_path: str = CONFIG.get("db_path", "cache.db")):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(self.db_path)
+        apply_migrations(self.conn)
+        self.batch_size = CONFIG["rescore_batch_size"]
+
+    def load_features(self) -> Dict[str, Any]:
+        """Load the stored scoring features (see scoring_features.FeatureStore) of every verification into arrays
+
+        Records go through ScoringFeatures.from_row, so older feature versions are upgraded, and the domain
+        and author verdicts are matched with the current assessment_flags rules.
+        """
+        trusted_domains = CONFIG["trusted_domains"]
+        untrusted_domains = CONFIG["untrusted_domains"]
+        now = datetime.now()
+
+        urls, records, metadata_rows = [], [], []
+        base_score, trusted, has_author, has_date, days_old = [], [], [], [], []
+        counts, flags = [], []
+
+        for url, record in FeatureStore(self.conn).iter_all():
+            domain = (record.domain or '').lower()
+            author, pub_date = record.author, record.publication_date
+            urls.append(url)
+            records.append(record)
+            metadata_rows.append({'domain': domain, 'author': author, 'publication_date': pub_date})
+
+            base_score.append(
+                untrusted_domains[domain] if domain in untrusted_domains
+                else trusted_domains.get(domain, CONFIG["default_domain_score"])
+            )
+            trusted.append(domain in trusted_domains)
+            has_author.append(bool(author) and author.lower() != 'none')
+            has_date.append(bool(pub_date))
+            try:
+                days_old.append((now - datetime.strptime(pub_date, '%Y-%m-%d')).days if pub_date else np.nan)
+            except ValueError:
+                days_old.append(np.nan)
+
+            counts.append((
+                record.fact_count, record.verified_fact_count, record.source_count,
+                record.positive_indicator_count, record.negative_indicator_count, record.word_count
+            ))
+            verdict_flags = record.verdict_flags()
+            flags.append((
+                record.is_sensitive, verdict_flags['domain_assessed_not_credible'], verdict_flags['domain_assessed_credible'],
+                verdict_flags['author_assessed_credible'], verdict_flags['author_assessed_not_credible']
+            ))
+
+        counts = np.array(counts, dtype=np.float64).reshape(-1, 6)
+        flags = np.array(flags, dtype=bool).reshape(-1, 5)
+        return {
+            'urls': urls,
+            'records': records,
+            'metadata': metadata_rows,
+            'base_score': np.array(base_score, dtype=np.float64),
+            'trusted': np.array(trusted, dtype=bool),
+            'has_author': np.array(has_author, dtype=bool),
+            'has_date': np.array(has_date, dtype=bool),
+            'days_old': np.array(days_old, dtype=np.float64),
+            'fact_count': counts[:, 0],
+            'verified_fact_count': counts[:, 1],
+            'source_count': counts[:, 2],
+            'positive_indicator_count': counts[:, 3],
+            'negative_indicator_count': counts[:, 4],
+            'word_count': counts[:, 5],
+            'sensitive': flags[:, 0],
+            'domain_assessed_not_credible': flags[:, 1],
+            'domain_assessed_credible': flags[:, 2],
+            'author_assessed_credible': flags[:, 3],
+            'author_assessed_not_credible': flags[:, 4]
+        }
+
+    @staticmethod
+    def source_credibility(features: Dict[str, Any]) -> np.ndarray:
+        """Vectorized SourceCredibilityEvaluator.evaluate_source_credibility"""
+        trusted = features['trusted']
+        days_old = features['days_old']
+        valid_date = ~np.isnan(days_old)
+
+        score = features['base_score'].copy()
+        score += np.where(features['has_author'], 0.15, np.where(trusted, -0.05, -0.1))
+
+        with np.errstate(invalid='ignore'):
+            old = valid_date & (days_old > 365)
+            recent = valid_date & ~old & (days_old < 30)
+        score -= np.where(old, np.where(trusted, 0.15, 0.25), 0.0)
+        score += np.where(recent, 0.15, 0.0)
+        score -= np.where(features['has_date'], 0.0, np.where(trusted, 0.02, 0.05))
+
+        return np.clip(score, 0.0, 1.0)
+
+    @staticmethod
+    def components(features: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized content consistency and verification coverage of ConfidenceCalculator.score_features"""
+        fact_count = features['fact_count']
+        source_count = features['source_count']
+        positive = features['positive_indicator_count']
+        negative = features['negative_indicator_count']
+        word_count = features['word_count']
+        has_facts = fact_count > 0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fact_ratio = np.where(has_facts, features['verified_fact_count'] / fact_count, 0.0)
+            indicator_ratio = np.where(positive + negative > 0, positive / (positive + negative), 0.0)
+        from_facts = fact_ratio * 0.95 * np.where(fact_ratio < 0.5, 0.3, 1.0)
+        from_indicators = np.where(
+            positive + negative > 0,
+            indicator_ratio * 0.9 * np.where(negative > positive, 0.3, 1.0),
+            0.15 + np.where(features['trusted'], 0.3, 0.0)
+        )
+        consistency = np.where(has_facts, from_facts, from_indicators)
+        coverage = np.where(
+            has_facts | (source_count > 0), np.minimum(source_count * 0.3 + fact_count * 0.2, 0.95), 0.05
+        )
+
+        short = word_count < 100
+        long = word_count > 600
+        consistency = np.where(short, consistency * 0.5, np.where(long, consistency + 0.05, consistency))
+        coverage = np.where(short, coverage * 0.5, np.where(long, coverage + 0.05, coverage))
+        return consistency, coverage
+
+    @staticmethod
+    def confidence(
+        features: Dict[str, Any],
+        source_credibility: np.ndarray,
+        content_consistency: np.ndarray,
+        verification_coverage: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized ConfidenceCalculator.combine_component_scores"""
+        weights = CONFIG["confidence_weights"]
+        adjustments = weights["sensitive_adjustments"]
+        trusted = features['trusted']
+        sensitive = features['sensitive']
+
+        def weight(component: str) -> np.ndarray:
+            base = np.where(trusted, weights["trusted"][component], weights["default"][component])
+            if component in adjustments:
+                base = np.where(sensitive, base + adjustments[component], base)
+            return base
+
+        final = (
+            source_credibility * weight('source_credibility')
+            + content_consistency * weight('content_consistency')
+            + verification_coverage * weight('verification_coverage')
+        )
+        domain_factor = np.where(
+            features['domain_assessed_not_credible'], 0.4, np.where(features['domain_assessed_credible'], 1.2, 1.0)
+        )
+        author_factor = np.where(
+            features['author_assessed_credible'], 1.15, np.where(features['author_assessed_not_credible'], 0.6, 1.0)
+        )
+        return np.clip(final * domain_factor * author_factor, 0.0, 1.0)
+
+    def rescore(self, features: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        source_credibility = self.source_credibility(features)
+        content_consistency, verification_coverage = self.components(features)
+        return {
+            'source_credibility': source_credibility,
+            'content_consistency': content_consistency,
+            'verification_coverage': verification_coverage,
+            'confidence_score': self.confidence(features, source_credibility, content_consistency, verification_coverage)
+        }
+
+    def write_back(self, features: Dict[str, Any], scores: Dict[str, np.ndarray]):
+        """Write new scores back in batched transactions"""
+        rows = [
+            (
+                float(confidence), confidence_level_key(float(confidence)), float(source),
+                float(consistency), float(coverage), url
+            )
+            for url, confidence, source, consistency, coverage in zip(
+                features['urls'], scores['confidence_score'], scores['source_credibility'],
+                scores['content_consistency'], scores['verification_coverage']
+            )
+        ]
+        cursor = self.conn.cursor()
+        for start in range(0, len(rows), self.batch_size):
+            cursor.executemany(
+                """
+                UPDATE url_verification_cache
+                SET confidence_score = ?, confidence_level = ?, source_credibility_score = ?,
+                    content_consistency_score = ?, verification_coverage_score = ?
+                WHERE original_url = ?
+                """,
+                rows[start:start + self.batch_size]
+            )
+            self.conn.commit()
+
+    def check_parity(self, features: Dict[str, Any], scores: Dict[str, np.ndarray], tolerance: float = 1e-9) -> List[str]:
+        """Compare vectorized scores with the scalar evaluator and ConfidenceCalculator.score_features; returns mismatching URLs"""
+        evaluator = SourceCredibilityEvaluator()
+        calculator = ConfidenceCalculator()
+        mismatches = []
+        for i, url in enumerate(features['urls']):
+            source = evaluator.evaluate_source_credibility(features['metadata'][i])
+            final, _, components = calculator.score_features(features['records'][i], source)
+            expected = (source, components['content_consistency'], components['verification_coverage'], final)
+            actual = (
+                scores['source_credibility'][i], scores['content_consistency'][i],
+                scores['verification_coverage'][i], scores['confidence_score'][i]
+            )
+            if any(abs(a - b) > tolerance for a, b in zip(expected, actual)):
+                mismatches.append(url)
+        return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore the verification cache with the current CONFIG weights")
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    parser.add_argument("--dry-run", action="store_true", help="Compute scores without writing them back")
+    parser.add_argument("--check-parity", action="store_true", help="Compare every row against the scalar path")
+    parser.add_argument("--backfill", action="store_true", help="Derive features for cached rows that have none first")
+    args = parser.parse_args()
+
+    rescorer = BulkRescorer(args.db_path)
+    if args.backfill:
+        print(f"Backfilled features for {FeatureStore(rescorer.conn).backfill_from_cache()} cached verifications")
+    start_time = time.time()
+    features = rescorer.load_features()
+    load_time = time.time() - start_time
+
+    start_time = time.time()
+    scores = rescorer.rescore(features)
+    rescore_time = time.time() - start_time
+    print(f"Rescored {len(features['urls'])} rows (load {load_time:.2f}s, vectorized scoring {rescore_time:.4f}s)")
+
+    if args.check_parity:
+        mismatches = rescorer.check_parity(features, scores)
+        for url in mismatches:
+            print(f"MISMATCH {url}")
+        print(f"{len(features['urls']) - len(mismatches)}/{len(features['urls'])} rows match the scalar path")
+        if mismatches:
+            raise SystemExit(1)
+
+    if not args.dry_run:
+        start_time = time.time()
+        rescorer.write_back(features, scores)
+        print(f"Wrote scores back in {time.time() - start_time:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
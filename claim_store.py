@@ -0,0 +1,156 @@
+import hashlib
+import json
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from config import CONFIG
+
+_CLAIMS_HEADER = re.compile(r'KEY CLAIMS', re.I)
+_SECTION_HEADER = re.compile(r'^\W*(\d+\.\s*)?[A-Z][A-Z &/\-]{4,}:?\W*$')
+_CLAIM_LINE = re.compile(r'^(\s*)(\d+)[.)]\s+(.+)$')
+_CLAIM_NUMBER = re.compile(r'(claim|fact|statement)\s*(\d+)', re.I)
+_URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]*')
+
+
+class ClaimStore:
+    """Class to store claim-level verdicts and reuse them across articles"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.ttl_days = CONFIG["claim_verdict_ttl_days"]
+
+    @staticmethod
+    def normalize_claim(claim: str) -> str:
+        """Normalize claim text so trivially different phrasings share a fingerprint"""
+        text = claim.lower().replace('**', '')
+        text = re.sub(r'[^\w\s%.]', ' ', text)
+        text = re.sub(r'(?<!\d)\.|\.(?!\d)', ' ', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def fingerprint(self, claim: str) -> str:
+        return hashlib.sha256(self.normalize_claim(claim).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _claim_blocks(lines: List[str]) -> List[Tuple[int, int, int, str]]:
+        """(first line, end line, own number, claim text) of each top-level numbered item in KEY CLAIMS
+
+        Bullets and deeper-indented numbered lines are not claims; they belong to the block of the claim
+        above them, which runs until the next top-level item or the end of the section.
+        """
+        blocks = []
+        in_claims = False
+        top_indent = None
+        section_end = len(lines)
+        for i, line in enumerate(lines):
+            stripped = line.strip().replace('**', '').strip('#').strip()
+            if not in_claims:
+                in_claims = bool(_CLAIMS_HEADER.search(stripped))
+                continue
+            if stripped and _SECTION_HEADER.match(stripped):
+                section_end = i
+                break
+            match = _CLAIM_LINE.match(line)
+            if match and (top_indent is None or len(match.group(1)) <= top_indent):
+                top_indent = len(match.group(1)) if top_indent is None else top_indent
+                blocks.append([i, None, int(match.group(2)), match.group(3).replace('**', '').strip()])
+        for block, following in zip(blocks, blocks[1:] + [None]):
+            block[1] = following[0] if following else section_end
+        return [tuple(block) for block in blocks]
+
+    def extract_claims(self, extracted_text: str) -> List[str]:
+        """Extract the numbered claims from the KEY CLAIMS section of the extracted text"""
+        return [claim for _, _, _, claim in self._claim_blocks(extracted_text.split('\n'))]
+
+    def numbered_claims(self, extracted_text: str) -> Dict[int, str]:
+        """The KEY CLAIMS keyed by their own number, which is how the analysis refers to them"""
+        claims = {}
+        for _, _, number, claim in self._claim_blocks(extracted_text.split('\n')):
+            claims.setdefault(number, claim)
+        return claims
+
+    def lookup_claims(self, claims: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return stored, unexpired verdicts keyed by claim fingerprint"""
+        known = {}
+        if not claims:
+            return known
+        try:
+            cutoff = (datetime.now() - timedelta(days=self.ttl_days)).strftime("%Y-%m-%d %H:%M:%S")
+            cursor = self.conn.cursor()
+            for claim in claims:
+                fingerprint = self.fingerprint(claim)
+                cursor.execute(
+                    "SELECT claim_text, verdict, sources FROM claim_verdicts WHERE fingerprint = ? AND verified_at >= ?",
+                    (fingerprint, cutoff)
+                )
+                row = cursor.fetchone()
+                if row:
+                    known[fingerprint] = {
+                        'claim': row[0],
+                        'status': row[1],
+                        'sources': json.loads(row[2]) if row[2] else []
+                    }
+        except Exception as e:
+            print(f"Claim lookup error: {e}")
+        return known
+
+    def remove_known_claims(self, extracted_text: str, known: Dict[str, Dict[str, Any]]) -> str:
+        """Drop already-verified claims, with their sub-bullets, from the KEY CLAIMS section and renumber the rest"""
+        if not known:
+            return extracted_text
+
+        lines = extracted_text.split('\n')
+        dropped = set()
+        number = 0
+        for start, end, _, claim in self._claim_blocks(lines):
+            if self.fingerprint(claim) in known:
+                dropped.update(i for i in range(start, end) if lines[i].strip())
+            else:
+                number += 1
+                match = _CLAIM_LINE.match(lines[start])
+                lines[start] = f"{match.group(1)}{number}. {match.group(3)}"
+        return '\n'.join(line for i, line in enumerate(lines) if i not in dropped)
+
+    @staticmethod
+    def claim_for_fact(claims: Dict[int, str], position: int, fact: Dict[str, str], fact_count: int) -> Optional[str]:
+        """Map a Perplexity fact line back to the claim it verifies, by the claim number it cites
+
+        claims are the numbered_claims of the text that was analyzed. A fact without a claim number is
+        matched by position only when facts and claims pair up one to one.
+        """
+        match = _CLAIM_NUMBER.search(fact['claim'])
+        if match:
+            return claims.get(int(match.group(2)))
+        if fact_count == len(claims):
+            return list(claims.values())[position]
+        return None
+
+    def store_verdicts(self, claims: Dict[int, str], facts: List[Dict[str, str]], fallback_sources: List[str], source_url: str = ""):
+        """Store Perplexity verdicts for the numbered claims of the text that was sent for verification"""
+        if not claims or not facts:
+            return
+        try:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            rows = []
+            for position, fact in enumerate(facts):
+                claim = self.claim_for_fact(claims, position, fact, len(facts))
+                if claim is None:
+                    continue
+                sources = _URL_PATTERN.findall(fact['claim']) or fallback_sources
+                rows.append((
+                    self.fingerprint(claim), self.normalize_claim(claim), claim, fact['status'],
+                    json.dumps(sources), source_url, now
+                ))
+
+            cursor = self.conn.cursor()
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO claim_verdicts (
+                    fingerprint, normalized_claim, claim_text, verdict, sources, source_url, verified_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            self.conn.commit()
+        except Exception as e:
+            print(f"Claim store error: {e}")
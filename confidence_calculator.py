@@ -1,5 +1,6 @@
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from config import CONFIG
+from scoring_features import ScoringFeatures, extract_scoring_features
 
 class ConfidenceCalculator:
     """Class to calculate confidence scores for content credibility"""
@@ -20,33 +21,35 @@ class ConfidenceCalculator:
                 'verification_coverage': 0.0
             }
 
+        features = extract_scoring_features(perplexity_analysis, extracted_text, metadata, source_credibility_score)
+        return self.score_features(features)
+
+    def score_features(
+        self,
+        features: ScoringFeatures,
+        source_credibility_score: Optional[float] = None
+    ) -> Tuple[float, str, Dict[str, Any]]:
+        """Calculate the confidence score from stored scoring features alone"""
         scores = {
-            'source_credibility': source_credibility_score,
+            'source_credibility': features.source_credibility_score if source_credibility_score is None else source_credibility_score,
             'content_consistency': 0.0,
             'verification_coverage': 0.0
         }
 
-        sensitive_topics = CONFIG["sensitive_topics"]
         trusted_domains = CONFIG["trusted_domains"]
-        domain = metadata.get('domain', '').lower()
+        domain = features.domain
 
         # -----------------------------
         # CONTENT CONSISTENCY SCORING
         # -----------------------------
-        facts = perplexity_analysis.get('fact_verification', [])
-        if facts:
-            verified_count = sum(1 for fact in facts if fact['status'] == 'Verified')
-            total_count = len(facts)
-            ratio = verified_count / total_count if total_count else 0
+        if features.fact_count:
+            ratio = features.verified_fact_count / features.fact_count
             scores['content_consistency'] = ratio * 0.95
             if ratio < 0.5:
                 scores['content_consistency'] *= 0.3
         else:
-            analysis_text = perplexity_analysis.get('full_analysis', '').lower()
-            positive_indicators = ['verified', 'confirmed', 'accurate', 'reliable', 'credible', 'supported']
-            negative_indicators = ['false', 'misleading', 'disputed', 'incorrect', 'misinformation', 'contradicted']
-            positive_count = sum(word in analysis_text for word in positive_indicators)
-            negative_count = sum(word in analysis_text for word in negative_indicators)
+            positive_count = features.positive_indicator_count
+            negative_count = features.negative_indicator_count
             total_indicators = positive_count + negative_count
             if total_indicators > 0:
                 ratio = positive_count / total_indicators
@@ -61,13 +64,15 @@ class ConfidenceCalculator:
         # -----------------------------
         # VERIFICATION COVERAGE
         # -----------------------------
-        sources = perplexity_analysis.get('sources', [])
-        scores['verification_coverage'] = min(len(sources) * 0.3 + len(facts) * 0.2, 0.95) if (facts or sources) else 0.05
+        if features.fact_count or features.source_count:
+            scores['verification_coverage'] = min(features.source_count * 0.3 + features.fact_count * 0.2, 0.95)
+        else:
+            scores['verification_coverage'] = 0.05
 
         # -----------------------------
         # TEXT QUALITY ADJUSTMENTS
         # -----------------------------
-        word_count = len(extracted_text.split())
+        word_count = features.word_count
         if word_count < 100:
             scores['content_consistency'] *= 0.5
             scores['verification_coverage'] *= 0.5
@@ -75,10 +80,25 @@ class ConfidenceCalculator:
             scores['content_consistency'] += 0.05
             scores['verification_coverage'] += 0.05
 
+        final_score, explanation = self.combine_component_scores(
+            scores, domain, features.is_sensitive, features.verdict_flags()
+        )
+
+        return final_score, explanation, scores
+
+    def combine_component_scores(
+        self,
+        scores: Dict[str, float],
+        domain: str,
+        is_sensitive: bool,
+        assessment_flags: Dict[str, bool]
+    ) -> Tuple[float, str]:
+        """Weight the component scores and apply metadata-assessment bias"""
+        trusted_domains = CONFIG["trusted_domains"]
+
         # -----------------------------
         # WEIGHTING LOGIC
         # -----------------------------
-        is_sensitive = any(keyword in extracted_text.lower() for keyword in sensitive_topics)
         weights = CONFIG["confidence_weights"]["trusted"] if domain in trusted_domains else CONFIG["confidence_weights"]["default"]
 
         if is_sensitive:
@@ -91,25 +111,24 @@ class ConfidenceCalculator:
         # -----------------------------
         # METADATA ASSESSMENT BIAS
         # -----------------------------
-        metadata_assessment = perplexity_analysis.get('metadata_assessment', {})
-        domain_eval = metadata_assessment.get('domain_credibility', '').lower()
-        author_eval = metadata_assessment.get('author_credibility', '').lower()
-
-        if 'not credible' in domain_eval or 'unreliable' in domain_eval:
+        if assessment_flags['domain_assessed_not_credible']:
             final_score *= 0.4
-        elif 'credible' in domain_eval:
+        elif assessment_flags['domain_assessed_credible']:
             final_score *= 1.2
 
-        if 'credible' in author_eval:
+        if assessment_flags['author_assessed_credible']:
             final_score *= 1.15
-        elif 'not credible' in author_eval:
+        elif assessment_flags['author_assessed_not_credible']:
             final_score *= 0.6
 
         # -----------------------------
         # FINAL ADJUSTMENTS
         # -----------------------------
         final_score = max(0.0, min(1.0, final_score))
+        return final_score, self.describe_score(final_score)
 
+    @staticmethod
+    def describe_score(final_score: float) -> str:
         if final_score >= 0.75:
             level = "HIGH"
             color = "🟢"
@@ -120,6 +139,4 @@ class ConfidenceCalculator:
             level = "LOW"
             color = "🔴"
 
-        explanation = f"{color} Confidence Level: {level} ({final_score:.2%})"
-
-        return final_score, explanation, scores
+        return f"{color} Confidence Level: {level} ({final_score:.2%})"
@@ -9,6 +9,11 @@ CONFIG = {
 
     # Database settings
     "db_path": os.getenv("DB_PATH", "domain_trust_db.sqlite3"),
+    # Where trust scores and cached verifications live: "sqlite" (db_path) or "postgres" (shared by several workers)
+    "storage_backend": os.getenv("STORAGE_BACKEND", "sqlite"),
+    "postgres_dsn": os.getenv("POSTGRES_DSN", "dbname=news_verification"),
+    "postgres_pool_min": 1,
+    "postgres_pool_max": 10,
 
     # Source credibility settings
     "trusted_domains": {
@@ -31,20 +36,132 @@ CONFIG = {
         "breitbart.com": 0.1
     },
     "default_domain_score": 0.35,
+    # domain_credibility.source_type by domain suffix; trusted_domains not listed here count as news
+    "source_type_suffixes": {
+        ".gov": "government",
+        ".mil": "government",
+        ".gov.uk": "government",
+        ".edu": "academic",
+        ".ac.uk": "academic",
+        "snopes.com": "fact_checker",
+        "politifact.com": "fact_checker",
+        "factcheck.org": "fact_checker",
+        "blogspot.com": "blog",
+        "wordpress.com": "blog",
+        "medium.com": "blog"
+    },
 
     # Content analysis settings
     "max_tokens_openai": 15000,
     "max_tokens_perplexity": 2000,
+    "max_tokens_openai_structured": 2000,
+    # Request compact schema-constrained JSON from both LLM calls instead of free-form prose
+    "structured_output": os.getenv("STRUCTURED_OUTPUT", "false").lower() == "true",
     "temperature_openai": 0.2,
     "temperature_perplexity": 0.2,
     "max_content_length": 500000,
 
+    # LLM request scheduling: per-model rate limits, prices (USD per 1M tokens, plus per request) and budgets
+    "llm_rate_limits": {
+        "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+        "sonar": {"rpm": 50, "tpm": 1000000},
+        "default": {"rpm": 60, "tpm": 100000}
+    },
+    "llm_pricing": {
+        "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+        "sonar": {"input": 1.0, "output": 1.0, "request": 0.005},
+        "default": {"input": 2.5, "output": 10.0}
+    },
+    # Fraction of the provider limits and of the budgets below this process may use, e.g. 0.25 with four
+    # batch workers on one key; the budgets are totals across all processes
+    "llm_rate_limit_share": float(os.getenv("LLM_RATE_LIMIT_SHARE", "1.0")),
+    "llm_hourly_budget_usd": float(os.getenv("LLM_HOURLY_BUDGET_USD", "5.0")),
+    "llm_daily_budget_usd": float(os.getenv("LLM_DAILY_BUDGET_USD", "50.0")),
+    # Prompts shrink once less than this fraction of the hourly budget remains
+    "llm_budget_soft_fraction": 0.2,
+    "llm_min_prompt_tokens": 500,
+    "llm_max_retries": 3,
+    "llm_retry_after_default": 5.0,
+    "llm_request_timeout": 60,
+
+    # Deep research stage
+    "max_tokens_research_input": 12000,
+    "max_tokens_research": 4000,
+    "research_concurrency": 4,
+    # Local span alignment for research items: minimum share of snippet words matched, and candidate window anchors
+    "span_min_match_score": 0.6,
+    "span_anchor_words": 3,
+    "span_max_anchor_positions": 50,
+    # tiktoken encoding used for token counts (Perplexity's tokenizer is not public; this is a close proxy)
+    "tokenizer_encoding": "o200k_base",
+
+    # Near-duplicate detection settings
+    "near_duplicate_threshold": 0.85,
+    "near_duplicate_min_words": 50,
+    "shingle_size": 5,
+    "minhash_num_perm": 128,
+    "minhash_bands": 32,
+
+    # Claim verdict reuse settings
+    "claim_verdict_ttl_days": 30,
+
+    # In-memory Bloom filters over known domains and URL hashes; definite misses skip SQLite.
+    # Rebuilt periodically so rows written by other processes are picked up
+    "bloom_error_rate": 0.01,
+    "bloom_min_capacity": 10000,
+    "bloom_rebuild_seconds": 600,
+
+    # Domain reputation aggregate settings; a domain's aggregate answers for new URLs only when it is
+    # backed by enough verifications with stable scores and few disputed claims. Curated domain_credibility
+    # rows (seeded or imported lists) answer with their list score first; rows added automatically after a
+    # verification only answer through the aggregate
+    "reputation_ewma_alpha": 0.2,
+    "reputation_window_size": 10,
+    "reputation_min_verifications": 5,
+    "reputation_max_std": 0.1,
+    "reputation_max_dispute_rate": 0.2,
+
+    # Batch job queue settings
+    "job_lease_seconds": 300,
+    "job_max_attempts": 3,
+
+    # Raw HTML archive settings
+    "archive_dir": os.getenv("ARCHIVE_DIR", "html_archive"),
+    "archive_pack_max_bytes": 256 * 1024 * 1024,
+    "archive_zstd_level": 10,
+    "reprocess_chunksize": 16,
+    # Chunks per worker fed ahead of the results, bounding how many pages are held in memory
+    "reprocess_inflight_chunks": 2,
+    "rescore_batch_size": 5000,
+
+    # Rows per transaction when bulk-importing domain lists
+    "domain_import_batch_size": 50000,
+
+    # Read-only domain score snapshot for lookup-only clients
+    "domain_snapshot_path": os.getenv("DOMAIN_SNAPSHOT_PATH", "domain_snapshot.bin"),
+
+    # Columnar verification history export for analytics
+    "analytics_export_dir": os.getenv("ANALYTICS_EXPORT_DIR", "analytics_export"),
+    "analytics_max_parts": 32,
+
+    # Streaming fetch-and-clean settings (raw HTML is not archived in this mode)
+    "use_streaming_cleaner": os.getenv("USE_STREAMING_CLEANER", "false").lower() == "true",
+    "stream_chunk_size": 16384,
+
     # Sensitive topics for confidence calculation
     "sensitive_topics": [
         "politics", "health", "science", "election",
         "vaccine", "climate", "war", "conflict"
     ],
 
+    # Keyword lists for analysis scoring and assessment scans
+    "positive_indicators": ["verified", "confirmed", "accurate", "reliable", "credible", "supported"],
+    "negative_indicators": ["false", "misleading", "disputed", "incorrect", "misinformation", "contradicted"],
+    "credibility_keywords": [
+        "credible", "reliable", "accurate", "verified", "trustworthy",
+        "false", "misleading", "disputed", "controversial", "unverifiable"
+    ],
+
     # Confidence score weights
     "confidence_weights": {
         "trusted": {
@@ -1,23 +1,33 @@
-import openai
-import requests
 import re
-import json
 from typing import Tuple, Dict, Any, List
 from config import CONFIG
-from deep_research_extractor import generate_research_outputs
+from deep_research_extractor import generate_research_outputs, generate_research_outputs_async
+from research_store import ResearchStore
+from analysis_parser import parse_perplexity_analysis
+from keyword_matcher import get_matcher
+from llm_clients import get_client
+from llm_scheduler import get_scheduler, PRIORITY_INTERACTIVE
+from token_counter import count_tokens, truncate_to_tokens
+from content_packer import pack_content
+from structured_output import (
+    EXTRACTION_SCHEMA, ANALYSIS_SCHEMA, parse_json_output, render_extraction, analysis_to_results
+)
 
 class ContentAnalyzer:
     """Class to extract and analyze content using OpenAI and Perplexity APIs"""
 
-    def __init__(self):
-        self.openai_api_key = CONFIG["openai_api_key"]
-        self.perplexity_api_key = CONFIG["perplexity_api_key"]
-        self.perplexity_api_url = CONFIG["perplexity_api_url"]
+    def __init__(self, openai_api_key: str = None, perplexity_api_key: str = None, priority: int = PRIORITY_INTERACTIVE):
+        # Keys entered per session in the sidebar get their own pooled clients
+        self.openai_api_key = openai_api_key or CONFIG["openai_api_key"]
+        self.perplexity_api_key = perplexity_api_key or CONFIG["perplexity_api_key"]
+        self.priority = priority
+        self.scheduler = get_scheduler()
+        self.last_packing_report = None
 
     def extract_text_with_openai(self, cleaned_html: str, metadata: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
         """Extract meaningful text using OpenAI GPT-4o-mini with enhanced metadata extraction"""
         try:
-            client = openai.OpenAI(api_key=self.openai_api_key)
+            client = get_client('openai', self.openai_api_key)
             
             system_prompt = """You are an expert at extracting meaningful content from HTML for fact-checking purposes.
 
@@ -53,30 +63,68 @@ class ContentAnalyzer:
             - Publication Date: {metadata.get('publication_date', 'Not found')}
             """
             
+            request_options = {
+                "max_tokens": CONFIG["max_tokens_openai"]
+            }
+            if CONFIG["structured_output"]:
+                system_prompt = (
+                    "Extract fact-checking content from HTML as JSON. metadata: domain, title, author "
+                    "('None' if absent), publication_date ('Not found' if absent). claims: 3-5 verifiable claims, "
+                    "exact wording, with numbers, quotes and attributions. context: brief background items."
+                )
+                request_options = {
+                    "max_tokens": CONFIG["max_tokens_openai_structured"],
+                    "response_format": {
+                        "type": "json_schema",
+                        "json_schema": {"name": "extraction", "strict": True, "schema": EXTRACTION_SCHEMA}
+                    }
+                }
+            
+            # Shrink the HTML when the remaining LLM budget cannot cover the full prompt
+            html = cleaned_html[:CONFIG["max_content_length"]]
+            prompt_tokens = count_tokens(system_prompt) + count_tokens(metadata_str) + count_tokens(html)
+            allowed_tokens = self.scheduler.fit_prompt_tokens("gpt-4o-mini", prompt_tokens, request_options["max_tokens"])
+            if allowed_tokens < prompt_tokens:
+                html = truncate_to_tokens(html, count_tokens(html) - (prompt_tokens - allowed_tokens))
+                prompt_tokens = allowed_tokens
+            
             user_prompt = f"""
             Extract and structure content from this HTML:
             {metadata_str}
 
-            HTML: {cleaned_html[:CONFIG["max_content_length"]]}
+            HTML: {html}
             """
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=CONFIG["max_tokens_openai"],
-                temperature=CONFIG["temperature_openai"]
+            response = self.scheduler.run(
+                "gpt-4o-mini", prompt_tokens, request_options["max_tokens"],
+                lambda: client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=CONFIG["temperature_openai"],
+                    **request_options
+                ),
+                lambda response: (response.usage.prompt_tokens, response.usage.completion_tokens),
+                self.priority
             )
             
             extracted_text = response.choices[0].message.content.strip()
+            structured = None
+            if CONFIG["structured_output"]:
+                structured, errors = parse_json_output(extracted_text, EXTRACTION_SCHEMA)
+                if structured:
+                    extracted_text = render_extraction(structured)
+                else:
+                    print(f"Structured extraction rejected, using raw output: {'; '.join(errors)}")
             
             extraction_metadata = {
                 'extraction_model': 'gpt-4o-mini',
                 'tokens_used': response.usage.total_tokens if hasattr(response, 'usage') else 0,
                 'extraction_length': len(extracted_text),
-                'metadata_included': metadata
+                'metadata_included': metadata,
+                'structured': structured
             }
             
             return True, extracted_text, extraction_metadata
@@ -85,47 +133,22 @@ class ContentAnalyzer:
             return False, f"OpenAI extraction failed: {str(e)}", {}
     
     def prepare_content_for_perplexity(self, extracted_text: str, max_tokens: int = CONFIG["max_tokens_perplexity"]) -> str:
-        """Prepare and limit content for Perplexity analysis"""
-        estimated_tokens = len(extracted_text) // 4
-        
-        if estimated_tokens <= max_tokens:
-            return extracted_text
-        
-        sections = extracted_text.split('\n\n')
-        priority_content = []
-        metadata_section = None
-        key_claims_section = None
-        
-        for i, section in enumerate(sections):
-            if 'METADATA' in section.upper() or 'Website Domain' in section:
-                metadata_section = section
-            elif 'KEY CLAIMS' in section.upper() or any(section.strip().startswith(str(i)) for i in range(1, 10)):
-                key_claims_section = section
-        
-        final_content = []
-        if metadata_section:
-            final_content.append(metadata_section)
-        if key_claims_section:
-            final_content.append(key_claims_section)
-        
-        current_length = sum(len(s) for s in final_content)
-        for section in sections:
-            if section not in [metadata_section, key_claims_section]:
-                if current_length + len(section) < max_tokens * 4:
-                    final_content.append(section)
-                    current_length += len(section)
-                else:
-                    remaining_space = max_tokens * 4 - current_length
-                    if remaining_space > 50:
-                        final_content.append(section[:remaining_space-10] + "...")
-                    break
-        
-        return '\n\n'.join(final_content)
+        """Pack metadata, whole claims and the most relevant context into max_tokens for Perplexity analysis"""
+        prepared_content, self.last_packing_report = pack_content(extracted_text, max_tokens)
+        if self.last_packing_report['dropped']:
+            print(
+                f"Packed {self.last_packing_report['original_tokens']} tokens into {self.last_packing_report['packed_tokens']}/{max_tokens}, "
+                f"dropped {len(self.last_packing_report['dropped'])} units"
+            )
+        return prepared_content
     
     def analyze_with_perplexity(self, extracted_text: str) -> Tuple[bool, Dict[str, Any]]:
         """Analyze content credibility with enhanced Perplexity prompt"""
         try:
-            prepared_content = self.prepare_content_for_perplexity(extracted_text)
+            # The content is the bulk of the prompt; shrink it when the remaining LLM budget runs low
+            content_tokens = min(count_tokens(extracted_text), CONFIG["max_tokens_perplexity"])
+            content_tokens = self.scheduler.fit_prompt_tokens("sonar", content_tokens, CONFIG["max_tokens_perplexity"])
+            prepared_content = self.prepare_content_for_perplexity(extracted_text, content_tokens)
             
             research_prompt = f"""You are a professional fact-checker analyzing web content for credibility.
 
@@ -160,11 +183,13 @@ class ContentAnalyzer:
 
             Be precise, cite sources, and ensure 3–5 claims are analyzed."""
             
-            headers = {
-                "accept": "application/json",
-                "content-type": "application/json",
-                "Authorization": f"Bearer {self.perplexity_api_key}"
-            }
+            if CONFIG["structured_output"]:
+                research_prompt = f"""Fact-check this content. Assess domain reliability, author credibility and date relevance.
+            Verify each numbered KEY CLAIM (claim_number = its number) as Verified, Disputed or Unverifiable with source URLs.
+            Give an overall rating with a one-sentence explanation and 2-3 key source URLs. Answer only with JSON.
+
+            CONTENT TO VERIFY:
+            {prepared_content}"""
             
             data = {
                 "model": "sonar",
@@ -175,28 +200,35 @@ class ContentAnalyzer:
                 "temperature": CONFIG["temperature_perplexity"],
                 "max_tokens": CONFIG["max_tokens_perplexity"]
             }
+            if CONFIG["structured_output"]:
+                data["response_format"] = {"type": "json_schema", "json_schema": {"schema": ANALYSIS_SCHEMA}}
             
-            response = requests.post(
-                self.perplexity_api_url,
-                headers=headers,
-                json=data,
-                timeout=60
+            client = get_client('perplexity', self.perplexity_api_key)
+            prompt_tokens = sum(count_tokens(message["content"]) for message in data["messages"])
+            response = self.scheduler.run(
+                "sonar", prompt_tokens, data["max_tokens"],
+                lambda: client.chat.completions.create(**data),
+                lambda response: (response.usage.prompt_tokens, response.usage.completion_tokens),
+                self.priority
             )
-            response.raise_for_status()
-            
-            result = response.json()
             
-            if "choices" in result and result["choices"]:
-                analysis_content = result["choices"][0]["message"]["content"]
+            if response.choices:
+                analysis_content = response.choices[0].message.content
                 
-                analysis_data = {
-                    'full_analysis': analysis_content,
-                    'sources': self._extract_sources_from_analysis(analysis_content),
-                    'credibility_assessment': self._extract_credibility_assessment(analysis_content),
-                    'metadata_assessment': self._extract_metadata_assessment(analysis_content),
-                    'fact_verification': self._extract_fact_verification(analysis_content)
-                }
+                structured = None
+                if CONFIG["structured_output"]:
+                    structured, errors = parse_json_output(analysis_content, ANALYSIS_SCHEMA)
+                    if not structured:
+                        print(f"Structured analysis rejected, parsing as text: {'; '.join(errors)}")
                 
+                if structured:
+                    analysis_data = analysis_to_results(structured, analysis_content)
+                else:
+                    analysis_data = {
+                        'full_analysis': analysis_content,
+                        **parse_perplexity_analysis(analysis_content)
+                    }
+                analysis_data['content_packing'] = self.last_packing_report
                 
 
                 return True, analysis_data
@@ -258,27 +290,29 @@ class ContentAnalyzer:
     
     def _extract_credibility_assessment(self, analysis: str) -> str:
         """Extract credibility assessment from analysis"""
-        credibility_keywords = [
-            'credible', 'reliable', 'accurate', 'verified', 'trustworthy',
-            'false', 'misleading', 'disputed', 'controversial', 'unverifiable'
-        ]
+        credibility_matcher = get_matcher("credibility_keywords")
         
         assessment_lines = []
         lines = analysis.split('\n')
         for line in lines:
-            if any(keyword in line.lower() for keyword in credibility_keywords):
+            if credibility_matcher.contains_any(line):
                 assessment_lines.append(line.strip())
         
         return ' '.join(assessment_lines) or "Assessment not clearly stated"
     
-    def analyze_content(self, article_text, source_url=None):
-        outputs = generate_research_outputs(article_text, source=source_url)
-        
-        # Save or log narrative
+    def analyze_content(self, article_text: str, source_url: str = None, research_store: ResearchStore = None) -> Dict[str, Any]:
+        """Run deep research on an article, storing the result under its document_id"""
+        outputs = generate_research_outputs(article_text, source=source_url or "unknown", api_key=self.openai_api_key)
         print("Narrative Context:\n", outputs["narrative_context"])
-
-        # Optional: Store to DB or write to file
-        with open("structured_output.json", "w", encoding="utf-8") as f:
-            json.dump(outputs["structured_granular_data"], f, indent=2)
-        
+        if research_store is not None:
+            research_store.save(outputs)
+        return outputs
+    
+    async def analyze_content_async(self, article_text: str, source_url: str = None, research_store: ResearchStore = None) -> Dict[str, Any]:
+        """Non-blocking analyze_content for callers running an event loop"""
+        outputs = await generate_research_outputs_async(
+            article_text, source=source_url or "unknown", api_key=self.openai_api_key, priority=self.priority
+        )
+        if research_store is not None:
+            research_store.save(outputs)
         return outputs
\ No newline at end of file
@@ -0,0 +1,157 @@
+import math
+import re
+from typing import Any, Dict, List, Tuple
+from token_counter import count_tokens, truncate_at_sentence
+
+_HEADER = re.compile(r'^(\d+\.\s*)?([A-Za-z][A-Za-z &/\-]{3,}?)\s*(SECTION)?\s*:?$')
+_UPPER_HEADER = re.compile(r'^(\d+\.\s*)?[A-Z][A-Z &/\-]{4,}:?$')
+_LIST_ITEM = re.compile(r'^\s*(\d+[.)]|[-*•])\s+\S')
+_METADATA_FIELDS = ('website domain', 'article title', 'author:', 'publication date')
+_WORD_PATTERN = re.compile(r'[a-z0-9]{4,}')
+
+METADATA = 'metadata'
+CLAIMS = 'claims'
+CONTEXT = 'context'
+
+
+def _section_kind(line: str):
+    """Kind of section a header line opens, or None when the line is not a header"""
+    stripped = line.strip().strip('#*').strip().rstrip(':').strip('*').strip()
+    if not stripped or len(stripped) > 60:
+        return None
+    upper = stripped.upper()
+    if 'METADATA' in upper:
+        return METADATA
+    if 'KEY CLAIMS' in upper or 'CLAIMS AND FACTS' in upper:
+        return CLAIMS
+    if 'SUPPORTING CONTEXT' in upper or _UPPER_HEADER.match(stripped) or (
+        line.lstrip().startswith('#') and _HEADER.match(stripped)
+    ):
+        return CONTEXT
+    return None
+
+
+def split_units(extracted_text: str) -> List[Dict[str, Any]]:
+    """Split extracted text into packing units in document order
+
+    The metadata section is one unit, every claim (with its continuation lines) is one unit, and
+    context is split into list items and paragraphs. Section headers are kept as separate units.
+    """
+    units = []
+    kind = None
+    current = None
+
+    def flush():
+        nonlocal current
+        if current and current['text'].strip():
+            units.append(current)
+        current = None
+
+    for line in extracted_text.split('\n'):
+        header_kind = _section_kind(line)
+        if header_kind:
+            flush()
+            kind = header_kind
+            # Keep the blank line that separates sections
+            units.append({'kind': 'header', 'section': kind, 'text': ('\n' if units else '') + line.strip()})
+            continue
+        section = kind or (METADATA if any(f in line.lower() for f in _METADATA_FIELDS) else CONTEXT)
+        if section == METADATA:
+            if not line.strip():
+                continue
+            if not current or current['kind'] != METADATA:
+                flush()
+                current = {'kind': METADATA, 'section': METADATA, 'text': line}
+            else:
+                current['text'] += '\n' + line
+        elif not line.strip():
+            # Blank lines end context paragraphs; a claim keeps going until the next item
+            if current and current['kind'] == CONTEXT:
+                flush()
+        elif _LIST_ITEM.match(line) or not current or current['kind'] != section:
+            flush()
+            current = {'kind': section, 'section': section, 'text': line}
+        else:
+            current['text'] += '\n' + line
+    flush()
+    return units
+
+
+def _relevance(text: str, claim_words: set) -> float:
+    """Share of a context unit's words that also appear in the claims, damped for long units"""
+    words = set(_WORD_PATTERN.findall(text.lower()))
+    if not words:
+        return 0.0
+    return len(words & claim_words) / math.sqrt(len(words))
+
+
+def pack_content(extracted_text: str, max_tokens: int) -> Tuple[str, Dict[str, Any]]:
+    """Fill max_tokens with the most useful parts of the extracted text
+
+    Metadata goes in first, then whole claims in order, then context units by relevance to the claims;
+    the last context unit that does not fit is cut at a sentence boundary. Kept units stay in document
+    order. Returns the packed text and a report of what was kept and dropped.
+    """
+    total_tokens = count_tokens(extracted_text)
+    report = {'budget': max_tokens, 'original_tokens': total_tokens, 'dropped': [], 'truncated': None}
+    if total_tokens <= max_tokens:
+        report['packed_tokens'] = total_tokens
+        return extracted_text, report
+
+    units = split_units(extracted_text)
+    for unit in units:
+        unit['tokens'] = count_tokens(unit['text'] + '\n')
+    headers = {unit['section']: unit for unit in units if unit['kind'] == 'header'}
+    claim_words = set(_WORD_PATTERN.findall(' '.join(u['text'] for u in units if u['kind'] == CLAIMS).lower()))
+
+    kept = set()
+    used = 0
+
+    def try_keep(index: int) -> bool:
+        nonlocal used
+        unit = units[index]
+        header = headers.get(unit['section'])
+        cost = unit['tokens'] + (header['tokens'] if header and id(header) not in kept else 0)
+        if used + cost > max_tokens:
+            return False
+        if header:
+            kept.add(id(header))
+        kept.add(id(unit))
+        used += cost
+        return True
+
+    metadata = [i for i, u in enumerate(units) if u['kind'] == METADATA]
+    claims = [i for i, u in enumerate(units) if u['kind'] == CLAIMS]
+    context = sorted(
+        (i for i, u in enumerate(units) if u['kind'] == CONTEXT),
+        key=lambda i: -_relevance(units[i]['text'], claim_words)
+    )
+    for i in metadata + claims:
+        try_keep(i)
+    for i in context:
+        if not try_keep(i) and report['truncated'] is None:
+            unit = units[i]
+            header = headers.get(unit['section'])
+            header_cost = header['tokens'] if header and id(header) not in kept else 0
+            partial = truncate_at_sentence(unit['text'], max_tokens - used - header_cost - 1)
+            if partial:
+                report['truncated'] = {'kind': CONTEXT, 'tokens': unit['tokens'], 'kept_tokens': count_tokens(partial)}
+                unit['text'], unit['tokens'] = partial, count_tokens(partial + '\n')
+                try_keep(i)
+
+    # Per-unit counts can differ by a token or two from the joined text; drop the least relevant context until it fits
+    while True:
+        packed = '\n'.join(u['text'] for u in units if id(u) in kept)
+        packed_tokens = count_tokens(packed)
+        removable = [i for i in reversed(context) if id(units[i]) in kept]
+        if packed_tokens <= max_tokens or not removable:
+            break
+        kept.discard(id(units[removable[0]]))
+
+    for unit in units:
+        if id(unit) not in kept and unit['kind'] != 'header':
+            report['dropped'].append({
+                'kind': unit['kind'], 'tokens': unit['tokens'], 'preview': unit['text'].strip()[:80]
+            })
+    report['packed_tokens'] = packed_tokens
+    return packed, report
@@ -1,9 +1,12 @@
 import requests
 from bs4 import BeautifulSoup, Comment
+import codecs
 import re
 from urllib.parse import urlparse
 import dateutil.parser
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional, Callable
+from streaming_cleaner import StreamingHtmlCleaner
+from config import CONFIG
 
 class ContentScraper:
     """Class to fetch, clean, and extract metadata from HTML content"""
@@ -30,6 +33,45 @@ class ContentScraper:
         except Exception as e:
             return False, f"Failed to fetch content: {str(e)}", {}
 
+    def fetch_and_clean_streaming(
+        self,
+        url: str,
+        on_paragraph: Optional[Callable[[str], None]] = None
+    ) -> Tuple[bool, str, Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Fetch and clean HTML in one pass, parsing each chunk as it arrives"""
+        try:
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            }
+            with requests.get(url, headers=headers, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                try:
+                    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+                except LookupError:
+                    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                
+                cleaner = StreamingHtmlCleaner(url, on_paragraph)
+                content_length = 0
+                for chunk in response.iter_content(chunk_size=CONFIG["stream_chunk_size"]):
+                    content_length += len(chunk)
+                    cleaner.feed(decoder.decode(chunk))
+                cleaner.feed(decoder.decode(b'', final=True))
+                cleaner.close()
+                
+                fetch_metadata = {
+                    'content_length': content_length,
+                    'content_type': response.headers.get('content-type', ''),
+                    'encoding': response.encoding,
+                    'status_code': response.status_code,
+                    'final_url': response.url
+                }
+            
+            cleaned_html, stats, metadata = cleaner.get_result()
+            return True, cleaned_html, fetch_metadata, stats, metadata
+            
+        except Exception as e:
+            return False, f"Failed to fetch content: {str(e)}", {}, {}, {}
+
     def extract_metadata_from_html(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
         """Extract metadata from HTML content"""
         metadata = {
@@ -166,4 +208,24 @@ class ContentScraper:
             'content_found': main_content is not None
         }
         
-        return cleaned_html, stats, metadata
\ No newline at end of file
+        return cleaned_html, stats, metadata
+
+    def extract_paragraphs(self, cleaned_html: str) -> List[str]:
+        """Split cleaned HTML into top-level text paragraphs"""
+        soup = BeautifulSoup(cleaned_html, 'html.parser')
+        block_tags = ['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre']
+        
+        paragraphs = []
+        for element in soup.find_all(block_tags):
+            if element.find_parent(block_tags):
+                continue
+            text = element.get_text(' ', strip=True)
+            if text:
+                paragraphs.append(text)
+        
+        if not paragraphs:
+            text = ' '.join(soup.stripped_strings)
+            if text:
+                paragraphs.append(text)
+        
+        return paragraphs
\ No newline at end of file
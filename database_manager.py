@@ -1,102 +1,127 @@
 import sqlite3
 import hashlib
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
 from config import CONFIG
-import json
+from bloom_filter import BloomFilter
+from migrations import apply_migrations
+import result_codec
+from storage_backend import (
+    StorageBackend, cache_row, domain_row, as_record, CACHE_COLUMNS, CACHE_UPDATE_COLUMNS, DOMAIN_COLUMNS, DOMAIN_UPDATE_COLUMNS,
+    AUTO_ADDED_DOMAIN_NOTES
+)
 
-class DatabaseManager:
+# Filter name -> query returning the keys it holds
+LOOKUP_FILTER_QUERIES = {
+    'domains': "SELECT domain FROM domain_credibility",
+    'url_hashes': "SELECT url_hash FROM url_verification_cache",
+    'reputation_domains': "SELECT domain FROM domain_reputation"
+}
+
+# Lookup filters are shared by every DatabaseManager on the same database file in this process. While a
+# rebuild reads its snapshot, keys written in the meantime are queued in _lookup_pending and replayed into
+# the new filters before they replace the old ones.
+_lookup_filters: Dict[str, Dict[str, Any]] = {}
+_lookup_pending: Dict[str, Dict[str, List[str]]] = {}
+_lookup_attempted_at: Dict[str, float] = {}
+_lookup_lock = threading.Lock()
+
+
+def _rebuild_lookup_filters(db_path: str):
+    """Read every filter's keys on a private connection and swap the rebuilt filters in"""
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            keys = {name: [row[0] for row in conn.execute(query) if row[0]] for name, query in LOOKUP_FILTER_QUERIES.items()}
+        finally:
+            conn.close()
+    except Exception as e:
+        # The previous filters (if any) stay in use until the next attempt
+        print(f"Lookup filter build error: {e}")
+        with _lookup_lock:
+            _lookup_pending.pop(db_path, None)
+        return
+
+    filters: Dict[str, Any] = {}
+    for name, values in keys.items():
+        filters[name] = BloomFilter(max(len(values) * 2, CONFIG["bloom_min_capacity"]), CONFIG["bloom_error_rate"])
+        filters[name].update(values)
+    with _lookup_lock:
+        for name, values in _lookup_pending.pop(db_path, {}).items():
+            filters[name].update(values)
+        filters['built_at'] = time.time()
+        _lookup_filters[db_path] = filters
+
+
+def _note_lookup_keys(db_path: str, name: str, keys: List[str]):
+    """Add freshly written keys to the live filter and to any rebuild in progress"""
+    with _lookup_lock:
+        if db_path in _lookup_filters:
+            _lookup_filters[db_path][name].update(keys)
+        if db_path in _lookup_pending:
+            _lookup_pending[db_path][name].extend(keys)
+
+
+class DatabaseManager(StorageBackend):
     def __init__(self, db_path: str = CONFIG.get("db_path", "cache.db")):
         self.db_path = db_path
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
-        self.create_tables()
-        # Ensure optional columns in domain_credibility
-        for col, col_type in [
-            ("category", "TEXT"),
-            ("source_type", "TEXT"),
-            ("bias_level", "TEXT"),
-            ("reliability", "TEXT")
-        ]:
-            self.ensure_column_exists("domain_credibility", col, col_type)
+        apply_migrations(self.conn)
+        self.refresh_lookup_filters()
 
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        # domain_credibility core
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS domain_credibility (
-                domain TEXT PRIMARY KEY,
-                trust_score REAL
-            )
-            """
-        )
-        # url_verification_cache core
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS url_verification_cache (
-                original_url TEXT PRIMARY KEY,
-                url_hash TEXT,
-                domain TEXT,
-                title TEXT,
-                author TEXT,
-                publication_date TEXT,
-                content_type TEXT,
-                content_length INTEGER,
-                confidence_score REAL,
-                confidence_level TEXT,
-                source_credibility_score REAL,
-                content_consistency_score REAL,
-                verification_coverage_score REAL,
-                extracted_text TEXT,
-                credibility_assessment TEXT,
-                fact_verification_results TEXT,
-                sources_used TEXT,
-                full_perplexity_analysis TEXT,
-                metadata_assessment TEXT,
-                processing_time_seconds REAL,
-                openai_tokens_used INTEGER,
-                perplexity_calls_made INTEGER,
-                extraction_model TEXT,
-                first_verified_at TEXT,
-                last_accessed_at TEXT,
-                access_count INTEGER DEFAULT 1,
-                expires_at TEXT,
-                cache_status TEXT
-            )
-            """
-        )
-        self.conn.commit()
+    def refresh_lookup_filters(self, force: bool = False):
+        """Start a background rebuild of the Bloom filters when missing, stale or saturated
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS simple_url_cache (
-                url TEXT PRIMARY KEY,
-                result_json TEXT,
-                timestamp TEXT,
-                processing_time REAL
-            )
-            """
-        )
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS simple_url_cache (
-                url TEXT PRIMARY KEY,
-                result_json TEXT,
-                timestamp TEXT,
-                processing_time REAL
-            )
-        """)
+        Never blocks: until the first build finishes the lookups answer True, and afterwards they keep using
+        the previous filters, which writes from this process update in place.
+        """
+        if self.db_path == ':memory:':
+            # A private connection would see a different, empty database
+            return
+        with _lookup_lock:
+            if self.db_path in _lookup_pending:
+                return
+            filters = _lookup_filters.get(self.db_path)
+            attempted_at = _lookup_attempted_at.get(self.db_path)
+            if not force and attempted_at is not None:
+                stale = time.time() - attempted_at >= CONFIG["bloom_rebuild_seconds"]
+                # A saturated filter is rebuilt early, unless the last attempt since it was built failed
+                saturated = filters is not None and filters['built_at'] >= attempted_at and any(
+                    filters[name].is_saturated() for name in LOOKUP_FILTER_QUERIES
+                )
+                if not stale and not saturated:
+                    return
+            _lookup_attempted_at[self.db_path] = time.time()
+            _lookup_pending[self.db_path] = {name: [] for name in LOOKUP_FILTER_QUERIES}
+        threading.Thread(target=_rebuild_lookup_filters, args=(self.db_path,), daemon=True).start()
 
+    def _might_contain(self, name: str, key: str) -> bool:
+        self.refresh_lookup_filters()
+        filters = _lookup_filters.get(self.db_path)
+        return filters is None or key in filters[name]
 
-    def ensure_column_exists(self, table_name: str, column_name: str, column_type: str = "TEXT"):
-        cursor = self.conn.cursor()
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        existing = [row[1] for row in cursor.fetchall()]
-        if column_name not in existing:
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
-            self.conn.commit()
+    def might_contain_domain(self, domain: str) -> bool:
+        """False means the domain is definitely not in domain_credibility"""
+        return self._might_contain('domains', domain)
+
+    def might_contain_url(self, url: str) -> bool:
+        """False means the URL is definitely not in url_verification_cache"""
+        return self._might_contain('url_hashes', hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def might_have_reputation(self, domain: str) -> bool:
+        """False means the domain definitely has no domain_reputation aggregate"""
+        return self._might_contain('reputation_domains', domain)
+
+    def note_reputation_domain(self, domain: str):
+        """Record that DomainReputation wrote an aggregate for domain, keeping might_have_reputation exact"""
+        _note_lookup_keys(self.db_path, 'reputation_domains', [domain])
 
     def get_cached_result(self, url: str) -> Optional[Dict[str, Any]]:
+        if not self.might_contain_url(url):
+            return None
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -126,10 +151,10 @@ class DatabaseManager:
                 )
                 conn.commit()
     
-                # Parse JSON
-                for field in ['fact_verification_results', 'sources_used', 'metadata_assessment']:
+                # Decode structured fields (binary records, or JSON text from older rows)
+                for field in ['fact_verification_results', 'sources_used', 'metadata_assessment', 'paragraph_hashes']:
                     if result_dict.get(field):
-                        result_dict[field] = json.loads(result_dict[field])
+                        result_dict[field] = result_codec.decode(result_dict[field])
     
                 return result_dict
             return None
@@ -145,7 +170,7 @@ class DatabaseManager:
             cursor.execute("SELECT result_json FROM simple_url_cache WHERE url = ?", (url,))
             row = cursor.fetchone()
             if row:
-                return json.loads(row[0])
+                return result_codec.decode(row[0])
             return None
         except Exception as e:
             print(f"Simple cache read error: {e}")
@@ -154,7 +179,7 @@ class DatabaseManager:
     def insert_simple_cached_result(self, url: str, result: Dict[str, Any], processing_time: float):
         try:
             cursor = self.conn.cursor()
-            result_json = json.dumps(result)
+            result_json = result_codec.encode(as_record(result))
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             cursor.execute(
                 """
@@ -169,53 +194,32 @@ class DatabaseManager:
 
     def insert_cached_result(self, result: Dict[str, Any], processing_time: float):
         """Insert or update a verification result in the url_verification_cache table"""
+        self.insert_cached_results_bulk([(result, processing_time)])
+
+    def insert_cached_results_bulk(self, results: List[Tuple[Dict[str, Any], float]]) -> int:
         try:
-            cursor = self.conn.cursor()
-            url = result['url']
-            url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
-            expires_at = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
-            fact_results = json.dumps(result.get('fact_verification', []))
-            sources = json.dumps(result.get('sources', []))
-            metadata = json.dumps(result.get('metadata_assessment', {}))
-            cursor.execute(
-                """
-                INSERT INTO url_verification_cache (
-                    original_url, url_hash, domain, title, author, publication_date,
-                    content_type, content_length, confidence_score, confidence_level,
-                    source_credibility_score, content_consistency_score, verification_coverage_score,
-                    extracted_text, credibility_assessment, fact_verification_results,
-                    sources_used, full_perplexity_analysis, metadata_assessment,
-                    processing_time_seconds, openai_tokens_used, perplexity_calls_made,
-                    extraction_model, first_verified_at, last_accessed_at, access_count,
-                    expires_at, cache_status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            rows = [cache_row(result, processing_time, result_codec.encode) for result, processing_time in results]
+            updates = ',\n'.join(f"                    {column} = excluded.{column}" for column in CACHE_UPDATE_COLUMNS)
+            self.conn.executemany(
+                f"""
+                INSERT INTO url_verification_cache ({', '.join(CACHE_COLUMNS)})
+                VALUES ({', '.join('?' * len(CACHE_COLUMNS))})
                 ON CONFLICT(original_url) DO UPDATE SET
-                    confidence_score = excluded.confidence_score,
-                    confidence_level = excluded.confidence_level,
-                    extracted_text = excluded.extracted_text,
-                    credibility_assessment = excluded.credibility_assessment,
-                    fact_verification_results = excluded.fact_verification_results,
-                    sources_used = excluded.sources_used,
-                    metadata_assessment = excluded.metadata_assessment,
-                    last_accessed_at = excluded.last_accessed_at,
                     access_count = access_count + 1,
-                    expires_at = excluded.expires_at,
-                    cache_status = excluded.cache_status
+{updates}
                 """,
-                (
-                    url, url_hash, result.get('domain', ''), result.get('title'), result.get('author'), result.get('publication_date'),
-                    result.get('content_type'), result.get('content_length', 0), result['confidence_score'], result['confidence_level'],
-                    result['score_components'].get('source_credibility', 0.0), result['score_components'].get('content_consistency', 0.0), result['score_components'].get('verification_coverage', 0.0),
-                    result.get('extracted_text'), result.get('credibility_assessment'), fact_results, sources, result.get('full_analysis', ''), metadata,
-                    processing_time, result.get('openai_tokens_used', 0), result.get('perplexity_calls_made', 1), result.get('extraction_model', 'gpt-4o-mini'),
-                    result.get('first_verified_at', datetime.now().strftime("%Y-%m-%d %H:%M:%S")), datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 1, expires_at, 'fresh'
-                )
+                rows
             )
             self.conn.commit()
+            _note_lookup_keys(self.db_path, 'url_hashes', [row[1] for row in rows])
+            return len(rows)
         except Exception as e:
             print(f"Cache insert error: {e}")
+            return 0
 
     def get_trust_score_from_db(self, key: str, use_full_url: bool = False) -> Optional[float]:
+        if not (self.might_contain_url(key) if use_full_url else self.might_contain_domain(key)):
+            return None
         cursor = self.conn.cursor()
         if use_full_url:
             cursor.execute("SELECT confidence_score FROM url_verification_cache WHERE original_url = ?", (key,))
@@ -224,6 +228,19 @@ class DatabaseManager:
         row = cursor.fetchone()
         return row[0] if row else None
 
+    def get_curated_trust_score(self, domain: str) -> Optional[float]:
+        """Trust score of an active domain from a curated credibility list, skipping rows added after a verification"""
+        if not self.might_contain_domain(domain):
+            return None
+        row = self.conn.execute(
+            """
+            SELECT trust_score FROM domain_credibility
+            WHERE domain = ? AND is_active = 1 AND COALESCE(notes, '') NOT LIKE ?
+            """,
+            (domain, f"{AUTO_ADDED_DOMAIN_NOTES}%")
+        ).fetchone()
+        return row[0] if row else None
+
     def insert_domain(
     self,
     domain: str,
@@ -235,33 +252,29 @@ class DatabaseManager:
     notes: str = ""  
     ):
         """Insert or update a domain in the domain_credibility table"""
+        self.insert_domains_bulk([{
+            'domain': domain, 'trust_score': trust_score, 'category': category, 'bias_level': bias_level,
+            'reliability': reliability, 'source_type': source_type, 'notes': notes
+        }])
+
+    def insert_domains_bulk(self, domains: List[Dict[str, Any]]) -> int:
         try:
-            cursor = self.conn.cursor()
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute(
-                """
-                INSERT INTO domain_credibility (
-                    domain, trust_score, category, bias_level, reliability, source_type,notes,
-                    created_at, updated_at, last_checked, is_active
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(domain) DO UPDATE SET
-                    trust_score = excluded.trust_score,
-                    category = excluded.category,
-                    bias_level = excluded.bias_level,
-                    reliability = excluded.reliability,
-                    source_type = excluded.source_type,
-                    notes = excluded.notes,
-                    updated_at = excluded.updated_at,
-                    last_checked = excluded.last_checked
+            rows = [domain_row(**domain) for domain in domains]
+            updates = ', '.join(f"{column} = excluded.{column}" for column in DOMAIN_UPDATE_COLUMNS)
+            self.conn.executemany(
+                f"""
+                INSERT INTO domain_credibility ({', '.join(DOMAIN_COLUMNS)})
+                VALUES ({', '.join('?' * len(DOMAIN_COLUMNS))})
+                ON CONFLICT(domain) DO UPDATE SET {updates}
                 """,
-                (
-                    domain, trust_score, category, bias_level, reliability, source_type,notes,
-                    now, now, now, 1
-                )
+                rows
             )
             self.conn.commit()
+            _note_lookup_keys(self.db_path, 'domains', [row[0] for row in rows])
+            return len(rows)
         except Exception as e:
             print(f"Domain insert error: {e}")
+            return 0
 
     def close(self):
         self.conn.close()
\ No newline at end of file
@@ -1,224 +1,250 @@
-
-
-import openai
-from datetime import datetime
+import argparse
+import asyncio
+import sqlite3
+import time
 import uuid
-import json
-from config import CONFIG  
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from config import CONFIG
+from llm_clients import get_async_client, close_async_clients
+from llm_scheduler import get_scheduler, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from token_counter import count_tokens, truncate_to_tokens
+from span_aligner import SpanAligner
+from streaming_json_parser import GranulatedContentParser
+from research_store import ResearchStore
+from migrations import apply_migrations
 
-openai.api_key = CONFIG["openai_api_key"]
+RESEARCH_MODEL = "gpt-4o-mini"
 
-def generate_research_outputs(article_text: str, source: str = "unknown") -> dict:
-    document_id = str(uuid.uuid4())
-    timestamp = datetime.utcnow().isoformat() + "Z"
+# Category -> (id prefix, fields requested from the model besides id and confidence_score)
+RESEARCH_CATEGORIES = {
+    "key_phrases": ("kp", ["text", "relevance_score"]),
+    "definitions": ("def", ["term", "definition"]),
+    "examples": ("ex", ["example_text", "illustrates_concept_id"]),
+    "statistics": ("stat", ["text", "value", "unit", "context", "year"]),
+    "quotes": ("q", ["quote_text", "speaker", "speaker_title"]),
+    "questions_posed": ("qp", ["question_text", "is_rhetorical"]),
+    "recommendations": ("rec", ["recommendation_text", "target_entity"]),
+    "causes_effects": ("ce", ["cause_text", "effect_text"]),
+    "comparisons_contrasts": ("cc", ["type", "comparison_text", "entities_compared"]),
+    "problems": ("prob", ["problem_text", "severity_score"]),
+    "solutions": ("sol", ["solution_text", "addresses_problem_id"]),
+    "goals_objectives": ("goal", ["goal_text", "achieved_status"]),
+    "assumptions": ("assump", ["assumption_text"])
+}
 
-    prompt = f"""
-As Style, your primary objective is to act as a highly intelligent and detail-oriented research assistant AI agent for JelloWorld. You will consistently maintain a charismatic, relatable, and empathetic tone in all interactions. You specialize in a comprehensive approach to information gathering, focusing on:
-Sourcing and Consolidating Credible Information: You'll find and synthesize credible sources and evidence from various media, including text, audio, images, and video.
-Deep Research Content Generation: You'll create in-depth research content, such as a two-page research paper, substantiated with detailed information from the latest news, online discussions, and social media. This paper serves as verifiable proof of JelloWorld's engagement with the topic.
-Fact Extraction and Verification: You'll meticulously identify, extract, and verify concise and engaging facts for JelloWorld's daily newsletter and other content.
-Visual Sourcing: You're responsible for identifying and retrieving relevant visuals (images, videos) related to the research topic.
-Content Scheduling (Implicit): Your outputs contribute directly to JelloWorld's consistent daily content schedule.
-Collaboration: You work in conjunction with "Research Planner - Ricardo" and "Project Planner - Pat." Your core expertise lies in transforming raw information into surprising, memorable, and conversation-worthy daily facts, fostering curiosity and community engagement. You are characterized by your meticulousness, creativity, factual accuracy, and commitment to daily output. You also recognize when to seek human assistance.
-Context: The user has provided a specific article or piece of information. Your current task is twofold:
-Provide a detailed, narrative explanation of its context. This explanation should be concise (3-5 sentences) yet comprehensive, covering its historical relevance, necessary background knowledge for understanding the topic, and any notable similar events that have occurred in history or within the same domain. The goal is to provide a rich, informative, and engaging contextualization that prepares the JelloWorld audience for deeper understanding.
-Perform a deeper, structured analysis of the provided content, extracting granular data points for further processing and database integration by JelloWorld's systems.
-Action:
-Analyze the provided article/information: Identify the core subject, key actors, timeline, and main events.
-Generate Narrative Contextual Explanation:
-Research Historical Relevance: Determine the historical period, significant preceding or concurrent events, and long-term implications related to the article's subject.
-Identify Background Knowledge: Pinpoint essential concepts, definitions, or foundational information a general audience would need to grasp the article's significance.
-Recall/Research Similar Events: Search for analogous situations, conflicts, discoveries, or developments that share characteristics with the article's topic, highlighting patterns or recurring themes.
-Synthesize into a concise explanation: Craft a 3-5 sentence explanation that weaves together the historical relevance, background knowledge, and similar events into a coherent and engaging narrative.
-Perform Granular Content Extraction for Deep Research:
-Key Phrases: Identify and extract significant terms and concepts, noting their relevance and confidence.
-Definitions: Extract definitions of key terms mentioned or implied.
-Examples: Identify illustrative examples provided in the text.
-Statistics: Extract numerical data, including values, units, and context.
-Quotes: Pull out direct quotations, noting the speaker if available.
-Questions Posed: Identify any questions raised, distinguishing between rhetorical and non-rhetorical.
-Recommendations: Extract any suggested actions or advice.
-Causes/Effects: Analyze and identify cause-and-effect relationships.
-Comparisons/Contrasts: Note any comparisons or distinctions made between concepts.
-Problems: Identify issues or challenges discussed.
-Solutions: Extract proposed solutions to identified problems.
-Goals/Objectives: Note any stated aims or targets.
-Assumptions: Identify underlying assumptions in the content.
-For each extracted data point, include id, text (or specific fields like term, value, quote_text), start_offset, end_offset (to link back to original text), and confidence_score. For key_phrases, also include relevance_score. For examples and solutions, link to relevant concepts or problems using illustrates_concept_id or addresses_problem_id.
-Format: The output will consist of two distinct parts:
-Narrative Contextual Explanation: A single paragraph of 3-5 sentences, presented as plain text, without any special formatting like bullet points or JSON.
-Structured Granular Data: A JSON object containing the detailed analysis of the article's content.
-Structured Granular Data JSON Schema:
-JSON
-{
-  "document_id": "unique_document_identifier_generated_by_AI",
-  "document_title": "Title of the Original Document (extracted or inferred)",
-  "document_source": "e.g., URL, filename, database ID (if provided in input)",
-  "analysis_timestamp": "YYYY-MM-DDTHH:MM:SSZ",
-  "llm_model_version": "Name_of_LLM_Model_Used",
-  "granulated_content": {
-    "key_phrases": [
-      {
-        "id": "kp_UUID",
-        "text": "text_of_key_phrase",
-        "start_offset": 0,
-        "end_offset": 0,
-        "relevance_score": 0.0,
-        "confidence_score": 0.0
-      }
-    ],
-    "definitions": [
-      {
-        "id": "def_UUID",
-        "term": "term_defined",
-        "definition": "definition_text",
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "examples": [
-      {
-        "id": "ex_UUID",
-        "example_text": "example_text",
-        "illustrates_concept_id": "kp_UUID_or_def_UUID",
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "statistics": [
-      {
-        "id": "stat_UUID",
-        "text": "statistic_text",
-        "value": 0.0,
-        "unit": "unit_of_measurement",
-        "context": "context_of_statistic",
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0,
-        "year": 0 // Optional, if applicable
-      }
-    ],
-    "quotes": [
-      {
-        "id": "q_UUID",
-        "quote_text": "quoted_text",
-        "speaker": "speaker_name",
-        "speaker_title": "speaker_title",
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "questions_posed": [
-      {
-        "id": "qp_UUID",
-        "question_text": "question_text",
-        "is_rhetorical": true,
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "recommendations": [
-      {
-        "id": "rec_UUID",
-        "recommendation_text": "recommendation_text",
-        "target_entity": "entity_to_which_recommendation_is_made",
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "causes_effects": [
-      {
-        "id": "ce_UUID",
-        "cause_text": "cause_description",
-        "effect_text": "effect_description",
-        "cause_start_offset": 0,
-        "cause_end_offset": 0,
-        "effect_start_offset": 0,
-        "effect_end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "comparisons_contrasts": [
-      {
-        "id": "cc_UUID",
-        "type": "comparison_or_contrast",
-        "comparison_text": "comparison_or_contrast_description",
-        "entities_compared": ["entity1", "entity2"],
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "problems": [
-      {
-        "id": "prob_UUID",
-        "problem_text": "problem_description",
-        "severity_score": 0.0,
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "solutions": [
-      {
-        "id": "sol_UUID",
-        "solution_text": "solution_description",
-        "addresses_problem_id": "prob_UUID",
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "goals_objectives": [
-      {
-        "id": "goal_UUID",
-        "goal_text": "goal_description",
-        "achieved_status": "achieved_status_e.g., in_progress, completed",
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ],
-    "assumptions": [
-      {
-        "id": "assump_UUID",
-        "assumption_text": "assumption_description",
-        "start_offset": 0,
-        "end_offset": 0,
-        "confidence_score": 0.0
-      }
-    ]
-  }
+# Fields located in the article after the response arrives, with the prefix of the offset fields they fill
+SPAN_FIELDS = {
+    "key_phrases": [("text", "")],
+    "definitions": [("definition", ""), ("term", "")],
+    "examples": [("example_text", "")],
+    "statistics": [("text", "")],
+    "quotes": [("quote_text", "")],
+    "questions_posed": [("question_text", "")],
+    "recommendations": [("recommendation_text", "")],
+    "causes_effects": [("cause_text", "cause_"), ("effect_text", "effect_")],
+    "comparisons_contrasts": [("comparison_text", "")],
+    "problems": [("problem_text", "")],
+    "solutions": [("solution_text", "")],
+    "goals_objectives": [("goal_text", "")],
+    "assumptions": [("assumption_text", "")]
 }
 
+SYSTEM_PROMPT = "You are a meticulous research assistant that contextualizes articles and extracts granular, verifiable data."
 
-    """
 
-    response = openai.ChatCompletion.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are Style, the research assistant AI for JelloWorld."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.3
+def build_research_prompt(article_text: str) -> str:
+    """Instructions plus the article; offsets are not requested since they are resolved locally"""
+    schema = '\n'.join(
+        f'    "{category}": [{{"id": "{prefix}_1", ' + ', '.join(f'"{field}": ...' for field in fields) + ', "confidence_score": 0.0}]'
+        for category, (prefix, fields) in RESEARCH_CATEGORIES.items()
+    )
+    return (
+        "Analyze the article below and answer with one JSON object:\n"
+        "{\n"
+        '  "document_title": "title, extracted or inferred",\n'
+        '  "narrative_context": "3-5 sentences covering historical relevance, background knowledge and similar events",\n'
+        '  "granulated_content": {\n'
+        f"{schema}\n"
+        "  }\n"
+        "}\n"
+        "Copy text fields verbatim from the article wherever possible. Scores are 0.0-1.0. Link examples and "
+        "solutions to concept or problem ids. Omit categories with nothing to report.\n\n"
+        f"ARTICLE:\n{article_text}"
     )
 
-    result = response['choices'][0]['message']['content']
 
-    # Separate narrative and JSON (assumes they are clearly separated in LLM response)
-    try:
-        narrative, json_str = result.split("{", 1)
-        structured_json = json.loads("{" + json_str)
-    except Exception as e:
-        print("Error parsing response:", e)
-        structured_json = {}
+def resolve_item_offsets(aligner: SpanAligner, category: str, item: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Fill start/end offsets (and a span_match_score) for one item by aligning its text against the article"""
+    item.setdefault("id", f"{RESEARCH_CATEGORIES.get(category, (category, []))[0]}_{index + 1}")
+    span_fields = SPAN_FIELDS.get(category, [])
+    for offset_prefix in dict.fromkeys(p for _, p in span_fields):
+        # Fields sharing an offset prefix are tried in order, e.g. a definition's text before its term
+        candidates = (aligner.align(str(item.get(f) or '')) for f, p in span_fields if p == offset_prefix)
+        span = next((candidate for candidate in candidates if candidate), None)
+        item[f"{offset_prefix}start_offset"] = span[0] if span else None
+        item[f"{offset_prefix}end_offset"] = span[1] if span else None
+        item[f"{offset_prefix}span_match_score"] = round(span[2], 3) if span else 0.0
+    return item
+
+
+def resolve_offsets(granulated_content: Dict[str, Any], article_text: str) -> Dict[str, Any]:
+    """resolve_item_offsets over a complete granulated_content object"""
+    aligner = SpanAligner(article_text)
+    for category, items in granulated_content.items():
+        if not isinstance(items, list):
+            continue
+        for i, item in enumerate(items):
+            if isinstance(item, dict):
+                resolve_item_offsets(aligner, category, item, i)
+    return granulated_content
+
+
+async def generate_research_outputs_async(
+    article_text: str,
+    source: str = "unknown",
+    api_key: Optional[str] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    on_item: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """Run one deep research call without blocking the event loop; safe to run many concurrently
+
+    The response is streamed and parsed incrementally: each granulated_content item gets its offsets and
+    is passed to on_item(category, item) as soon as it completes, and a truncated or interrupted response
+    keeps every item that finished.
+    """
+    document_id = str(uuid.uuid4())
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    start_time = time.time()
+
+    article_text = truncate_to_tokens(article_text, CONFIG["max_tokens_research_input"])
+    prompt = build_research_prompt(article_text)
+    client = get_async_client('openai', api_key)
+    aligner = SpanAligner(article_text)
+    parser = GranulatedContentParser()
+    stream_state = {'model': RESEARCH_MODEL, 'usage': None, 'finish_reason': None}
 
+    async def send():
+        stream = await client.chat.completions.create(
+            model=RESEARCH_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=CONFIG["max_tokens_research"],
+            response_format={"type": "json_object"},
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        try:
+            async for chunk in stream:
+                stream_state['model'] = chunk.model or stream_state['model']
+                if chunk.usage:
+                    stream_state['usage'] = chunk.usage
+                if not chunk.choices:
+                    continue
+                stream_state['finish_reason'] = chunk.choices[0].finish_reason or stream_state['finish_reason']
+                for category, item in parser.feed(chunk.choices[0].delta.content or ''):
+                    resolve_item_offsets(aligner, category, item, len(parser.items[category]) - 1)
+                    if on_item:
+                        on_item(category, item)
+        except Exception as e:
+            # Keep what completed before the stream broke; those tokens are already paid for
+            print(f"Research stream interrupted: {e}")
+        return stream_state
+
+    await get_scheduler().run_async(
+        RESEARCH_MODEL, count_tokens(SYSTEM_PROMPT) + count_tokens(prompt), CONFIG["max_tokens_research"], send,
+        lambda state: (state['usage'].prompt_tokens, state['usage'].completion_tokens),
+        priority
+    )
+    if not parser.complete:
+        item_count = sum(len(items) for items in parser.items.values())
+        print(f"Research output incomplete ({stream_state['finish_reason'] or 'interrupted'}), kept {item_count} complete items")
+
+    usage = stream_state['usage']
     return {
-        "narrative_context": narrative.strip(),
-        "structured_granular_data": structured_json
+        "document_id": document_id,
+        "narrative_context": str(parser.fields.get("narrative_context", "")).strip(),
+        "structured_granular_data": {
+            "document_id": document_id,
+            "document_title": parser.fields.get("document_title", ""),
+            "document_source": source,
+            "analysis_timestamp": timestamp,
+            "llm_model_version": stream_state['model'],
+            "granulated_content": parser.items
+        },
+        "complete": parser.complete,
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0,
+        "latency_seconds": time.time() - start_time
     }
+
+
+def _run(coroutine):
+    """asyncio.run that closes the loop's async clients before the loop is discarded"""
+    async def run_and_close():
+        try:
+            return await coroutine
+        finally:
+            await close_async_clients()
+    return asyncio.run(run_and_close())
+
+
+def generate_research_outputs(article_text: str, source: str = "unknown", api_key: Optional[str] = None) -> dict:
+    """Blocking wrapper for callers outside an event loop"""
+    return _run(generate_research_outputs_async(article_text, source, api_key))
+
+
+async def run_research_batch(
+    articles: List[Tuple[str, str]],
+    research_store: ResearchStore,
+    api_key: Optional[str] = None,
+    concurrency: int = CONFIG["research_concurrency"]
+) -> int:
+    """Research (source, text) pairs concurrently, saving each result under its document_id"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def research(source: str, text: str) -> bool:
+        async with semaphore:
+            try:
+                outputs = await generate_research_outputs_async(text, source, api_key, PRIORITY_BATCH)
+            except Exception as e:
+                print(f"Deep research failed for {source}: {e}")
+                return False
+        research_store.save(outputs)
+        return True
+
+    results = await asyncio.gather(*(research(source, text) for source, text in articles))
+    return sum(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run deep research over cached verifications")
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    parser.add_argument("--limit", type=int, default=10, help="Most recently accessed cached URLs to research")
+    parser.add_argument("--concurrency", type=int, default=CONFIG["research_concurrency"])
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    apply_migrations(conn)
+    research_store = ResearchStore(conn)
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT original_url, extracted_text FROM url_verification_cache
+        WHERE extracted_text IS NOT NULL AND extracted_text != ''
+        ORDER BY last_accessed_at DESC LIMIT ?
+        """,
+        (args.limit,)
+    )
+    articles = cursor.fetchall()
+    start_time = time.time()
+    saved = _run(run_research_batch(articles, research_store, concurrency=args.concurrency))
+    conn.close()
+    print(f"Researched {saved}/{len(articles)} documents in {time.time() - start_time:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
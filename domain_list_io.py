@@ -0,0 +1,212 @@
+import argparse
+import csv
+import json
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from migrations import SOURCE_TYPES, BIAS_LEVELS, RELIABILITY_LEVELS, apply_migrations
+from config import CONFIG
+
+IMPORT_COLUMNS = [
+    'domain', 'trust_score', 'category', 'source_type', 'bias_level', 'reliability',
+    'country_code', 'language', 'notes', 'verification_source', 'created_at', 'updated_at', 'last_checked', 'is_active'
+]
+# Columns an import may overwrite on an existing row; created_at is kept
+UPDATE_COLUMNS = [column for column in IMPORT_COLUMNS if column not in ('domain', 'created_at')]
+
+CONFLICT_RULES = {
+    'replace': "DO UPDATE SET {updates}",
+    'newer': "DO UPDATE SET {updates} WHERE excluded.updated_at > COALESCE(domain_credibility.updated_at, '')",
+    'keep': "DO NOTHING"
+}
+
+
+def _choice(value: Any, allowed: Tuple[str, ...], field: str) -> str:
+    normalized = str(value or 'unknown').strip().lower().replace(' ', '_').replace('-', '_')
+    if normalized not in allowed:
+        raise ValueError(f"{field} {value!r} not in {list(allowed)}")
+    return normalized
+
+
+def validate_domain_row(row: Dict[str, Any], now: str) -> Tuple[Optional[tuple], Optional[str]]:
+    """Normalize one imported row to IMPORT_COLUMNS order; returns (values, None) or (None, error)"""
+    try:
+        domain = str(row.get('domain') or '').strip().lower()
+        if not domain:
+            raise ValueError("domain is empty")
+        trust_score = float(row.get('trust_score'))
+        if not 0.0 <= trust_score <= 1.0:
+            raise ValueError(f"trust_score {trust_score} outside 0..1")
+        is_active = row.get('is_active', 1)
+        if isinstance(is_active, str):
+            is_active = is_active.strip().lower() not in ('0', 'false', 'no', '')
+        updated_at = row.get('updated_at') or now
+        return (
+            domain,
+            trust_score,
+            row.get('category') or 'general',
+            _choice(row.get('source_type'), SOURCE_TYPES, 'source_type'),
+            _choice(row.get('bias_level'), BIAS_LEVELS, 'bias_level'),
+            _choice(row.get('reliability'), RELIABILITY_LEVELS, 'reliability'),
+            row.get('country_code') or None,
+            row.get('language') or 'en',
+            row.get('notes') or '',
+            row.get('verification_source') or None,
+            row.get('created_at') or now,
+            updated_at,
+            row.get('last_checked') or updated_at,
+            1 if is_active else 0
+        ), None
+    except (TypeError, ValueError) as e:
+        return None, str(e)
+
+
+def iter_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream rows from a CSV (header row required) or JSONL domain list"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def _drop_secondary_indexes(conn: sqlite3.Connection) -> List[str]:
+    """Drop the non-unique indexes on domain_credibility and return their SQL"""
+    index_sql = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'domain_credibility' AND sql IS NOT NULL"
+    ).fetchall()
+    deferred = []
+    for name, sql in index_sql:
+        if 'UNIQUE' in sql.upper():
+            continue
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+        deferred.append(sql)
+    conn.commit()
+    return deferred
+
+
+def import_domains(
+    conn: sqlite3.Connection,
+    path: str,
+    on_conflict: str = 'replace',
+    batch_size: int = CONFIG["domain_import_batch_size"],
+    defer_indexes: bool = True
+) -> Dict[str, Any]:
+    """Upsert a domain list in batched transactions; returns counts and the rejected rows
+
+    Each batch commits on its own, so other readers and writers only wait for one batch at a time. With
+    defer_indexes the secondary indexes are dropped before the load and rebuilt after it, also when it
+    fails; in between, lookups on those columns scan the table. A failed batch is rolled back, earlier
+    batches stay written. The database's journal mode is left as it is.
+    """
+    apply_migrations(conn)
+    # Connection-local: fewer fsyncs per batch, reset when the connection closes
+    conn.execute("PRAGMA synchronous=NORMAL")
+    updates = ', '.join(f"{column} = excluded.{column}" for column in UPDATE_COLUMNS)
+    statement = (
+        f"INSERT INTO domain_credibility ({', '.join(IMPORT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(IMPORT_COLUMNS))}) "
+        f"ON CONFLICT(domain) {CONFLICT_RULES[on_conflict].format(updates=updates)}"
+    )
+
+    def write(rows: List[tuple]):
+        conn.executemany(statement, rows)
+        conn.commit()
+        stats['read'] += len(rows)
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    stats = {'read': 0, 'written': 0, 'rejected': []}
+    changes_before = conn.total_changes
+    batch = []
+    deferred = _drop_secondary_indexes(conn) if defer_indexes else []
+    try:
+        for line_number, row in enumerate(iter_rows(path), 1):
+            values, error = validate_domain_row(row, now)
+            if error:
+                stats['rejected'].append((line_number, error))
+                continue
+            batch.append(values)
+            if len(batch) >= batch_size:
+                write(batch)
+                batch = []
+        if batch:
+            write(batch)
+        # Rows skipped by the 'keep' and 'newer' rules do not count as changes
+        stats['written'] = conn.total_changes - changes_before
+    finally:
+        # Discards the failed batch before the indexes are rebuilt
+        if conn.in_transaction:
+            conn.rollback()
+        for sql in deferred:
+            conn.execute(sql)
+        conn.commit()
+    return stats
+
+
+def export_domains(conn: sqlite3.Connection, path: str, active_only: bool = False) -> int:
+    """Stream domain_credibility to CSV or JSONL"""
+    apply_migrations(conn)
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT {', '.join(IMPORT_COLUMNS)} FROM domain_credibility"
+        + (" WHERE is_active = 1" if active_only else "")
+        + " ORDER BY domain"
+    )
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for row in cursor:
+                f.write(json.dumps(dict(zip(IMPORT_COLUMNS, row))) + '\n')
+                count += 1
+        else:
+            writer = csv.writer(f)
+            writer.writerow(IMPORT_COLUMNS)
+            for row in cursor:
+                writer.writerow(row)
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export domain credibility lists (CSV or JSONL)")
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Upsert a domain list into domain_credibility")
+    import_parser.add_argument("path")
+    import_parser.add_argument(
+        "--on-conflict", choices=sorted(CONFLICT_RULES), default="replace",
+        help="replace existing rows, only replace them when the imported updated_at is newer, or keep them"
+    )
+    import_parser.add_argument("--batch-size", type=int, default=CONFIG["domain_import_batch_size"])
+    import_parser.add_argument(
+        "--keep-indexes", action="store_true",
+        help="Maintain secondary indexes during the load instead of rebuilding them afterwards"
+    )
+
+    export_parser = subparsers.add_parser("export", help="Write domain_credibility to a domain list")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--active-only", action="store_true")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    start_time = time.time()
+    if args.command == "import":
+        stats = import_domains(conn, args.path, args.on_conflict, args.batch_size, not args.keep_indexes)
+        for line_number, error in stats['rejected'][:20]:
+            print(f"Rejected row {line_number}: {error}")
+        print(
+            f"Read {stats['read']} valid rows, wrote {stats['written']}, rejected {len(stats['rejected'])} "
+            f"in {time.time() - start_time:.2f}s"
+        )
+    else:
+        count = export_domains(conn, args.path, args.active_only)
+        print(f"Exported {count} domains to {args.path} in {time.time() - start_time:.2f}s")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import json
+import math
+import sqlite3
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from confidence_calculator import ConfidenceCalculator
+from config import CONFIG
+
+
+class DomainReputation:
+    """Class to maintain per-domain score aggregates, updated in O(1) per verification"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.alpha = CONFIG["reputation_ewma_alpha"]
+        self.window_size = CONFIG["reputation_window_size"]
+
+    def get(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Return the aggregate for a domain, with its dispute rate and standard deviation derived"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT domain, verification_count, ewma_score, ewma_variance, recent_scores,
+                   fact_count, disputed_fact_count, updated_at
+            FROM domain_reputation WHERE domain = ?
+            """,
+            (domain,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        aggregate = dict(zip([desc[0] for desc in cursor.description], row))
+        aggregate['recent_scores'] = json.loads(aggregate['recent_scores'] or '[]')
+        aggregate['std_dev'] = math.sqrt(max(aggregate['ewma_variance'], 0.0))
+        aggregate['dispute_rate'] = (
+            aggregate['disputed_fact_count'] / aggregate['fact_count'] if aggregate['fact_count'] else 0.0
+        )
+        return aggregate
+
+    def record(self, domain: str, score: float, fact_verification: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Fold one verification into the domain aggregate and return the updated aggregate
+
+        The read-modify-write runs in a BEGIN IMMEDIATE transaction, so concurrent workers recording the
+        same domain are serialized instead of overwriting each other's update.
+        """
+        try:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.conn.execute("BEGIN IMMEDIATE")
+        except Exception as e:
+            print(f"Domain reputation update error: {e}")
+            return None
+        try:
+            aggregate = self.get(domain)
+            disputed = sum(1 for fact in fact_verification if fact.get('status') != 'Verified')
+            if aggregate is None:
+                count, mean, variance, window = 1, score, 0.0, [score]
+                fact_count, disputed_count = len(fact_verification), disputed
+            else:
+                # Exponentially weighted mean and variance (West's incremental form)
+                delta = score - aggregate['ewma_score']
+                mean = aggregate['ewma_score'] + self.alpha * delta
+                variance = (1 - self.alpha) * (aggregate['ewma_variance'] + self.alpha * delta * delta)
+                count = aggregate['verification_count'] + 1
+                window = (aggregate['recent_scores'] + [score])[-self.window_size:]
+                fact_count = aggregate['fact_count'] + len(fact_verification)
+                disputed_count = aggregate['disputed_fact_count'] + disputed
+
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO domain_reputation (
+                    domain, verification_count, ewma_score, ewma_variance, recent_scores,
+                    fact_count, disputed_fact_count, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    domain, count, mean, variance, json.dumps(window),
+                    fact_count, disputed_count, datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                )
+            )
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Domain reputation update error: {e}")
+            return None
+        return self.get(domain)
+
+    @staticmethod
+    def _level(score: float) -> str:
+        return ConfidenceCalculator.describe_score(score).split(' (')[0]
+
+    def can_skip_verification(self, aggregate: Optional[Dict[str, Any]]) -> Tuple[bool, str]:
+        """Decide whether the aggregate alone is confident enough to answer for a new URL on the domain"""
+        if not aggregate:
+            return False, "No verifications recorded for this domain"
+        if aggregate['verification_count'] < CONFIG["reputation_min_verifications"]:
+            return False, f"Only {aggregate['verification_count']} verifications recorded"
+        if aggregate['std_dev'] > CONFIG["reputation_max_std"]:
+            return False, f"Scores vary too much (std {aggregate['std_dev']:.2f})"
+        if aggregate['dispute_rate'] > CONFIG["reputation_max_dispute_rate"]:
+            return False, f"Dispute rate too high ({aggregate['dispute_rate']:.0%})"
+        level = self._level(aggregate['ewma_score'])
+        if any(self._level(score) != level for score in aggregate['recent_scores']):
+            return False, "Recent scores fall in different confidence levels"
+        return True, (
+            f"{aggregate['verification_count']} verifications, std {aggregate['std_dev']:.2f}, "
+            f"dispute rate {aggregate['dispute_rate']:.0%}"
+        )
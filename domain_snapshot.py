@@ -0,0 +1,130 @@
+import argparse
+import os
+import sqlite3
+import struct
+import time
+from typing import Dict, Tuple
+from domain_snapshot_reader import (
+    DomainSnapshotReader, domain_key, HEADER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SCORE_SCALE,
+    FLAG_ACTIVE, FLAG_TRUSTED, FLAG_UNTRUSTED
+)
+from config import CONFIG
+from migrations import apply_migrations
+
+
+def _load_existing(path: str) -> Tuple[Dict[int, Tuple[int, int]], str]:
+    """Read a previous snapshot back into {key: (quantized score, flags)} plus its watermark"""
+    reader = DomainSnapshotReader(path)
+    try:
+        records = {
+            reader.keys[i]: (reader.scores[i], reader.flags[i])
+            for i in range(reader.count)
+        }
+        return records, reader.watermark
+    finally:
+        reader.close()
+
+
+def _table_counts(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """(domains, active domains) in domain_credibility, counted the way export_snapshot keys them"""
+    return conn.execute(
+        """
+        SELECT COUNT(DISTINCT LOWER(domain)),
+               COUNT(DISTINCT CASE WHEN is_active IS NULL OR is_active THEN LOWER(domain) END)
+        FROM domain_credibility WHERE COALESCE(domain, '') != ''
+        """
+    ).fetchone()
+
+
+def export_snapshot(conn: sqlite3.Connection, path: str, full: bool = False) -> Tuple[int, int]:
+    """Compile domain_credibility into a snapshot; returns (records written, rows read from the database)
+
+    Incremental runs merge the rows updated since the snapshot's watermark. Deleted rows, and rows written
+    with an updated_at older than the watermark (e.g. an imported list keeping its own timestamps), leave
+    the merged record and active counts out of step with the table, which forces a full rebuild.
+    """
+    apply_migrations(conn)
+    records, watermark = {}, ''
+    if not full and os.path.exists(path):
+        try:
+            records, watermark = _load_existing(path)
+        except (ValueError, OSError, struct.error) as e:
+            print(f"Snapshot unreadable, rebuilding: {e}")
+            records, watermark = {}, ''
+
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT domain, trust_score, is_active, updated_at FROM domain_credibility
+        WHERE COALESCE(updated_at, '') >= ?
+        """,
+        (watermark,)
+    )
+    # >= so rows updated within the watermark's second are not missed; re-reading them is harmless
+    rows = cursor.fetchall()
+    changed = not os.path.exists(path) or full
+
+    trusted_domains = CONFIG["trusted_domains"]
+    untrusted_domains = CONFIG["untrusted_domains"]
+    for domain, trust_score, is_active, updated_at in rows:
+        domain = (domain or '').lower()
+        if not domain:
+            continue
+        flags = FLAG_ACTIVE if is_active is None or is_active else 0
+        if domain in trusted_domains:
+            flags |= FLAG_TRUSTED
+        if domain in untrusted_domains:
+            flags |= FLAG_UNTRUSTED
+        score = min(max(float(trust_score or 0.0), 0.0), 1.0)
+        key = domain_key(domain)
+        record = (round(score * SCORE_SCALE), flags)
+        if records.get(key) != record:
+            records[key] = record
+            changed = True
+        watermark = max(watermark, str(updated_at or ''))
+
+    if not full and os.path.exists(path):
+        active = sum(1 for _, flags in records.values() if flags & FLAG_ACTIVE)
+        if (len(records), active) != tuple(_table_counts(conn)):
+            print("Snapshot out of step with domain_credibility (deleted or deactivated domains), rebuilding")
+            return export_snapshot(conn, path, full=True)
+
+    if not changed:
+        return len(records), len(rows)
+
+    keys = sorted(records)
+    count = len(keys)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, count, watermark.encode('ascii')[:28]))
+        f.write(struct.pack(f'<{count}Q', *keys))
+        f.write(struct.pack(f'<{count}H', *(records[key][0] for key in keys)))
+        f.write(bytes(records[key][1] for key in keys))
+    # Atomic swap; readers that already mapped the old file keep their view
+    os.replace(tmp_path, path)
+    return count, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export domain_credibility to a memory-mapped lookup snapshot")
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    parser.add_argument("--output", default=CONFIG["domain_snapshot_path"])
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch instead of merging updated rows")
+    parser.add_argument("--lookup", nargs="*", default=[], help="Look up domains in the written snapshot")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    start_time = time.time()
+    count, changed = export_snapshot(conn, args.output, full=args.full)
+    conn.close()
+    print(f"Snapshot {args.output}: {count} domains, {changed} rows read from the database in {time.time() - start_time:.2f}s")
+
+    if args.lookup:
+        reader = DomainSnapshotReader(args.output)
+        for domain in args.lookup:
+            print(f"{domain}: {reader.lookup(domain)}")
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import hashlib
+import mmap
+import struct
+import sys
+from bisect import bisect_left
+from typing import Dict, Any, Optional
+
+# Standalone on purpose: lookup clients need only this file and a snapshot, not the database or app stack.
+#
+# Snapshot layout (little-endian):
+#   header  <4sHHI28s  magic, version, reserved, record count, source watermark (updated_at)
+#   keys    uint64[n]  blake2b-64 of the lowercased domain, sorted ascending
+#   scores  uint16[n]  trust score quantized to 0..65535
+#   flags   uint8[n]   FLAG_* bits
+SNAPSHOT_MAGIC = b'DSN1'
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct('<4sHHI28s')
+SCORE_SCALE = 65535
+
+FLAG_ACTIVE = 1
+FLAG_TRUSTED = 2
+FLAG_UNTRUSTED = 4
+
+
+def domain_key(domain: str) -> int:
+    return int.from_bytes(hashlib.blake2b(domain.lower().encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class DomainSnapshotReader:
+    """Class to look up domain trust scores in a memory-mapped snapshot"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count, watermark = HEADER.unpack_from(self.mm, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} domain snapshot")
+        self.watermark = watermark.rstrip(b'\0').decode('ascii')
+
+        view = memoryview(self.mm)
+        keys_end = HEADER.size + self.count * 8
+        scores_end = keys_end + self.count * 2
+        # Casting the mapped regions gives zero-copy arrays that bisect can search directly
+        if sys.byteorder == 'little':
+            self.keys = view[HEADER.size:keys_end].cast('Q')
+            self.scores = view[keys_end:scores_end].cast('H')
+        else:
+            self.keys = [int.from_bytes(view[i:i + 8], 'little') for i in range(HEADER.size, keys_end, 8)]
+            self.scores = [int.from_bytes(view[i:i + 2], 'little') for i in range(keys_end, scores_end, 2)]
+        self.flags = view[scores_end:scores_end + self.count]
+
+    def get_by_key(self, key: int) -> Optional[Dict[str, Any]]:
+        i = bisect_left(self.keys, key)
+        if i == self.count or self.keys[i] != key:
+            return None
+        flags = self.flags[i]
+        return {
+            'trust_score': self.scores[i] / SCORE_SCALE,
+            'is_active': bool(flags & FLAG_ACTIVE),
+            'trusted': bool(flags & FLAG_TRUSTED),
+            'untrusted': bool(flags & FLAG_UNTRUSTED)
+        }
+
+    def lookup(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Look up a domain, falling back to its parent domains (news.example.com -> example.com)"""
+        labels = domain.lower().split('.')
+        for start in range(max(len(labels) - 1, 1)):
+            entry = self.get_by_key(domain_key('.'.join(labels[start:])))
+            if entry:
+                return entry
+        return None
+
+    def close(self):
+        self.keys = self.scores = self.flags = None
+        self.mm.close()
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterator, Tuple
+from config import CONFIG
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Record layout in a pack file: magic, SHA-256 of the raw page, compressed length, compressed bytes
+_RECORD_MAGIC = b'HTA1'
+_RECORD_HEADER = struct.Struct('>4s32sQ')
+
+
+class HtmlArchive:
+    """Content-addressed, compressed, append-only archive of raw fetched HTML"""
+
+    def __init__(self, conn: sqlite3.Connection, archive_dir: str = CONFIG["archive_dir"]):
+        self.conn = conn
+        self.archive_dir = archive_dir
+        self.pack_max_bytes = CONFIG["archive_pack_max_bytes"]
+        self.codec = 'zstd' if zstandard else 'zlib'
+        self._maps = {}
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+    def _pack_path(self, pack_id: int) -> str:
+        return os.path.join(self.archive_dir, f"pack-{pack_id:05d}.pack")
+
+    @contextmanager
+    def _write_lock(self):
+        """Exclusive lock on the archive directory, shared by every process appending to its packs"""
+        with open(os.path.join(self.archive_dir, 'archive.lock'), 'a+b') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _current_pack(self, incoming: int) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MAX(pack_id) FROM html_archive_blobs")
+        row = cursor.fetchone()
+        pack_id = row[0] if row and row[0] is not None else 0
+        path = self._pack_path(pack_id)
+        if os.path.exists(path) and os.path.getsize(path) + incoming > self.pack_max_bytes:
+            pack_id += 1
+        return pack_id
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=CONFIG["archive_zstd_level"]).compress(data)
+        return zlib.compress(data, 9)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed archive blobs")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def put(self, url: str, html_content: str, fetch_metadata: Dict[str, Any]) -> str:
+        """Archive a fetched page (deduplicated by content) and record the fetch; returns the content hash"""
+        raw = html_content.encode('utf-8')
+        digest = hashlib.sha256(raw).digest()
+        content_hash = digest.hex()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor = self.conn.cursor()
+
+        cursor.execute("SELECT 1 FROM html_archive_blobs WHERE content_hash = ?", (content_hash,))
+        if not cursor.fetchone():
+            compressed = self._compress(raw)
+            # Choosing the pack, taking the offset, appending and indexing must not interleave with other writers
+            with self._write_lock():
+                cursor.execute("SELECT 1 FROM html_archive_blobs WHERE content_hash = ?", (content_hash,))
+                if not cursor.fetchone():
+                    pack_id = self._current_pack(_RECORD_HEADER.size + len(compressed))
+                    with open(self._pack_path(pack_id), 'ab') as f:
+                        f.seek(0, os.SEEK_END)
+                        offset = f.tell() + _RECORD_HEADER.size
+                        f.write(_RECORD_HEADER.pack(_RECORD_MAGIC, digest, len(compressed)))
+                        f.write(compressed)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    cursor.execute(
+                        """
+                        INSERT OR IGNORE INTO html_archive_blobs (content_hash, pack_id, offset, compressed_length, raw_length, codec, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (content_hash, pack_id, offset, len(compressed), len(raw), self.codec, now)
+                    )
+                    self.conn.commit()
+
+        cursor.execute(
+            """
+            INSERT INTO html_archive_fetches (url, url_hash, content_hash, fetch_metadata, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (url, hashlib.sha256(url.encode('utf-8')).hexdigest(), content_hash, json.dumps(fetch_metadata), now)
+        )
+        self.conn.commit()
+        return content_hash
+
+    def _map_pack(self, pack_id: int, end: int) -> mmap.mmap:
+        """Return a read-only memory map of a pack, remapping if it has grown since it was mapped"""
+        current = self._maps.get(pack_id)
+        if current is None or len(current) < end:
+            if current is not None:
+                current.close()
+            with open(self._pack_path(pack_id), 'rb') as f:
+                current = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[pack_id] = current
+        return current
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """Read an archived page by content hash"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT pack_id, offset, compressed_length, codec FROM html_archive_blobs WHERE content_hash = ?",
+            (content_hash,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        pack_id, offset, length, codec = row
+        pack = self._map_pack(pack_id, offset + length)
+        return self._decompress(pack[offset:offset + length], codec).decode('utf-8')
+
+    def get_latest_for_url(self, url: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (html, fetch_metadata) of the most recent archived fetch of a URL"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT content_hash, fetch_metadata FROM html_archive_fetches WHERE url_hash = ? ORDER BY id DESC LIMIT 1",
+            (hashlib.sha256(url.encode('utf-8')).hexdigest(),)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        html_content = self.get(row[0])
+        return (html_content, json.loads(row[1])) if html_content is not None else None
+
+    def iter_latest_pages(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (url, html, fetch_metadata) for the latest archived fetch of every URL"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT url, content_hash, fetch_metadata FROM html_archive_fetches
+            WHERE id IN (SELECT MAX(id) FROM html_archive_fetches GROUP BY url_hash)
+            ORDER BY id
+            """
+        )
+        for url, content_hash, fetch_metadata in cursor.fetchall():
+            html_content = self.get(content_hash)
+            if html_content is not None:
+                yield url, html_content, json.loads(fetch_metadata)
+
+    def close(self):
+        for pack in self._maps.values():
+            pack.close()
+        self._maps = {}
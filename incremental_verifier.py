@@ -0,0 +1,55 @@
+import hashlib
+import html
+import re
+from typing import Dict, Any, List, Optional
+from claim_store import ClaimStore
+
+_WORD_PATTERN = re.compile(r'\w{3,}')
+
+
+class IncrementalVerifier:
+    """Class to re-verify only the paragraphs of an article that changed since its last verification"""
+
+    @staticmethod
+    def hash_paragraph(paragraph: str) -> str:
+        normalized = re.sub(r'\s+', ' ', paragraph).strip().lower()
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def hash_paragraphs(self, paragraphs: List[str]) -> List[str]:
+        return [self.hash_paragraph(paragraph) for paragraph in paragraphs]
+
+    def find_changed_paragraphs(self, prior_hashes: List[str], paragraphs: List[str]) -> List[int]:
+        """Return the indices of paragraphs that are new or changed since the prior verification"""
+        prior = set(prior_hashes)
+        return [i for i, paragraph in enumerate(paragraphs) if self.hash_paragraph(paragraph) not in prior]
+
+    @staticmethod
+    def build_partial_html(paragraphs: List[str], indices: List[int]) -> str:
+        """Build a minimal HTML document holding only the given paragraphs"""
+        body = ''.join(f"<p>{html.escape(paragraphs[i])}</p>" for i in indices)
+        return f"<html><body>{body}</body></html>"
+
+    def attribute_facts(
+        self,
+        facts: List[Dict[str, Any]],
+        paragraphs: List[str],
+        indices: List[int],
+        claims: Optional[Dict[int, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Tag each fact with the hash of the paragraph it most likely came from; claims as in ClaimStore.claim_for_fact"""
+        if not indices:
+            return facts
+
+        paragraph_words = [(i, set(_WORD_PATTERN.findall(paragraphs[i].lower()))) for i in indices]
+        attributed = []
+        for position, fact in enumerate(facts):
+            claim = ClaimStore.claim_for_fact(claims, position, fact, len(facts)) if claims else None
+            words = set(_WORD_PATTERN.findall((claim or fact['claim']).lower()))
+            best_index = max(paragraph_words, key=lambda item: len(words & item[1]))[0]
+            attributed.append({**fact, 'paragraph_hash': self.hash_paragraph(paragraphs[best_index])})
+        return attributed
+
+    def keep_unchanged_facts(self, prior_facts: List[Dict[str, Any]], paragraphs: List[str]) -> List[Dict[str, Any]]:
+        """Keep prior facts whose source paragraph is still present and unchanged"""
+        current = set(self.hash_paragraphs(paragraphs))
+        return [fact for fact in prior_facts if fact.get('paragraph_hash') in current]
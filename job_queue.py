@@ -0,0 +1,172 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+from config import CONFIG
+from migrations import apply_migrations
+
+# Pipeline stages whose artifacts are checkpointed, in execution order
+STAGES = ["raw_html", "cleaned_html", "reuse_plan", "extracted_text", "perplexity_analysis"]
+
+
+class JobQueue:
+    """Durable SQLite-backed verification job queue with leases and per-stage checkpoints"""
+
+    def __init__(self, db_path: str = CONFIG.get("db_path", "cache.db")):
+        self.db_path = db_path
+        self.lease_seconds = CONFIG["job_lease_seconds"]
+        self.max_attempts = CONFIG["job_max_attempts"]
+        # Autocommit mode so leases can be taken inside explicit BEGIN IMMEDIATE transactions
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        apply_migrations(self.conn)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def enqueue(self, url: str, priority: int = 0) -> int:
+        """Add a URL to the queue and return its job id"""
+        now = self._now()
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "INSERT INTO verification_jobs (url, priority, status, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?)",
+            (url, priority, now, now)
+        )
+        return cursor.lastrowid
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Lease the next queued job, or a job whose previous lease has expired
+
+        An expired lease that already used its last attempt (the worker crashed on it) is marked failed and
+        its checkpoints are dropped.
+        """
+        now = self._now()
+        lease_expires_at = (datetime.now() + timedelta(seconds=self.lease_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                """
+                UPDATE verification_jobs
+                SET status = 'failed', lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = COALESCE(last_error, 'Lease expired on the final attempt'), updated_at = ?
+                WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= ?
+                """,
+                (now, now, self.max_attempts)
+            )
+            if cursor.rowcount:
+                self._drop_failed_checkpoints(cursor)
+            cursor.execute(
+                """
+                SELECT * FROM verification_jobs
+                WHERE (status = 'queued' OR (status = 'leased' AND lease_expires_at < ?))
+                  AND attempts < ?
+                ORDER BY priority DESC, job_id
+                LIMIT 1
+                """,
+                (now, self.max_attempts)
+            )
+            row = cursor.fetchone()
+            if not row:
+                cursor.execute("COMMIT")
+                return None
+            cursor.execute(
+                """
+                UPDATE verification_jobs
+                SET status = 'leased', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1, updated_at = ?
+                WHERE job_id = ?
+                """,
+                (worker_id, lease_expires_at, now, row['job_id'])
+            )
+            cursor.execute("COMMIT")
+            job = dict(row)
+            job.update({'status': 'leased', 'lease_owner': worker_id, 'attempts': row['attempts'] + 1})
+            return job
+        except Exception as e:
+            cursor.execute("ROLLBACK")
+            print(f"Job lease error: {e}")
+            return None
+
+    def extend_lease(self, job_id: int, worker_id: str) -> bool:
+        """Push the visibility timeout forward; returns False if the lease was lost"""
+        lease_expires_at = (datetime.now() + timedelta(seconds=self.lease_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            UPDATE verification_jobs SET lease_expires_at = ?, updated_at = ?
+            WHERE job_id = ? AND lease_owner = ? AND status = 'leased'
+            """,
+            (lease_expires_at, self._now(), job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str):
+        """Mark a job completed and drop its checkpoints, whose artifacts now live in the cache"""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                """
+                UPDATE verification_jobs SET status = 'completed', lease_expires_at = NULL, updated_at = ?
+                WHERE job_id = ? AND lease_owner = ?
+                """,
+                (self._now(), job_id, worker_id)
+            )
+            if cursor.rowcount == 1:
+                cursor.execute("DELETE FROM job_checkpoints WHERE job_id = ?", (job_id,))
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    def fail(self, job_id: int, worker_id: str, error: str):
+        """Release a job after an error; it is retried until max attempts are used up, then its checkpoints are dropped"""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                """
+                UPDATE verification_jobs
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                    lease_owner = NULL, lease_expires_at = NULL, last_error = ?, updated_at = ?
+                WHERE job_id = ? AND lease_owner = ?
+                """,
+                (self.max_attempts, error, self._now(), job_id, worker_id)
+            )
+            self._drop_failed_checkpoints(cursor)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _drop_failed_checkpoints(cursor: sqlite3.Cursor):
+        """Delete the checkpoints of permanently failed jobs, which will never resume"""
+        cursor.execute(
+            "DELETE FROM job_checkpoints WHERE job_id IN (SELECT job_id FROM verification_jobs WHERE status = 'failed')"
+        )
+
+    def save_checkpoint(self, job_id: int, stage: str, artifact: Any):
+        """Persist the artifact of a completed stage"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO job_checkpoints (job_id, stage, artifact, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, stage, json.dumps(artifact), self._now())
+        )
+
+    def load_checkpoints(self, job_id: int) -> Dict[str, Any]:
+        """Return the artifacts of all completed stages of a job, keyed by stage"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT stage, artifact FROM job_checkpoints WHERE job_id = ?", (job_id,))
+        return {row['stage']: json.loads(row['artifact']) for row in cursor.fetchall()}
+
+    def first_incomplete_stage(self, job_id: int) -> Optional[str]:
+        checkpoints = self.load_checkpoints(job_id)
+        for stage in STAGES:
+            if stage not in checkpoints:
+                return stage
+        return None
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,70 @@
+import re
+from typing import Dict, Iterable, List, Set
+from config import CONFIG
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Turn a character trie into a regex alternation that shares common prefixes"""
+    terminal = '' in node
+    branches = []
+    single_chars = []
+    for char in sorted(key for key in node if key):
+        child = _trie_pattern(node[char])
+        if child:
+            branches.append(re.escape(char) + child)
+        else:
+            single_chars.append(re.escape(char))
+
+    if single_chars:
+        branches.append(single_chars[0] if len(single_chars) == 1 else '[' + ''.join(single_chars) + ']')
+    if not branches:
+        return ''
+
+    pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        pattern = '(?:' + pattern + ')?'
+    return pattern
+
+
+class KeywordMatcher:
+    """Multi-keyword matcher compiled once into a single word-bounded pattern and scanned in one pass"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({keyword.lower() for keyword in keywords if keyword})
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        # Lookarounds rather than \b so keywords that start or end with punctuation still match
+        self.pattern = re.compile(r'(?<!\w)(' + _trie_pattern(trie) + r')(?!\w)', re.I) if self.keywords else None
+
+    def find_all(self, text: str) -> List[str]:
+        """Return every keyword hit in order of appearance"""
+        if not self.pattern or not text:
+            return []
+        return [match.group(1).lower() for match in self.pattern.finditer(text)]
+
+    def matched(self, text: str) -> Set[str]:
+        """Return the distinct keywords that occur in the text"""
+        return set(self.find_all(text))
+
+    def counts(self, text: str) -> Dict[str, int]:
+        counts = {}
+        for keyword in self.find_all(text):
+            counts[keyword] = counts.get(keyword, 0) + 1
+        return counts
+
+    def contains_any(self, text: str) -> bool:
+        return bool(self.pattern and text and self.pattern.search(text))
+
+
+_matchers = {}
+
+
+def get_matcher(config_key: str) -> KeywordMatcher:
+    """Return the shared matcher for a keyword list in CONFIG, compiling it on first use"""
+    if config_key not in _matchers:
+        _matchers[config_key] = KeywordMatcher(CONFIG[config_key])
+    return _matchers[config_key]
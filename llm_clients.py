@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+import openai
+from config import CONFIG
+
+# Perplexity exposes an OpenAI-compatible chat completions API
+PROVIDER_BASE_URLS = {
+    'openai': None,
+    'perplexity': CONFIG["perplexity_api_url"].rsplit('/chat/completions', 1)[0]
+}
+DEFAULT_API_KEYS = {
+    'openai': CONFIG["openai_api_key"],
+    'perplexity': CONFIG["perplexity_api_key"]
+}
+
+_clients: Dict[Tuple[str, str], openai.OpenAI] = {}
+# Async connection pools belong to the event loop that opened them, so they are kept per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], openai.AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def _client_options(provider: str, api_key: Optional[str]) -> Dict:
+    if provider not in PROVIDER_BASE_URLS:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    options = {
+        'api_key': api_key or DEFAULT_API_KEYS[provider],
+        # LLMScheduler owns retries so 429 back-off is coordinated across callers
+        'max_retries': 0,
+        'timeout': CONFIG["llm_request_timeout"]
+    }
+    if PROVIDER_BASE_URLS[provider]:
+        options['base_url'] = PROVIDER_BASE_URLS[provider]
+    return options
+
+
+def get_client(provider: str, api_key: Optional[str] = None) -> openai.OpenAI:
+    """Return the shared client for (provider, api_key); its keep-alive connection pool is reused across calls and threads"""
+    options = _client_options(provider, api_key)
+    key = (provider, options['api_key'])
+    with _lock:
+        if key not in _clients:
+            _clients[key] = openai.OpenAI(**options)
+        return _clients[key]
+
+
+def get_async_client(provider: str, api_key: Optional[str] = None) -> openai.AsyncOpenAI:
+    """Async counterpart of get_client, shared per running event loop"""
+    loop = asyncio.get_running_loop()
+    options = _client_options(provider, api_key)
+    key = (provider, options['api_key'])
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        if key not in clients:
+            clients[key] = openai.AsyncOpenAI(**options)
+        return clients[key]
+
+
+def close_clients():
+    """Close every pooled sync client, e.g. at worker shutdown"""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def close_async_clients():
+    """Close the running loop's async clients; call before a short-lived loop (asyncio.run) finishes"""
+    with _lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
@@ -0,0 +1,292 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from config import CONFIG
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+
+class BudgetExceededError(Exception):
+    """Raised when the hourly or daily LLM budget cannot cover even a minimal request"""
+
+
+class TokenBucket:
+    """Per-minute allowance that refills continuously; the level may go negative when usage exceeds a reservation"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(per_minute, 1.0)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= amount
+
+    def give_back(self, amount: float, now: float):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def drain(self, now: float):
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class LLMScheduler:
+    """Class to pace OpenAI and Perplexity calls within per-model RPM/TPM limits and cost budgets
+
+    Each model has a request bucket and a token bucket sized from CONFIG["llm_rate_limits"]. Calls wait
+    in a per-model priority queue (interactive before batch, then arrival order) and only the head of
+    the queue draws from the buckets, so lower-priority work cannot starve the head and the limits are
+    approached smoothly rather than discovered through 429 responses. Spend is tracked per process, so
+    like the rate limits the hourly and daily budgets are scaled by share.
+    """
+
+    def __init__(
+        self,
+        rate_limits: Dict[str, Dict[str, float]] = CONFIG["llm_rate_limits"],
+        pricing: Dict[str, Dict[str, float]] = CONFIG["llm_pricing"],
+        hourly_budget: float = CONFIG["llm_hourly_budget_usd"],
+        daily_budget: float = CONFIG["llm_daily_budget_usd"],
+        share: float = CONFIG["llm_rate_limit_share"]
+    ):
+        self.rate_limits = rate_limits
+        self.pricing = pricing
+        self.hourly_budget = hourly_budget * share
+        self.daily_budget = daily_budget * share
+        self.share = share
+        self._condition = threading.Condition()
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+        self._queues: Dict[str, list] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._sequence = itertools.count()
+        self._spend = deque()
+        self._pending_cost = 0.0
+
+    def _model_buckets(self, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        if model not in self._buckets:
+            limits = self.rate_limits.get(model, self.rate_limits['default'])
+            self._buckets[model] = (TokenBucket(limits['rpm'] * self.share), TokenBucket(limits['tpm'] * self.share))
+        return self._buckets[model]
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        prices = self.pricing.get(model, self.pricing['default'])
+        return (
+            prompt_tokens * prices['input'] / 1_000_000 + completion_tokens * prices['output'] / 1_000_000
+            + prices.get('request', 0.0)
+        )
+
+    def _spent(self, window_seconds: float) -> float:
+        cutoff = time.time() - window_seconds
+        return sum(cost for timestamp, cost in self._spend if timestamp >= cutoff) + self._pending_cost
+
+    def remaining_budget(self) -> float:
+        with self._condition:
+            cutoff = time.time() - 86400
+            while self._spend and self._spend[0][0] < cutoff:
+                self._spend.popleft()
+            return min(self.hourly_budget - self._spent(3600), self.daily_budget - self._spent(86400))
+
+    def fit_prompt_tokens(self, model: str, prompt_tokens: int, max_output_tokens: int) -> int:
+        """How many prompt tokens the remaining budget allows, shrinking prompts as the budget runs low
+
+        Below llm_budget_soft_fraction of the hourly budget the allowance scales down with what is left;
+        raises BudgetExceededError when not even llm_min_prompt_tokens can be afforded.
+        """
+        remaining = self.remaining_budget()
+        prices = self.pricing.get(model, self.pricing['default'])
+        affordable = (remaining - self.estimate_cost(model, 0, max_output_tokens)) * 1_000_000 / max(prices['input'], 1e-9)
+        soft_limit = CONFIG["llm_budget_soft_fraction"] * self.hourly_budget
+        if remaining < soft_limit:
+            affordable = min(affordable, prompt_tokens * max(remaining, 0.0) / soft_limit)
+        allowed = int(min(prompt_tokens, affordable))
+        if allowed < min(prompt_tokens, CONFIG["llm_min_prompt_tokens"]):
+            raise BudgetExceededError(f"LLM budget exhausted (${max(remaining, 0.0):.4f} left)")
+        return allowed
+
+    def _acquire(self, model: str, tokens: int, priority: int, cost: float, claim: Optional[Dict[str, bool]] = None) -> bool:
+        """Block until the model has capacity and reserve it; returns False if the claim was cancelled first"""
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            queue = self._queues.setdefault(model, [])
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    if claim is not None and claim['cancelled']:
+                        return False
+                    if queue[0] == ticket:
+                        requests_bucket, tokens_bucket = self._model_buckets(model)
+                        now = time.monotonic()
+                        wait = max(
+                            self._blocked_until.get(model, 0.0) - now,
+                            requests_bucket.wait_time(1, now),
+                            tokens_bucket.wait_time(tokens, now)
+                        )
+                        if wait <= 0:
+                            requests_bucket.take(1, now)
+                            tokens_bucket.take(tokens, now)
+                            self._pending_cost += cost
+                            if claim is not None:
+                                claim['acquired'] = True
+                            return True
+                        self._condition.wait(timeout=wait)
+                    else:
+                        self._condition.wait()
+            finally:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._condition.notify_all()
+
+    def _cancel_claim(self, model: str, reserved_tokens: int, reserved_cost: float, claim: Dict[str, bool]):
+        """Withdraw an _acquire still waiting in a worker thread, or release what it already reserved"""
+        with self._condition:
+            claim['cancelled'] = True
+            if claim['acquired']:
+                self._settle(model, reserved_tokens, reserved_cost, 0, 0.0)
+            self._condition.notify_all()
+
+    def _settle(self, model: str, reserved_tokens: int, reserved_cost: float, used_tokens: Optional[int], cost: float):
+        with self._condition:
+            self._pending_cost -= reserved_cost
+            if cost:
+                self._spend.append((time.time(), cost))
+            if used_tokens is not None:
+                _, tokens_bucket = self._model_buckets(model)
+                tokens_bucket.give_back(reserved_tokens - used_tokens, time.monotonic())
+            self._condition.notify_all()
+
+    def _penalize(self, model: str, retry_after: float):
+        with self._condition:
+            now = time.monotonic()
+            self._blocked_until[model] = max(self._blocked_until.get(model, 0.0), now + retry_after)
+            for bucket in self._model_buckets(model):
+                bucket.drain(now)
+            self._condition.notify_all()
+
+    def run(
+        self,
+        model: str,
+        prompt_tokens: int,
+        max_output_tokens: int,
+        send: Callable[[], Any],
+        usage: Callable[[Any], Tuple[int, int]],
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Any:
+        """Wait for capacity, call send() and account its actual usage; 429 responses pause the model and retry
+
+        usage(response) returns (prompt_tokens, completion_tokens) as reported by the provider.
+        """
+        # Providers count max_tokens against the TPM limit until the response is known
+        reserved_tokens = prompt_tokens + max_output_tokens
+        reserved_cost = self.estimate_cost(model, prompt_tokens, max_output_tokens)
+        for attempt in range(CONFIG["llm_max_retries"] + 1):
+            self._acquire(model, reserved_tokens, priority, reserved_cost)
+            try:
+                response = send()
+            except Exception as e:
+                if not self._should_retry(model, reserved_tokens, reserved_cost, e, attempt):
+                    raise
+                continue
+            self._account(model, reserved_tokens, reserved_cost, prompt_tokens, max_output_tokens, response, usage)
+            return response
+
+    async def run_async(
+        self,
+        model: str,
+        prompt_tokens: int,
+        max_output_tokens: int,
+        send: Callable[[], Awaitable[Any]],
+        usage: Callable[[Any], Tuple[int, int]],
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Any:
+        """Async variant of run; waiting for capacity happens in a worker thread so the event loop keeps running
+
+        Cancelling the task withdraws the waiting thread, or releases the reservation it already holds.
+        """
+        reserved_tokens = prompt_tokens + max_output_tokens
+        reserved_cost = self.estimate_cost(model, prompt_tokens, max_output_tokens)
+        for attempt in range(CONFIG["llm_max_retries"] + 1):
+            claim = {'cancelled': False, 'acquired': False}
+            try:
+                await asyncio.to_thread(self._acquire, model, reserved_tokens, priority, reserved_cost, claim)
+            except asyncio.CancelledError:
+                self._cancel_claim(model, reserved_tokens, reserved_cost, claim)
+                raise
+            try:
+                response = await send()
+            except asyncio.CancelledError:
+                # The request may have been sent, so its tokens are not given back
+                self._settle(model, reserved_tokens, reserved_cost, None, 0.0)
+                raise
+            except Exception as e:
+                if not self._should_retry(model, reserved_tokens, reserved_cost, e, attempt):
+                    raise
+                continue
+            self._account(model, reserved_tokens, reserved_cost, prompt_tokens, max_output_tokens, response, usage)
+            return response
+
+    def _should_retry(self, model: str, reserved_tokens: int, reserved_cost: float, error: Exception, attempt: int) -> bool:
+        """Release a failed call's reservation; on a 429 pause the model and report whether to retry"""
+        retry_after = _retry_after(error)
+        self._settle(model, reserved_tokens, reserved_cost, None, 0.0)
+        if retry_after is None or attempt == CONFIG["llm_max_retries"]:
+            return False
+        print(f"Rate limited on {model}, retrying in {retry_after:.1f}s")
+        self._penalize(model, retry_after)
+        return True
+
+    def _account(
+        self,
+        model: str,
+        reserved_tokens: int,
+        reserved_cost: float,
+        prompt_tokens: int,
+        max_output_tokens: int,
+        response: Any,
+        usage: Callable[[Any], Tuple[int, int]]
+    ):
+        try:
+            used_prompt, used_completion = usage(response)
+        except Exception:
+            used_prompt, used_completion = prompt_tokens, max_output_tokens
+        self._settle(
+            model, reserved_tokens, reserved_cost, used_prompt + used_completion,
+            self.estimate_cost(model, used_prompt, used_completion)
+        )
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds to back off when error is a 429 from the OpenAI client or requests, otherwise None"""
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) != 429:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError, AttributeError):
+        return CONFIG["llm_retry_after_default"]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler shared by every ContentAnalyzer"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
@@ -6,10 +6,12 @@ import time
 from url_validator import URLValidator
 from content_scraper import ContentScraper
 from deep_research_extractor import generate_research_outputs
-from source_credibility_evaluator import SourceCredibilityEvaluator
 from content_analyzer import ContentAnalyzer
-from confidence_calculator import ConfidenceCalculator
 from database_manager import DatabaseManager
+from storage_backend import create_storage
+from html_archive import HtmlArchive
+from verification_pipeline import VerificationPipeline, VerificationError
+from verification_result import VerificationResult
 from typing import Dict, Optional, Any, List, Tuple
 from pathlib import Path
 from urllib.parse import urlparse
@@ -68,6 +70,8 @@ if 'add_to_cache' not in st.session_state:
     st.session_state.add_to_cache = False
 if 'current_result' not in st.session_state:
     st.session_state.current_result = None
+if 'pending_cache_entry' not in st.session_state:
+    st.session_state.pending_cache_entry = None
 
 def display_results(verification_result: Dict[str, Any]):
     """Display verification results in a user-friendly format"""
@@ -219,38 +223,37 @@ def main():
             st.session_state.url_cache = {}
             st.session_state.add_to_cache = False
             st.session_state.current_result = None
+            st.session_state.pending_cache_entry = None
             st.rerun()
     
     if verify_button and url_input:
         # Initialize classes
         db_manager = DatabaseManager()
+        storage = create_storage(db_manager)
+        pipeline = VerificationPipeline(db_manager, storage, ContentAnalyzer(openai_key, perplexity_key))
         progress_bar = st.progress(0)
         status_text = st.empty()
+        st.session_state.pending_cache_entry = None
         
         try:
             start_time = time.time()
             
-            # Step 1: Check domain_credibility table
+            # Step 1: Check the curated credibility list and the domain reputation aggregate
             domain = urlparse(url_input).netloc
-            trust_score = db_manager.get_trust_score_from_db(domain)
+            trust_score, trust_reason = pipeline.check_domain_trust(domain)
             if trust_score is not None:
-                result = {
-                    'url': url_input,
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    'confidence_score': trust_score,
-                    'confidence_level': (
+                result = VerificationResult(
+                    url=url_input,
+                    confidence_score=trust_score,
+                    confidence_level=(
                         f"🟢 Confidence Level: HIGH ({trust_score:.2%})" if trust_score >= 0.75 else
                         f"🟡 Confidence Level: MEDIUM ({trust_score:.2%})" if trust_score >= 0.3 else
                         f"🔴 Confidence Level: LOW ({trust_score:.2%})"
                     ),
-                    'score_components': {'source_credibility': trust_score, 'content_consistency': 0.0, 'verification_coverage': 0.0},
-                    'extracted_text': '',
-                    'credibility_assessment': f"Domain {domain} found in credibility database with trust score {trust_score:.2%}",
-                    'sources': [],
-                    'full_analysis': '',
-                    'metadata_assessment': {'domain_credibility': f"Trust score: {trust_score:.2%}"},
-                    'fact_verification': []
-                }
+                    score_components={'source_credibility': trust_score, 'content_consistency': 0.0, 'verification_coverage': 0.0},
+                    credibility_assessment=f"Domain {domain} has an established trust score of {trust_score:.2%} ({trust_reason})",
+                    metadata_assessment={'domain_credibility': f"Trust score: {trust_score:.2%}"}
+                )
                 st.session_state.current_verification = result
                 st.session_state.verification_history.append({
                     'url': url_input,
@@ -269,24 +272,9 @@ def main():
             # Step 2: Proceed with full verification
             url_validator = URLValidator()
             content_scraper = ContentScraper()
-            source_credibility_evaluator = SourceCredibilityEvaluator()
-            content_analyzer = ContentAnalyzer()
-            confidence_calculator = ConfidenceCalculator()
             
-            # Initialize result dictionary
-            result = {
-                'url': url_input,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'confidence_score': 0.0,
-                'confidence_level': "🔴 Confidence Level: NONE (0%)",
-                'score_components': {'source_credibility': 0.0, 'content_consistency': 0.0, 'verification_coverage': 0.0},
-                'extracted_text': '',
-                'credibility_assessment': '',
-                'sources': [],
-                'full_analysis': '',
-                'metadata_assessment': {},
-                'fact_verification': []
-            }
+            # Initialize result
+            result = VerificationResult(url=url_input)
             
             # Step 3: Validate URL
             status_text.text("🔍 Validating URL...")
@@ -301,20 +289,33 @@ def main():
             source_type = parsed_url.netloc if parsed_url.netloc else "unknown"
             result['source_type'] = source_type
             
-            # Step 4: Fetch HTML
-            status_text.text("📥 Fetching content...")
-            progress_bar.progress(20)
-            success, html_content, metadata = content_scraper.fetch_html_content(url_input)
-            if not success:
-                result['credibility_assessment'] = html_content
-                st.session_state.current_result = result
-                display_results(result)
-                return
-            
-            # Step 5: Clean HTML
-            status_text.text("🧹 Cleaning content...")
-            progress_bar.progress(40)
-            cleaned_html, clean_stats, extracted_metadata = content_scraper.clean_html(html_content, url_input)
+            if CONFIG["use_streaming_cleaner"]:
+                # Steps 4-5: Fetch and clean in one pass, parsing while the body downloads
+                status_text.text("📥 Fetching and cleaning content...")
+                progress_bar.progress(20)
+                success, cleaned_html, metadata, clean_stats, extracted_metadata = content_scraper.fetch_and_clean_streaming(url_input)
+                if not success:
+                    result['credibility_assessment'] = cleaned_html
+                    st.session_state.current_result = result
+                    display_results(result)
+                    return
+                progress_bar.progress(40)
+            else:
+                # Step 4: Fetch HTML
+                status_text.text("📥 Fetching content...")
+                progress_bar.progress(20)
+                success, html_content, metadata = content_scraper.fetch_html_content(url_input)
+                if not success:
+                    result['credibility_assessment'] = html_content
+                    st.session_state.current_result = result
+                    display_results(result)
+                    return
+                result['raw_content_hash'] = HtmlArchive(db_manager.conn).put(url_input, html_content, metadata)
+                
+                # Step 5: Clean HTML
+                status_text.text("🧹 Cleaning content...")
+                progress_bar.progress(40)
+                cleaned_html, clean_stats, extracted_metadata = content_scraper.clean_html(html_content, url_input)
             result.update({
                 'domain': extracted_metadata.get('domain'),
                 'title': extracted_metadata.get('title'),
@@ -324,63 +325,40 @@ def main():
                 'content_length': metadata.get('content_length', 0)
             })
             
-            # Step 6: Extract text with OpenAI
-            status_text.text("📝 Extracting text...")
-            progress_bar.progress(60)
-            success, extracted_text, extract_metadata = content_analyzer.extract_text_with_openai(cleaned_html, extracted_metadata)
-            if not success:
-                result['credibility_assessment'] = extracted_text
-                st.session_state.current_result = result
-                display_results(result)
-                return
-            result['extracted_text'] = extracted_text
-            result['openai_tokens_used'] = extract_metadata.get('tokens_used', 0)
-            result['extraction_model'] = extract_metadata.get('extraction_model', 'gpt-4o-mini')
+            # Step 5b: Plan reuse: diff paragraphs against the last cached verification of this URL, or
+            # find a near-duplicate article whose verification can be reused
+            paragraphs = content_scraper.extract_paragraphs(cleaned_html)
+            plan = pipeline.plan_reuse(url_input, cleaned_html, paragraphs)
             
-            # Step 7: Analyze with Perplexity
-            status_text.text("🔎 Analyzing credibility...")
-            progress_bar.progress(80)
-            success, analysis_results = content_analyzer.analyze_with_perplexity(extracted_text)
-            if not success:
-                result['credibility_assessment'] = analysis_results.get('error', 'Analysis failed')
-                result['confidence_score'] = 0.1
-                result['confidence_level'] = "🔴 Confidence Level: LOW (10%)"
-                result['score_components'] = {'source_credibility': 0.1, 'content_consistency': 0.1, 'verification_coverage': 0.1}
+            # Steps 6-7: Extract the new or changed text with OpenAI, then analyze unseen claims with Perplexity
+            stage_progress = {
+                'extracted_text': ("📝 Extracting text...", 60),
+                'perplexity_analysis': ("🔎 Analyzing credibility...", 80)
+            }
+            def run_stage(stage, run):
+                status_text.text(stage_progress[stage][0])
+                progress_bar.progress(stage_progress[stage][1])
+                return run()
+            try:
+                analyzed = pipeline.run_analysis(url_input, cleaned_html, extracted_metadata, paragraphs, plan, run_stage)
+            except VerificationError as e:
+                result['credibility_assessment'] = str(e)
+                if e.stage == 'analysis':
+                    result['confidence_score'] = 0.1
+                    result['confidence_level'] = "🔴 Confidence Level: LOW (10%)"
+                    result['score_components'] = {'source_credibility': 0.1, 'content_consistency': 0.1, 'verification_coverage': 0.1}
                 st.session_state.current_result = result
                 display_results(result)
                 return
-            result.update({
-                'credibility_assessment': analysis_results.get('credibility_assessment', 'N/A'),
-                'sources': analysis_results.get('sources', []),
-                'full_analysis': analysis_results.get('full_analysis', ''),
-                'metadata_assessment': analysis_results.get('metadata_assessment', {}),
-                'fact_verification': analysis_results.get('fact_verification', [])
-            })
-            
-            # Step 8: Evaluate source credibility
-            source_credibility_score = source_credibility_evaluator.evaluate_source_credibility(extracted_metadata)
+            if analyzed['reused']:
+                status_text.text("♻️ Reused previous verification...")
+            result.update(pipeline.result_fields(analyzed, paragraphs))
             
-            # Step 9: Calculate confidence score
+            # Steps 8-10: Evaluate source credibility, calculate the confidence score, save the scoring features
+            # and fold the score into the domain aggregate, whose smoothed score goes into domain_credibility
             status_text.text("📊 Calculating confidence...")
             progress_bar.progress(90)
-            confidence_score, confidence_explanation, score_components = confidence_calculator.calculate_confidence_score(
-                analysis_results, extracted_text, extracted_metadata, source_credibility_score, url_valid=True
-            )
-            
-            # Step 10: Insert into domain_credibility
-            notes = f"Automatically added domain based on analysis: {analysis_results.get('credibility_assessment', 'No assessment')}"
-            db_manager.insert_domain(
-                domain, confidence_score, extracted_metadata.get('category', 'general'), 
-                extracted_metadata.get('bias_level', 'unknown'), extracted_metadata.get('reliability', 'unknown'), source_type,notes
-            )
-            
-            # Update result
-            result.update({
-                'confidence_score': confidence_score,
-                'confidence_level': confidence_explanation,
-                'score_components': score_components,
-                'perplexity_calls_made': 1
-            })
+            result.update(pipeline.score_and_record(url_input, analyzed, extracted_metadata))
             
             st.session_state.current_verification = result
             st.session_state.verification_history.append({
@@ -401,18 +379,19 @@ def main():
             
             display_results(result)
             
-            # Step 11: Prompt user to add to url_verification_cache
-            st.subheader("💾 Save to Cache")
-            if st.button("Add Results to Database Cache"):
-                db_manager.insert_cached_result(result, processing_time)
-                st.success("✅ Results added to URL verification cache!")
+            # Step 11: Keep the result for the save button below, whose click reruns the script without verify_button
+            st.session_state.pending_cache_entry = {
+                'result': result,
+                'processing_time': processing_time,
+                'cleaned_html': cleaned_html
+            }
             
             st.divider()
             col1, col2 = st.columns(2)
             with col1:
                 st.download_button(
                     label="📄 Download JSON Report",
-                    data=json.dumps(result, indent=2),
+                    data=json.dumps(result.to_dict(), indent=2),
                     file_name=f"verification_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                     mime="application/json"
                 )
@@ -421,6 +400,17 @@ def main():
             st.error(f"❌ Error: {str(e)}")
             progress_bar.empty()
             status_text.empty()
+    
+    # Prompt user to add the last verification to url_verification_cache
+    pending_entry = st.session_state.pending_cache_entry
+    if pending_entry:
+        st.subheader("💾 Save to Cache")
+        if st.button("Add Results to Database Cache"):
+            db_manager = DatabaseManager()
+            pipeline = VerificationPipeline(db_manager, create_storage(db_manager), ContentAnalyzer())
+            pipeline.store(pending_entry['result'], pending_entry['processing_time'], pending_entry['cleaned_html'])
+            st.session_state.pending_cache_entry = None
+            st.success("✅ Results added to URL verification cache!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,427 @@
+import argparse
+import hashlib
+import sqlite3
+from typing import Callable, List, Tuple
+from config import CONFIG
+
+# Allowed values for the CHECK constraints on domain_credibility
+SOURCE_TYPES = ('news', 'blog', 'academic', 'government', 'social_media', 'commercial', 'fact_checker', 'unknown')
+BIAS_LEVELS = ('low', 'medium', 'high', 'unknown')
+RELIABILITY_LEVELS = ('very_high', 'high', 'medium', 'low', 'very_low', 'unknown')
+CONFIDENCE_LEVELS = ('high', 'medium', 'low')
+CACHE_STATUSES = ('fresh', 'stale', 'expired', 'processing', 'failed')
+
+
+def _in(values: Tuple[str, ...]) -> str:
+    return ', '.join(f"'{value}'" for value in values)
+
+
+DOMAIN_CREDIBILITY_DDL = f"""
+    CREATE TABLE domain_credibility (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        domain TEXT UNIQUE NOT NULL,
+        trust_score REAL NOT NULL CHECK (trust_score >= 0.0 AND trust_score <= 1.0),
+        category TEXT NOT NULL DEFAULT 'general',
+        source_type TEXT CHECK (source_type IN ({_in(SOURCE_TYPES)})) DEFAULT 'unknown',
+        bias_level TEXT CHECK (bias_level IN ({_in(BIAS_LEVELS)})) DEFAULT 'unknown',
+        reliability TEXT CHECK (reliability IN ({_in(RELIABILITY_LEVELS)})) DEFAULT 'unknown',
+        country_code TEXT,
+        language TEXT DEFAULT 'en',
+        notes TEXT,
+        verification_source TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_checked TEXT DEFAULT CURRENT_TIMESTAMP,
+        is_active INTEGER DEFAULT 1
+    )
+"""
+
+URL_VERIFICATION_CACHE_DDL = f"""
+    CREATE TABLE url_verification_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        original_url TEXT UNIQUE NOT NULL,
+        url_hash TEXT UNIQUE NOT NULL,
+        domain TEXT NOT NULL DEFAULT '',
+        title TEXT,
+        author TEXT,
+        publication_date TEXT,
+        content_type TEXT,
+        content_length INTEGER,
+        confidence_score REAL NOT NULL CHECK (confidence_score >= 0.0 AND confidence_score <= 1.0),
+        confidence_level TEXT NOT NULL CHECK (confidence_level IN ({_in(CONFIDENCE_LEVELS)})),
+        source_credibility_score REAL,
+        content_consistency_score REAL,
+        verification_coverage_score REAL,
+        extracted_text TEXT,
+        credibility_assessment TEXT,
+        fact_verification_results TEXT,
+        sources_used TEXT,
+        full_perplexity_analysis TEXT,
+        metadata_assessment TEXT,
+        processing_time_seconds REAL,
+        openai_tokens_used INTEGER DEFAULT 0,
+        perplexity_calls_made INTEGER DEFAULT 0,
+        extraction_model TEXT DEFAULT 'gpt-4o-mini',
+        first_verified_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_accessed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        access_count INTEGER DEFAULT 1,
+        expires_at TEXT,
+        cache_status TEXT CHECK (cache_status IN ({_in(CACHE_STATUSES)})) DEFAULT 'fresh',
+        paragraph_hashes TEXT,
+        raw_content_hash TEXT
+    )
+"""
+
+
+def confidence_level_key(score: float) -> str:
+    """Map a confidence score to the level stored in url_verification_cache.confidence_level"""
+    if score >= 0.75:
+        return 'high'
+    if score >= 0.3:
+        return 'medium'
+    return 'low'
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str, ddl: str, select_exprs: dict):
+    """Recreate a table from its DDL, copying rows through per-column SQL expressions over the old table
+
+    select_exprs maps a new column to an expression; columns without one are copied when the old table has them.
+    """
+    new_columns = _table_columns_from_ddl(conn, ddl)
+    old_columns = _table_columns(conn, table)
+    conn.execute(ddl.replace(f"CREATE TABLE {table}", f"CREATE TABLE {table}_migrated", 1))
+    if old_columns:
+        columns, exprs = [], []
+        for column in new_columns:
+            if column in select_exprs:
+                columns.append(column)
+                exprs.append(select_exprs[column].format(**{name: name if name in old_columns else 'NULL' for name in new_columns}))
+            elif column in old_columns:
+                columns.append(column)
+                exprs.append(column)
+        conn.execute(f"INSERT INTO {table}_migrated ({', '.join(columns)}) SELECT {', '.join(exprs)} FROM {table}")
+        conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}_migrated RENAME TO {table}")
+
+
+def _table_columns_from_ddl(conn: sqlite3.Connection, ddl: str) -> List[str]:
+    probe = sqlite3.connect(':memory:')
+    probe.execute(ddl)
+    table = ddl.split('CREATE TABLE', 1)[1].split('(', 1)[0].strip()
+    columns = _table_columns(probe, table)
+    probe.close()
+    return columns
+
+
+def _choice_expr(column: str, allowed: Tuple[str, ...]) -> str:
+    normalized = f"REPLACE(LOWER(TRIM({{{column}}})), ' ', '_')"
+    return f"CASE WHEN {normalized} IN ({_in(allowed)}) THEN {normalized} ELSE 'unknown' END"
+
+
+def migrate_domain_credibility(conn: sqlite3.Connection):
+    """Converge domain_credibility on one schema and fold in the legacy create_sqlite_db domains table"""
+    _rebuild_table(conn, 'domain_credibility', DOMAIN_CREDIBILITY_DDL, {
+        'trust_score': "MIN(MAX(COALESCE({trust_score}, 0.0), 0.0), 1.0)",
+        'category': "COALESCE({category}, 'general')",
+        'source_type': _choice_expr('source_type', SOURCE_TYPES),
+        'bias_level': _choice_expr('bias_level', BIAS_LEVELS),
+        'reliability': _choice_expr('reliability', RELIABILITY_LEVELS),
+        'is_active': "COALESCE({is_active}, 1)"
+    })
+
+    if _table_columns(conn, 'domains'):
+        # Rows already in domain_credibility win; the legacy table only fills gaps
+        conn.execute(
+            f"""
+            INSERT INTO domain_credibility (
+                domain, trust_score, category, source_type, bias_level, reliability, notes,
+                created_at, updated_at, last_checked, is_active
+            )
+            SELECT LOWER(domain), MIN(MAX(COALESCE(trust_score, 0.0), 0.0), 1.0), COALESCE(category, 'general'),
+                   {_choice_expr('category', SOURCE_TYPES).format(category='category')},
+                   {_choice_expr('bias_level', BIAS_LEVELS).format(bias_level='bias_level')},
+                   {_choice_expr('reliability', RELIABILITY_LEVELS).format(reliability='reliability')},
+                   notes, last_updated, last_updated, last_updated, COALESCE(active, 1)
+            FROM domains WHERE domain IS NOT NULL
+            ON CONFLICT(domain) DO NOTHING
+            """
+        )
+        conn.execute("DROP TABLE domains")
+
+
+def migrate_url_verification_cache(conn: sqlite3.Connection):
+    """Converge url_verification_cache on one schema, normalizing levels and statuses to the CHECK values"""
+    conn.create_function(
+        'sha256_hex', 1, lambda value: hashlib.sha256(value.encode('utf-8')).hexdigest() if value else None
+    )
+    conn.create_function('confidence_level_key', 1, lambda score: confidence_level_key(score or 0.0))
+    _rebuild_table(conn, 'url_verification_cache', URL_VERIFICATION_CACHE_DDL, {
+        'url_hash': "COALESCE({url_hash}, sha256_hex(original_url))",
+        'domain': "COALESCE({domain}, '')",
+        'confidence_score': "MIN(MAX(COALESCE({confidence_score}, 0.0), 0.0), 1.0)",
+        # Older writers stored the full explanation text; keep only the level
+        'confidence_level': (
+            f"CASE WHEN LOWER({{confidence_level}}) IN ({_in(CONFIDENCE_LEVELS)}) THEN LOWER({{confidence_level}}) "
+            f"ELSE confidence_level_key({{confidence_score}}) END"
+        ),
+        'cache_status': (
+            f"CASE WHEN {{cache_status}} IN ({_in(CACHE_STATUSES)}) THEN {{cache_status}} ELSE 'fresh' END"
+        )
+    })
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS simple_url_cache (
+            url TEXT PRIMARY KEY,
+            result_json TEXT,
+            timestamp TEXT,
+            processing_time REAL
+        )
+        """
+    )
+
+
+def add_query_indexes(conn: sqlite3.Connection):
+    """Index the columns the lookup, expiry and export paths filter on"""
+    for statement in [
+        "CREATE INDEX IF NOT EXISTS idx_domain_credibility_updated_at ON domain_credibility (updated_at)",
+        "CREATE INDEX IF NOT EXISTS idx_url_cache_domain ON url_verification_cache (domain)",
+        "CREATE INDEX IF NOT EXISTS idx_url_cache_expires_at ON url_verification_cache (expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_url_cache_status ON url_verification_cache (cache_status)",
+        "CREATE INDEX IF NOT EXISTS idx_url_cache_last_accessed_at ON url_verification_cache (last_accessed_at)"
+    ]:
+        conn.execute(statement)
+
+
+# The feature tables below used to be created by their classes on first use, so the statements keep
+# IF NOT EXISTS to adopt tables that databases created before these migrations already have
+
+def create_job_queue_tables(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS verification_jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            priority INTEGER DEFAULT 0,
+            status TEXT CHECK(status IN ('queued', 'leased', 'completed', 'failed')) DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires_at TEXT,
+            last_error TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_lease ON verification_jobs (status, lease_expires_at)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_checkpoints (
+            job_id INTEGER,
+            stage TEXT,
+            artifact TEXT,
+            created_at TEXT,
+            PRIMARY KEY (job_id, stage)
+        )
+        """
+    )
+
+
+def create_html_archive_tables(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS html_archive_blobs (
+            content_hash TEXT PRIMARY KEY,
+            pack_id INTEGER,
+            offset INTEGER,
+            compressed_length INTEGER,
+            raw_length INTEGER,
+            codec TEXT,
+            created_at TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS html_archive_fetches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT,
+            url_hash TEXT,
+            content_hash TEXT,
+            fetch_metadata TEXT,
+            fetched_at TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_archive_fetches_url_hash ON html_archive_fetches (url_hash)")
+
+
+def create_claim_verdicts(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS claim_verdicts (
+            fingerprint TEXT PRIMARY KEY,
+            normalized_claim TEXT,
+            claim_text TEXT,
+            verdict TEXT,
+            sources TEXT,
+            source_url TEXT,
+            verified_at TEXT
+        )
+        """
+    )
+
+
+def create_near_duplicate_tables(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS near_duplicate_signatures (
+            url_hash TEXT PRIMARY KEY,
+            original_url TEXT,
+            signature BLOB,
+            shingle_count INTEGER,
+            created_at TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS near_duplicate_buckets (
+            band INTEGER,
+            bucket INTEGER,
+            url_hash TEXT,
+            PRIMARY KEY (band, bucket, url_hash)
+        )
+        """
+    )
+
+
+def create_domain_reputation(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS domain_reputation (
+            domain TEXT PRIMARY KEY,
+            verification_count INTEGER,
+            ewma_score REAL,
+            ewma_variance REAL,
+            recent_scores TEXT,
+            fact_count INTEGER,
+            disputed_fact_count INTEGER,
+            updated_at TEXT
+        )
+        """
+    )
+
+
+def create_scoring_features(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scoring_features (
+            url_hash TEXT PRIMARY KEY,
+            original_url TEXT,
+            schema_version INTEGER,
+            domain TEXT,
+            author TEXT,
+            publication_date TEXT,
+            source_credibility_score REAL,
+            fact_count INTEGER,
+            verified_fact_count INTEGER,
+            source_count INTEGER,
+            positive_indicator_count INTEGER,
+            negative_indicator_count INTEGER,
+            word_count INTEGER,
+            is_sensitive INTEGER,
+            domain_credibility_verdict TEXT,
+            author_credibility_verdict TEXT,
+            created_at TEXT
+        )
+        """
+    )
+
+
+def create_research_outputs(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS research_outputs (
+            document_id TEXT PRIMARY KEY,
+            document_source TEXT,
+            document_title TEXT,
+            narrative_context TEXT,
+            granulated_content BLOB,
+            llm_model_version TEXT,
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            latency_seconds REAL,
+            analysis_timestamp TEXT,
+            created_at TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_research_outputs_source ON research_outputs (document_source)")
+
+
+# Append only; the position in this list (1-based) is the schema version recorded in PRAGMA user_version
+MIGRATIONS: List[Tuple[str, Callable[[sqlite3.Connection], None]]] = [
+    ("Unify domain_credibility and fold in the legacy domains table", migrate_domain_credibility),
+    ("Unify url_verification_cache and create simple_url_cache", migrate_url_verification_cache),
+    ("Add indexes for domain, url_hash, expiry, status and access lookups", add_query_indexes),
+    ("Create the verification job queue and stage checkpoints", create_job_queue_tables),
+    ("Create the raw HTML archive index", create_html_archive_tables),
+    ("Create claim_verdicts", create_claim_verdicts),
+    ("Create the near-duplicate signature and LSH bucket tables", create_near_duplicate_tables),
+    ("Create domain_reputation", create_domain_reputation),
+    ("Create scoring_features", create_scoring_features),
+    ("Create research_outputs", create_research_outputs)
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Bring the database up to the latest schema version; a no-op costing one PRAGMA read when current"""
+    if schema_version(conn) >= len(MIGRATIONS):
+        return schema_version(conn)
+
+    isolation_level = conn.isolation_level
+    conn.commit()
+    conn.isolation_level = None
+    try:
+        # Each migration commits together with its version bump; re-read the version under the
+        # write lock so concurrent starters apply each migration once
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            version = schema_version(conn)
+            if version >= len(MIGRATIONS):
+                conn.execute("COMMIT")
+                break
+            description, migrate = MIGRATIONS[version]
+            try:
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            print(f"Applied schema migration {version + 1}: {description}")
+    finally:
+        conn.isolation_level = isolation_level
+    return schema_version(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or upgrade the verification database schema")
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    print(f"Schema version {apply_migrations(conn)} (latest {len(MIGRATIONS)})")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import hashlib
+import random
+import re
+import sqlite3
+from array import array
+from datetime import datetime
+from typing import List, Optional, Tuple
+from config import CONFIG
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+class NearDuplicateDetector:
+    """Class to detect near-duplicate articles using MinHash signatures and LSH buckets"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.shingle_size = CONFIG["shingle_size"]
+        self.num_perm = CONFIG["minhash_num_perm"]
+        self.bands = CONFIG["minhash_bands"]
+        self.rows_per_band = self.num_perm // self.bands
+        self.threshold = CONFIG["near_duplicate_threshold"]
+        self.min_words = CONFIG["near_duplicate_min_words"]
+
+        # Fixed seed so signatures stay comparable across runs
+        rng = random.Random(1)
+        self.permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(self.num_perm)
+        ]
+
+    def get_shingles(self, cleaned_html: str) -> set:
+        """Build the set of hashed word shingles for the cleaned article text"""
+        text = _TAG_PATTERN.sub(' ', cleaned_html).lower()
+        words = _WORD_PATTERN.findall(text)
+        if len(words) < self.min_words:
+            return set()
+
+        shingles = set()
+        for i in range(len(words) - self.shingle_size + 1):
+            shingle = ' '.join(words[i:i + self.shingle_size]).encode('utf-8')
+            shingles.add(int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), 'big'))
+        return shingles
+
+    def compute_signature(self, shingles: set) -> List[int]:
+        """Compute the MinHash signature of a shingle set"""
+        return [
+            min((a * x + b) % _MERSENNE_PRIME for x in shingles) & _MAX_HASH
+            for a, b in self.permutations
+        ]
+
+    def _band_buckets(self, signature: List[int]) -> List[Tuple[int, int]]:
+        buckets = []
+        for band in range(self.bands):
+            start = band * self.rows_per_band
+            band_bytes = array('I', signature[start:start + self.rows_per_band]).tobytes()
+            bucket = int.from_bytes(hashlib.blake2b(band_bytes, digest_size=8).digest(), 'big') >> 1
+            buckets.append((band, bucket))
+        return buckets
+
+    @staticmethod
+    def estimate_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+        """Estimate Jaccard similarity from two MinHash signatures"""
+        matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+        return matches / len(signature_a) if signature_a else 0.0
+
+    def find_duplicate(self, cleaned_html: str, exclude_url: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Return (original_url, similarity) of the closest indexed article above the threshold"""
+        try:
+            shingles = self.get_shingles(cleaned_html)
+            if not shingles:
+                return None
+            signature = self.compute_signature(shingles)
+
+            cursor = self.conn.cursor()
+            candidates = set()
+            for band, bucket in self._band_buckets(signature):
+                cursor.execute(
+                    "SELECT url_hash FROM near_duplicate_buckets WHERE band = ? AND bucket = ?",
+                    (band, bucket)
+                )
+                candidates.update(row[0] for row in cursor.fetchall())
+            if exclude_url:
+                candidates.discard(hashlib.sha256(exclude_url.encode('utf-8')).hexdigest())
+
+            best_match = None
+            for url_hash in candidates:
+                cursor.execute(
+                    "SELECT original_url, signature FROM near_duplicate_signatures WHERE url_hash = ?",
+                    (url_hash,)
+                )
+                row = cursor.fetchone()
+                if not row:
+                    continue
+                similarity = self.estimate_similarity(signature, array('I', row[1]).tolist())
+                if similarity >= self.threshold and (best_match is None or similarity > best_match[1]):
+                    best_match = (row[0], similarity)
+
+            return best_match
+        except Exception as e:
+            print(f"Near-duplicate lookup error: {e}")
+            return None
+
+    def add_document(self, url: str, cleaned_html: str):
+        """Index the cleaned article text of a verified URL"""
+        try:
+            shingles = self.get_shingles(cleaned_html)
+            if not shingles:
+                return
+            signature = self.compute_signature(shingles)
+            url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM near_duplicate_buckets WHERE url_hash = ?", (url_hash,))
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO near_duplicate_signatures (url_hash, original_url, signature, shingle_count, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (url_hash, url, array('I', signature).tobytes(), len(shingles), now)
+            )
+            cursor.executemany(
+                "INSERT OR IGNORE INTO near_duplicate_buckets (band, bucket, url_hash) VALUES (?, ?, ?)",
+                [(band, bucket, url_hash) for band, bucket in self._band_buckets(signature)]
+            )
+            self.conn.commit()
+        except Exception as e:
+            print(f"Near-duplicate index error: {e}")
@@ -0,0 +1,374 @@
+import argparse
+import io
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from storage_backend import (
+    StorageBackend, cache_row, domain_row, as_record, CACHE_COLUMNS, CACHE_UPDATE_COLUMNS, DOMAIN_COLUMNS, DOMAIN_UPDATE_COLUMNS
+)
+from migrations import SOURCE_TYPES, BIAS_LEVELS, RELIABILITY_LEVELS, CONFIDENCE_LEVELS, CACHE_STATUSES
+from config import CONFIG
+
+try:
+    import psycopg2
+    import psycopg2.pool
+except ImportError:
+    psycopg2 = None
+
+
+def _in(values: Tuple[str, ...]) -> str:
+    return ', '.join(f"'{value}'" for value in values)
+
+
+# Same tables and constraints as the SQLite schema in migrations.py, in PostgreSQL types
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS domain_credibility (
+        id BIGSERIAL PRIMARY KEY,
+        domain TEXT UNIQUE NOT NULL,
+        trust_score DOUBLE PRECISION NOT NULL CHECK (trust_score >= 0.0 AND trust_score <= 1.0),
+        category TEXT NOT NULL DEFAULT 'general',
+        source_type TEXT CHECK (source_type IN ({_in(SOURCE_TYPES)})) DEFAULT 'unknown',
+        bias_level TEXT CHECK (bias_level IN ({_in(BIAS_LEVELS)})) DEFAULT 'unknown',
+        reliability TEXT CHECK (reliability IN ({_in(RELIABILITY_LEVELS)})) DEFAULT 'unknown',
+        country_code TEXT,
+        language TEXT DEFAULT 'en',
+        notes TEXT,
+        verification_source TEXT,
+        created_at TIMESTAMP DEFAULT now(),
+        updated_at TIMESTAMP DEFAULT now(),
+        last_checked TIMESTAMP DEFAULT now(),
+        is_active INTEGER DEFAULT 1
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS url_verification_cache (
+        id BIGSERIAL PRIMARY KEY,
+        original_url TEXT UNIQUE NOT NULL,
+        url_hash TEXT UNIQUE NOT NULL,
+        domain TEXT NOT NULL DEFAULT '',
+        title TEXT,
+        author TEXT,
+        publication_date TEXT,
+        content_type TEXT,
+        content_length INTEGER,
+        confidence_score DOUBLE PRECISION NOT NULL CHECK (confidence_score >= 0.0 AND confidence_score <= 1.0),
+        confidence_level TEXT NOT NULL CHECK (confidence_level IN ({_in(CONFIDENCE_LEVELS)})),
+        source_credibility_score DOUBLE PRECISION,
+        content_consistency_score DOUBLE PRECISION,
+        verification_coverage_score DOUBLE PRECISION,
+        extracted_text TEXT,
+        credibility_assessment TEXT,
+        fact_verification_results JSONB,
+        sources_used JSONB,
+        full_perplexity_analysis TEXT,
+        metadata_assessment JSONB,
+        processing_time_seconds DOUBLE PRECISION,
+        openai_tokens_used INTEGER DEFAULT 0,
+        perplexity_calls_made INTEGER DEFAULT 0,
+        extraction_model TEXT DEFAULT 'gpt-4o-mini',
+        first_verified_at TIMESTAMP DEFAULT now(),
+        last_accessed_at TIMESTAMP DEFAULT now(),
+        access_count INTEGER DEFAULT 1,
+        expires_at TIMESTAMP,
+        cache_status TEXT CHECK (cache_status IN ({_in(CACHE_STATUSES)})) DEFAULT 'fresh',
+        paragraph_hashes JSONB,
+        raw_content_hash TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS simple_url_cache (
+        url TEXT PRIMARY KEY,
+        result_json JSONB,
+        timestamp TIMESTAMP,
+        processing_time DOUBLE PRECISION
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_domain_credibility_updated_at ON domain_credibility (updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_url_cache_domain ON url_verification_cache (domain)",
+    "CREATE INDEX IF NOT EXISTS idx_url_cache_expires_at ON url_verification_cache (expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_url_cache_status ON url_verification_cache (cache_status)",
+    "CREATE INDEX IF NOT EXISTS idx_url_cache_last_accessed_at ON url_verification_cache (last_accessed_at)"
+]
+
+_JSON_CACHE_COLUMNS = {'fact_verification_results', 'sources_used', 'metadata_assessment', 'paragraph_hashes'}
+_TIMESTAMP_COLUMNS = {'created_at', 'updated_at', 'last_checked', 'first_verified_at', 'last_accessed_at', 'expires_at'}
+
+
+def _column_type(column: str) -> str:
+    if column in _JSON_CACHE_COLUMNS:
+        return 'jsonb'
+    if column in _TIMESTAMP_COLUMNS:
+        return 'timestamp'
+    if column in ('trust_score', 'confidence_score', 'source_credibility_score', 'content_consistency_score',
+                  'verification_coverage_score', 'processing_time_seconds'):
+        return 'double precision'
+    if column in ('content_length', 'openai_tokens_used', 'perplexity_calls_made', 'access_count', 'is_active'):
+        return 'integer'
+    return 'text'
+
+
+# Server-side prepared statements, created once per pooled connection: name -> (parameter types, SQL)
+PREPARED_STATEMENTS = {
+    'get_trust_score': (['text'], "SELECT trust_score FROM domain_credibility WHERE domain = $1"),
+    'get_url_score': (['text'], "SELECT confidence_score FROM url_verification_cache WHERE original_url = $1"),
+    # Fetch and record the access in one round trip
+    'get_cached_result': (['text'], """
+        UPDATE url_verification_cache
+        SET access_count = access_count + 1, last_accessed_at = now(), cache_status = 'fresh'
+        WHERE original_url = $1 AND cache_status IN ('fresh', 'stale')
+        RETURNING *
+    """),
+    'upsert_domain': (
+        [_column_type(column) for column in DOMAIN_COLUMNS],
+        f"""
+        INSERT INTO domain_credibility ({', '.join(DOMAIN_COLUMNS)})
+        VALUES ({', '.join(f'${i}' for i in range(1, len(DOMAIN_COLUMNS) + 1))})
+        ON CONFLICT (domain) DO UPDATE SET {', '.join(f'{column} = EXCLUDED.{column}' for column in DOMAIN_UPDATE_COLUMNS)}
+        """
+    ),
+    'upsert_cached_result': (
+        [_column_type(column) for column in CACHE_COLUMNS],
+        f"""
+        INSERT INTO url_verification_cache ({', '.join(CACHE_COLUMNS)})
+        VALUES ({', '.join(f'${i}' for i in range(1, len(CACHE_COLUMNS) + 1))})
+        ON CONFLICT (original_url) DO UPDATE SET
+            access_count = url_verification_cache.access_count + 1,
+            {', '.join(f'{column} = EXCLUDED.{column}' for column in CACHE_UPDATE_COLUMNS)}
+        """
+    ),
+    'get_simple_cached_result': (['text'], "SELECT result_json FROM simple_url_cache WHERE url = $1"),
+    'upsert_simple_cached_result': (['text', 'jsonb', 'timestamp', 'double precision'], """
+        INSERT INTO simple_url_cache (url, result_json, timestamp, processing_time) VALUES ($1, $2, $3, $4)
+        ON CONFLICT (url) DO UPDATE SET
+            result_json = EXCLUDED.result_json, timestamp = EXCLUDED.timestamp, processing_time = EXCLUDED.processing_time
+    """)
+}
+
+
+def _copy_value(value: Any) -> str:
+    """Encode one value for COPY ... FROM STDIN in text format"""
+    if value is None:
+        return '\\N'
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+class PostgresStorage(StorageBackend):
+    """Class to store trust scores and verification results in PostgreSQL, shared across machines"""
+
+    def __init__(self, dsn: str = CONFIG["postgres_dsn"]):
+        if psycopg2 is None:
+            raise ImportError("psycopg2 is required for the postgres storage backend")
+        self.pool = psycopg2.pool.ThreadedConnectionPool(CONFIG["postgres_pool_min"], CONFIG["postgres_pool_max"], dsn)
+        self._prepared = set()
+        # Create the schema before any connection prepares statements against it
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                for statement in SCHEMA:
+                    cursor.execute(statement)
+            conn.commit()
+        finally:
+            self.pool.putconn(conn)
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection with the prepared statements in place; commit on success"""
+        conn = self.pool.getconn()
+        try:
+            if id(conn) not in self._prepared:
+                with conn.cursor() as cursor:
+                    cursor.execute("DEALLOCATE ALL")
+                    for name, (types, sql) in PREPARED_STATEMENTS.items():
+                        cursor.execute(f"PREPARE {name} ({', '.join(types)}) AS {sql}")
+                conn.commit()
+                self._prepared.add(id(conn))
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def _execute(self, name: str, params: tuple, fetch: bool = False):
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+                if fetch:
+                    row = cursor.fetchone()
+                    return dict(zip([desc[0] for desc in cursor.description], row)) if row else None
+
+    def get_trust_score_from_db(self, key: str, use_full_url: bool = False) -> Optional[float]:
+        row = self._execute('get_url_score' if use_full_url else 'get_trust_score', (key,), fetch=True)
+        return next(iter(row.values())) if row else None
+
+    def insert_domain(
+        self,
+        domain: str,
+        trust_score: float,
+        category: str,
+        bias_level: str,
+        reliability: str,
+        source_type: str,
+        notes: str = ""
+    ):
+        try:
+            self._execute('upsert_domain', domain_row(domain, trust_score, category, bias_level, reliability, source_type, notes))
+        except Exception as e:
+            print(f"Domain insert error: {e}")
+
+    def _copy_upsert(self, table: str, columns: List[str], rows: List[tuple], conflict: str, update_sql: str) -> int:
+        """COPY rows into a temporary staging table, then merge them with a single INSERT ... ON CONFLICT"""
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(_copy_value(value) for value in row) + '\n')
+        buffer.seek(0)
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE staging ON COMMIT DROP AS SELECT {', '.join(columns)} FROM {table} WITH NO DATA"
+                )
+                cursor.copy_expert(f"COPY staging ({', '.join(columns)}) FROM STDIN", buffer)
+                # DISTINCT ON keeps one row per key so a batch with repeated keys does not abort the merge
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table} ({', '.join(columns)})
+                    SELECT DISTINCT ON ({conflict}) {', '.join(columns)} FROM staging
+                    ON CONFLICT ({conflict}) DO UPDATE SET {update_sql}
+                    """
+                )
+                return cursor.rowcount
+
+    def insert_domains_bulk(self, domains: List[Dict[str, Any]]) -> int:
+        try:
+            return self._copy_upsert(
+                'domain_credibility', DOMAIN_COLUMNS, [domain_row(**domain) for domain in domains], 'domain',
+                ', '.join(f"{column} = EXCLUDED.{column}" for column in DOMAIN_UPDATE_COLUMNS)
+            )
+        except Exception as e:
+            print(f"Domain insert error: {e}")
+            return 0
+
+    def get_cached_result(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            result = self._execute('get_cached_result', (url,), fetch=True)
+            if result:
+                # Match the SQLite backend, which returns timestamps as text
+                for field in _TIMESTAMP_COLUMNS:
+                    if isinstance(result.get(field), datetime):
+                        result[field] = result[field].strftime("%Y-%m-%d %H:%M:%S")
+            return result
+        except Exception as e:
+            print(f"Cache lookup error: {e}")
+            return None
+
+    def insert_cached_result(self, result: Dict[str, Any], processing_time: float):
+        try:
+            self._execute('upsert_cached_result', cache_row(result, processing_time))
+        except Exception as e:
+            print(f"Cache insert error: {e}")
+
+    def insert_cached_results_bulk(self, results: List[Tuple[Dict[str, Any], float]]) -> int:
+        try:
+            return self._copy_upsert(
+                'url_verification_cache', CACHE_COLUMNS,
+                [cache_row(result, processing_time) for result, processing_time in results], 'original_url',
+                ', '.join(
+                    ['access_count = url_verification_cache.access_count + 1']
+                    + [f"{column} = EXCLUDED.{column}" for column in CACHE_UPDATE_COLUMNS]
+                )
+            )
+        except Exception as e:
+            print(f"Cache insert error: {e}")
+            return 0
+
+    def get_simple_cached_result(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._execute('get_simple_cached_result', (url,), fetch=True)
+            return row['result_json'] if row else None
+        except Exception as e:
+            print(f"Simple cache read error: {e}")
+            return None
+
+    def insert_simple_cached_result(self, url: str, result: Dict[str, Any], processing_time: float):
+        try:
+            self._execute('upsert_simple_cached_result', (url, json.dumps(as_record(result)), datetime.now(), processing_time))
+        except Exception as e:
+            print(f"Simple cache write error: {e}")
+
+    def close(self):
+        self.pool.closeall()
+
+
+def self_check(dsn: str) -> List[str]:
+    """Round-trip every storage operation against a PostgreSQL database; returns the failed checks"""
+    storage = PostgresStorage(dsn)
+    failures = []
+    suffix = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    domain = f"self-check-{suffix}.example"
+    url = f"https://{domain}/article"
+    result = {
+        'url': url, 'domain': domain, 'confidence_score': 0.8, 'confidence_level': 'HIGH',
+        'score_components': {'source_credibility': 0.7, 'content_consistency': 0.9, 'verification_coverage': 0.5},
+        'fact_verification': [{'claim': 'Claim 1: tab\there', 'status': 'Verified'}],
+        'sources': ['https://a.example'], 'metadata_assessment': {'domain_credibility': 'credible'},
+        'extracted_text': 'line one\nline two \\ backslash', 'paragraph_hashes': ['abc']
+    }
+    try:
+        storage.insert_domain(domain, 0.6, 'news', 'low', 'high', domain, 'self check')
+        if storage.get_trust_score_from_db(domain) != 0.6:
+            failures.append("domain upsert and trust lookup")
+
+        storage.insert_cached_result(result, 1.5)
+        cached = storage.get_cached_result(url)
+        if not cached or cached['fact_verification_results'] != result['fact_verification'] or cached['confidence_level'] != 'high':
+            failures.append("cache put and get")
+        if storage.get_trust_score_from_db(url, use_full_url=True) != 0.8:
+            failures.append("URL score lookup")
+
+        bulk_domains = [
+            {'domain': f"bulk-{i}-{domain}", 'trust_score': i / 10, 'category': 'news', 'bias_level': 'low',
+             'reliability': 'high', 'source_type': 'news', 'notes': 'tab\tand newline\n'}
+            for i in range(10)
+        ]
+        if storage.insert_domains_bulk(bulk_domains) != 10 or storage.get_trust_score_from_db(f"bulk-3-{domain}") != 0.3:
+            failures.append("COPY domain upsert")
+
+        bulk_results = [(dict(result, url=f"{url}/{i}"), 0.1) for i in range(5)]
+        if storage.insert_cached_results_bulk(bulk_results) != 5:
+            failures.append("COPY cache upsert")
+        cached = storage.get_cached_result(f"{url}/2")
+        if not cached or cached['extracted_text'] != result['extracted_text'] or cached['sources_used'] != result['sources']:
+            failures.append("COPY cache round trip")
+
+        storage.insert_simple_cached_result(url, {'score': 0.5}, 0.2)
+        if storage.get_simple_cached_result(url) != {'score': 0.5}:
+            failures.append("simple cache")
+    finally:
+        with storage._connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM domain_credibility WHERE domain LIKE %s", (f"%{domain}",))
+                cursor.execute("DELETE FROM url_verification_cache WHERE domain = %s", (domain,))
+                cursor.execute("DELETE FROM simple_url_cache WHERE url = %s", (url,))
+        storage.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the PostgreSQL storage backend against a live database")
+    parser.add_argument("--dsn", default=CONFIG["postgres_dsn"])
+    args = parser.parse_args()
+
+    failures = self_check(args.dsn)
+    for failure in failures:
+        print(f"FAILED {failure}")
+    print("PostgreSQL storage self-check " + ("failed" if failures else "passed"))
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import threading
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, Any, Iterator, Tuple
+from content_scraper import ContentScraper
+from database_manager import DatabaseManager
+from html_archive import HtmlArchive
+from config import CONFIG
+
+_scraper = None
+
+
+def _init_worker():
+    global _scraper
+    _scraper = ContentScraper()
+
+
+def _process_page(page: Tuple[str, str]) -> Dict[str, Any]:
+    """Clean one page and extract its metadata inside a worker process; busy_seconds is the time spent on it"""
+    url, html_content = page
+    start_time = time.perf_counter()
+    try:
+        cleaned_html, clean_stats, metadata = _scraper.clean_html(html_content, url)
+        record = {'url': url, 'cleaned_html': cleaned_html, 'clean_stats': clean_stats, 'metadata': metadata}
+    except Exception as e:
+        record = {'url': url, 'error': str(e)}
+    record['busy_seconds'] = time.perf_counter() - start_time
+    return record
+
+
+def iter_directory_pages(input_dir: str) -> Iterator[Tuple[str, str]]:
+    """Yield (url, html) for every saved .html/.htm file under a directory"""
+    for path in sorted(Path(input_dir).rglob('*')):
+        if path.is_file() and path.suffix.lower() in ('.html', '.htm'):
+            yield path.resolve().as_uri(), path.read_text(encoding='utf-8', errors='replace')
+
+
+def iter_archive_pages(db_path: str, archive_dir: str) -> Iterator[Tuple[str, str]]:
+    """Yield (url, html) for the latest archived fetch of every URL"""
+    db_manager = DatabaseManager(db_path)
+    html_archive = HtmlArchive(db_manager.conn, archive_dir)
+    try:
+        for url, html_content, _ in html_archive.iter_latest_pages():
+            yield url, html_content
+    finally:
+        html_archive.close()
+        db_manager.close()
+
+
+def reprocess(pages: Iterator[Tuple[str, str]], output_path: str, workers: int, chunksize: int) -> Dict[str, Any]:
+    """Fan pages out over a process pool and stream results to JSONL in input order
+
+    Pool.imap's feeder thread would drain the whole pages iterator into the task queue, so pages are
+    gated by a semaphore released per result: at most workers * chunksize * reprocess_inflight_chunks
+    pages are held in memory at once.
+    """
+    start_time = time.time()
+    processed = 0
+    errors = 0
+    busy_seconds = 0.0
+    in_flight = threading.BoundedSemaphore(max(workers * chunksize * CONFIG["reprocess_inflight_chunks"], chunksize))
+
+    def gated_pages() -> Iterator[Tuple[str, str]]:
+        for page in pages:
+            in_flight.acquire()
+            yield page
+
+    with Pool(processes=workers, initializer=_init_worker) as pool, open(output_path, 'w', encoding='utf-8') as out:
+        for record in pool.imap(_process_page, gated_pages(), chunksize=chunksize):
+            in_flight.release()
+            busy_seconds += record.pop('busy_seconds')
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            processed += 1
+            if 'error' in record:
+                errors += 1
+
+    elapsed = time.time() - start_time
+    return {
+        'pages': processed,
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 2),
+        'workers': workers,
+        'pages_per_sec': round(processed / elapsed if elapsed else 0.0, 2),
+        # Throughput of one worker while it is busy, and the share of worker time spent on pages
+        'pages_per_busy_worker_sec': round(processed / busy_seconds if busy_seconds else 0.0, 2),
+        'worker_utilization': round(busy_seconds / (elapsed * workers) if elapsed else 0.0, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run HTML cleaning and metadata extraction over saved pages")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input-dir", help="Directory of saved .html/.htm files")
+    source.add_argument("--archive", action="store_true", help="Reprocess the raw HTML archive")
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    parser.add_argument("--archive-dir", default=CONFIG["archive_dir"])
+    parser.add_argument("--output", required=True, help="JSONL output path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=CONFIG["reprocess_chunksize"])
+    args = parser.parse_args()
+
+    if args.input_dir:
+        pages = iter_directory_pages(args.input_dir)
+    else:
+        pages = iter_archive_pages(args.db_path, args.archive_dir)
+
+    stats = reprocess(pages, args.output, args.workers, args.chunksize)
+    print(
+        f"Reprocessed {stats['pages']} pages ({stats['errors']} errors) in {stats['elapsed_seconds']}s: "
+        f"{stats['pages_per_sec']} pages/sec across {stats['workers']} workers, "
+        f"{stats['pages_per_busy_worker_sec']} pages/sec per busy worker, {stats['worker_utilization']:.0%} utilization"
+    )
+
+
+if __name__ == '__main__':
+    main()
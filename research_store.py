@@ -0,0 +1,51 @@
+import sqlite3
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import result_codec
+
+
+class ResearchStore:
+    """Class to persist deep research outputs, one row per document_id"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def save(self, outputs: Dict[str, Any]):
+        """Store the output of generate_research_outputs; re-saving a document_id replaces it"""
+        data = outputs["structured_granular_data"]
+        try:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO research_outputs (
+                    document_id, document_source, document_title, narrative_context, granulated_content,
+                    llm_model_version, prompt_tokens, completion_tokens, latency_seconds, analysis_timestamp, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    outputs["document_id"], data.get("document_source"), data.get("document_title"),
+                    outputs["narrative_context"], result_codec.encode(data.get("granulated_content", {})),
+                    data.get("llm_model_version"), outputs.get("prompt_tokens", 0), outputs.get("completion_tokens", 0),
+                    outputs.get("latency_seconds", 0.0), data.get("analysis_timestamp"),
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                )
+            )
+            self.conn.commit()
+        except Exception as e:
+            print(f"Research output save error: {e}")
+
+    def load(self, document_id: str) -> Optional[Dict[str, Any]]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM research_outputs WHERE document_id = ?", (document_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        record = dict(zip([desc[0] for desc in cursor.description], row))
+        record["granulated_content"] = result_codec.decode(record["granulated_content"]) or {}
+        return record
+
+    def document_ids_for_source(self, source: str) -> List[str]:
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT document_id FROM research_outputs WHERE document_source = ? ORDER BY created_at DESC", (source,)
+        )
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,86 @@
+import argparse
+import json
+import sqlite3
+import time
+from typing import Any, Union
+from config import CONFIG
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Encoded records start with 0xC1, a byte msgpack never emits and JSON text cannot start with,
+# followed by a format byte; anything else is a legacy JSON row
+_MAGIC = 0xC1
+_FORMAT_MSGPACK = 1
+_FORMAT_JSON = 2
+
+
+def encode(value: Any) -> bytes:
+    """Encode a stored result record in the compact binary format"""
+    if msgpack:
+        return bytes((_MAGIC, _FORMAT_MSGPACK)) + msgpack.packb(value, use_bin_type=True)
+    return bytes((_MAGIC, _FORMAT_JSON)) + json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def decode(data: Union[bytes, str, None]) -> Any:
+    """Decode a record written by encode, or a legacy JSON string"""
+    if data is None or data == '' or data == b'':
+        return None
+    if isinstance(data, str):
+        return json.loads(data)
+    if data[0] != _MAGIC:
+        return json.loads(data)
+    if data[1] == _FORMAT_MSGPACK:
+        if msgpack is None:
+            raise ImportError("msgpack is required to read this record")
+        return msgpack.unpackb(memoryview(data)[2:], raw=False)
+    if data[1] == _FORMAT_JSON:
+        return json.loads(memoryview(data)[2:].tobytes())
+    raise ValueError(f"Unknown result record format {data[1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare JSON and the binary result encoding over the stored simple cache and cached verifications"
+    )
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    records = [decode(row[0]) for row in conn.execute("SELECT result_json FROM simple_url_cache")]
+    for row in conn.execute(
+        "SELECT fact_verification_results, sources_used, metadata_assessment, paragraph_hashes FROM url_verification_cache"
+    ):
+        records.extend(decode(value) for value in row if value)
+    conn.close()
+    if not records:
+        print("No stored records to compare")
+        return
+
+    json_blobs = [json.dumps(record) for record in records]
+    binary_blobs = [encode(record) for record in records]
+    json_bytes = sum(len(blob.encode('utf-8')) for blob in json_blobs)
+    binary_bytes = sum(len(blob) for blob in binary_blobs)
+
+    def timed(run) -> float:
+        start_time = time.perf_counter()
+        for _ in range(args.repeat):
+            run()
+        return (time.perf_counter() - start_time) / args.repeat
+
+    timings = {
+        'json encode': timed(lambda: [json.dumps(record) for record in records]),
+        'binary encode': timed(lambda: [encode(record) for record in records]),
+        'json decode': timed(lambda: [json.loads(blob) for blob in json_blobs]),
+        'binary decode': timed(lambda: [decode(blob) for blob in binary_blobs])
+    }
+    print(f"{len(records)} records: JSON {json_bytes} bytes, binary {binary_bytes} bytes ({binary_bytes / json_bytes:.0%})")
+    for name, seconds in timings.items():
+        print(f"{name}: {seconds * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import sqlite3
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterator, Tuple
+from keyword_matcher import get_matcher
+import result_codec
+from config import CONFIG
+from migrations import apply_migrations
+
+# Bump when fields are added or their meaning changes
+FEATURE_SCHEMA_VERSION = 1
+
+
+@dataclass
+class ScoringFeatures:
+    """Every input ConfidenceCalculator needs, so scores can be recomputed without the LLM output"""
+    domain: str
+    author: Optional[str]
+    publication_date: Optional[str]
+    source_credibility_score: float
+    fact_count: int
+    verified_fact_count: int
+    source_count: int
+    positive_indicator_count: int
+    negative_indicator_count: int
+    word_count: int
+    is_sensitive: bool
+    domain_credibility_verdict: str
+    author_credibility_verdict: str
+    schema_version: int = FEATURE_SCHEMA_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def verdict_flags(self) -> Dict[str, bool]:
+        """The assessment flags under the current verdict-matching rules"""
+        return assessment_flags({
+            'domain_credibility': self.domain_credibility_verdict, 'author_credibility': self.author_credibility_verdict
+        })
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'ScoringFeatures':
+        values = {field.name: row[field.name] for field in fields(cls) if field.name in row}
+        values['is_sensitive'] = bool(values['is_sensitive'])
+        values['domain_credibility_verdict'] = values.get('domain_credibility_verdict') or ''
+        values['author_credibility_verdict'] = values.get('author_credibility_verdict') or ''
+        return cls(**values)
+
+
+def assessment_flags(metadata_assessment: Dict[str, str]) -> Dict[str, bool]:
+    """Reduce Perplexity's domain and author verdicts to the flags that bias the confidence score"""
+    domain_eval = (metadata_assessment.get('domain_credibility') or '').lower()
+    author_eval = (metadata_assessment.get('author_credibility') or '').lower()
+    return {
+        'domain_assessed_not_credible': 'not credible' in domain_eval or 'unreliable' in domain_eval,
+        'domain_assessed_credible': 'credible' in domain_eval,
+        'author_assessed_credible': 'credible' in author_eval,
+        'author_assessed_not_credible': 'not credible' in author_eval
+    }
+
+
+def extract_scoring_features(
+    perplexity_analysis: Dict[str, Any],
+    extracted_text: str,
+    metadata: Dict[str, Any],
+    source_credibility_score: float
+) -> ScoringFeatures:
+    """Reduce an analysis, its extracted text and page metadata to the scoring inputs"""
+    facts = perplexity_analysis.get('fact_verification', [])
+    analysis_text = perplexity_analysis.get('full_analysis', '')
+    metadata_assessment = perplexity_analysis.get('metadata_assessment') or {}
+
+    return ScoringFeatures(
+        domain=(metadata.get('domain') or '').lower(),
+        author=metadata.get('author'),
+        publication_date=metadata.get('publication_date'),
+        source_credibility_score=source_credibility_score,
+        fact_count=len(facts),
+        verified_fact_count=sum(1 for fact in facts if fact['status'] == 'Verified'),
+        source_count=len(perplexity_analysis.get('sources', [])),
+        positive_indicator_count=len(get_matcher("positive_indicators").matched(analysis_text)),
+        negative_indicator_count=len(get_matcher("negative_indicators").matched(analysis_text)),
+        word_count=len(extracted_text.split()),
+        is_sensitive=get_matcher("sensitive_topics").contains_any(extracted_text),
+        domain_credibility_verdict=str(metadata_assessment.get('domain_credibility') or ''),
+        author_credibility_verdict=str(metadata_assessment.get('author_credibility') or '')
+    )
+
+
+class FeatureStore:
+    """Class to persist scoring features per verification"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def save(self, url: str, features: ScoringFeatures):
+        try:
+            record = features.to_dict()
+            columns = ['url_hash', 'original_url'] + list(record) + ['created_at']
+            values = [hashlib.sha256(url.encode('utf-8')).hexdigest(), url] + list(record.values())
+            values.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO scoring_features ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                values
+            )
+            self.conn.commit()
+        except Exception as e:
+            print(f"Feature store error: {e}")
+
+    def load(self, url: str) -> Optional[ScoringFeatures]:
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT * FROM scoring_features WHERE url_hash = ?",
+            (hashlib.sha256(url.encode('utf-8')).hexdigest(),)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return ScoringFeatures.from_row(dict(zip([desc[0] for desc in cursor.description], row)))
+
+    def iter_all(self) -> Iterator[Tuple[str, ScoringFeatures]]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM scoring_features")
+        columns = [desc[0] for desc in cursor.description]
+        for row in cursor:
+            record = dict(zip(columns, row))
+            yield record['original_url'], ScoringFeatures.from_row(record)
+
+    def backfill_from_cache(self) -> int:
+        """Derive features for cached verifications stored before the feature store existed"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT original_url, domain, author, publication_date, source_credibility_score, extracted_text,
+                   fact_verification_results, sources_used, full_perplexity_analysis, metadata_assessment
+            FROM url_verification_cache
+            WHERE url_hash NOT IN (SELECT url_hash FROM scoring_features)
+            """
+        )
+        count = 0
+        for row in cursor.fetchall():
+            url, domain, author, pub_date, source_score, extracted_text, facts, sources, analysis, assessment = row
+            perplexity_analysis = {
+                'fact_verification': result_codec.decode(facts) or [],
+                'sources': result_codec.decode(sources) or [],
+                'full_analysis': analysis or '',
+                'metadata_assessment': result_codec.decode(assessment) or {}
+            }
+            metadata = {'domain': domain, 'author': author, 'publication_date': pub_date}
+            self.save(url, extract_scoring_features(perplexity_analysis, extracted_text or '', metadata, source_score or 0.0))
+            count += 1
+        return count
+
+
+def main():
+    from confidence_calculator import ConfidenceCalculator
+    from source_credibility_evaluator import SourceCredibilityEvaluator
+
+    parser = argparse.ArgumentParser(description="Replay confidence scoring over stored scoring features")
+    parser.add_argument("--db-path", default=CONFIG["db_path"])
+    parser.add_argument("--backfill", action="store_true", help="Derive features for cached rows that have none")
+    parser.add_argument(
+        "--recompute-source", action="store_true",
+        help="Re-evaluate source credibility from domain, author and date with the current trust settings"
+    )
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    apply_migrations(conn)
+    feature_store = FeatureStore(conn)
+    if args.backfill:
+        print(f"Backfilled features for {feature_store.backfill_from_cache()} cached verifications")
+
+    calculator = ConfidenceCalculator()
+    evaluator = SourceCredibilityEvaluator()
+    stored_scores = dict(conn.execute("SELECT original_url, confidence_score FROM url_verification_cache").fetchall())
+    replayed = 0
+    changed_levels = 0
+    total_delta = 0.0
+    for url, features in feature_store.iter_all():
+        source_credibility_score = None
+        if args.recompute_source:
+            source_credibility_score = evaluator.evaluate_source_credibility({
+                'domain': features.domain, 'author': features.author, 'publication_date': features.publication_date
+            })
+        score, explanation, _ = calculator.score_features(features, source_credibility_score)
+        replayed += 1
+        if url in stored_scores and stored_scores[url] is not None:
+            total_delta += abs(score - stored_scores[url])
+            if calculator.describe_score(stored_scores[url]).split(' (')[0] != explanation.split(' (')[0]:
+                changed_levels += 1
+
+    print(f"Replayed {replayed} verifications with the current CONFIG")
+    if replayed:
+        print(f"Mean absolute score change: {total_delta / replayed:.4f}, confidence level changes: {changed_levels}")
+
+
+if __name__ == '__main__':
+    main()
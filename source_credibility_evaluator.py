@@ -5,6 +5,15 @@ from config import CONFIG
 class SourceCredibilityEvaluator:
     """Class to evaluate source credibility based on domain, author, and date"""
 
+    @staticmethod
+    def classify_source_type(domain: str) -> str:
+        """Coarse domain_credibility source_type for a domain, 'unknown' when nothing matches"""
+        domain = (domain or '').lower()
+        for suffix, source_type in CONFIG["source_type_suffixes"].items():
+            if domain == suffix.lstrip('.') or domain.endswith(suffix if suffix.startswith('.') else '.' + suffix):
+                return source_type
+        return 'news' if domain in CONFIG["trusted_domains"] else 'unknown'
+
     def evaluate_source_credibility(self, metadata: Dict[str, Any]) -> float:
         """Evaluate source credibility based on metadata"""
         trusted_domains = CONFIG["trusted_domains"]
@@ -0,0 +1,64 @@
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+from config import CONFIG
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+class SpanAligner:
+    """Class to locate model-quoted snippets in the source text, tolerating paraphrase and reformatting"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.spans: List[Tuple[int, int]] = []
+        self.words: List[str] = []
+        # Words are lowered one by one: lowering the whole text can change its length (e.g. 'İ'), which
+        # would shift every offset after it
+        for match in _WORD_PATTERN.finditer(text):
+            self.spans.append(match.span())
+            self.words.append(match.group().lower())
+        self.positions: Dict[str, List[int]] = defaultdict(list)
+        for i, word in enumerate(self.words):
+            self.positions[word].append(i)
+        self.frequency = Counter(self.words)
+
+    def align(self, snippet: str) -> Optional[Tuple[int, int, float]]:
+        """Return (start_offset, end_offset, score) of the best matching span, or None below the threshold"""
+        if not snippet or not snippet.strip():
+            return None
+        exact = re.search(re.escape(snippet.strip()), self.text, re.I)
+        if exact:
+            return exact.start(), exact.end(), 1.0
+
+        words = [word.lower() for word in _WORD_PATTERN.findall(snippet)]
+        known = [word for word in words if word in self.positions]
+        if not known:
+            return None
+
+        # Anchor candidate windows on the snippet's rarest words in the source
+        anchors = sorted(set(known), key=lambda word: self.frequency[word])[:CONFIG["span_anchor_words"]]
+        candidates = set()
+        for word in anchors:
+            offset = words.index(word)
+            for position in self.positions[word][:CONFIG["span_max_anchor_positions"]]:
+                candidates.add(max(position - offset, 0))
+
+        best = None
+        window = len(words) + max(len(words) // 4, 2)
+        for window_start in candidates:
+            window_words = self.words[window_start:window_start + window]
+            matcher = SequenceMatcher(None, words, window_words, autojunk=False)
+            blocks = [block for block in matcher.get_matching_blocks() if block.size]
+            if not blocks:
+                continue
+            score = sum(block.size for block in blocks) / len(words)
+            if best is None or score > best[2]:
+                first = window_start + blocks[0].b
+                last = window_start + blocks[-1].b + blocks[-1].size - 1
+                best = (self.spans[first][0], self.spans[last][1], score)
+
+        if best is None or best[2] < CONFIG["span_min_match_score"]:
+            return None
+        return best
@@ -0,0 +1,160 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple, Callable
+from migrations import confidence_level_key, SOURCE_TYPES, BIAS_LEVELS, RELIABILITY_LEVELS
+from verification_result import VerificationResult
+from config import CONFIG
+
+# Columns written for every cached verification, in the order used by the bulk writers
+CACHE_COLUMNS = [
+    'original_url', 'url_hash', 'domain', 'title', 'author', 'publication_date',
+    'content_type', 'content_length', 'confidence_score', 'confidence_level',
+    'source_credibility_score', 'content_consistency_score', 'verification_coverage_score',
+    'extracted_text', 'credibility_assessment', 'fact_verification_results',
+    'sources_used', 'full_perplexity_analysis', 'metadata_assessment',
+    'processing_time_seconds', 'openai_tokens_used', 'perplexity_calls_made',
+    'extraction_model', 'first_verified_at', 'last_accessed_at', 'access_count',
+    'expires_at', 'cache_status', 'paragraph_hashes', 'raw_content_hash'
+]
+# Columns refreshed when a URL is verified again
+CACHE_UPDATE_COLUMNS = [
+    'confidence_score', 'confidence_level', 'extracted_text', 'credibility_assessment',
+    'fact_verification_results', 'sources_used', 'metadata_assessment', 'full_perplexity_analysis',
+    'paragraph_hashes', 'raw_content_hash', 'last_accessed_at', 'expires_at', 'cache_status'
+]
+DOMAIN_COLUMNS = [
+    'domain', 'trust_score', 'category', 'bias_level', 'reliability', 'source_type', 'notes',
+    'created_at', 'updated_at', 'last_checked', 'is_active'
+]
+DOMAIN_UPDATE_COLUMNS = [
+    'trust_score', 'category', 'bias_level', 'reliability', 'source_type', 'notes', 'updated_at', 'last_checked'
+]
+# Notes prefix of domains added after a verification; every other domain row comes from a curated list
+AUTO_ADDED_DOMAIN_NOTES = "Automatically added domain based on analysis"
+
+
+def as_record(result) -> Dict[str, Any]:
+    """Plain dict form of a VerificationResult (or an already plain result dict) for serialization"""
+    return result.to_dict() if isinstance(result, VerificationResult) else result
+
+
+def cache_row(result: Dict[str, Any], processing_time: float, encode: Callable[[Any], Any] = json.dumps) -> Tuple:
+    """Flatten a verification result into CACHE_COLUMNS order, encoding the structured fields with encode"""
+    url = result['url']
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return (
+        url, hashlib.sha256(url.encode('utf-8')).hexdigest(), result.get('domain') or '', result.get('title'),
+        result.get('author'), result.get('publication_date'),
+        result.get('content_type'), result.get('content_length', 0), result['confidence_score'],
+        confidence_level_key(result['confidence_score']),
+        result['score_components'].get('source_credibility', 0.0),
+        result['score_components'].get('content_consistency', 0.0),
+        result['score_components'].get('verification_coverage', 0.0),
+        result.get('extracted_text'), result.get('credibility_assessment'),
+        encode(result.get('fact_verification', [])),
+        encode(result.get('sources', [])), result.get('full_analysis', ''),
+        encode(result.get('metadata_assessment', {})),
+        processing_time, result.get('openai_tokens_used', 0), result.get('perplexity_calls_made', 1),
+        result.get('extraction_model', 'gpt-4o-mini'),
+        result.get('first_verified_at', now), now, 1,
+        (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S"), 'fresh',
+        encode(result.get('paragraph_hashes', [])), result.get('raw_content_hash')
+    )
+
+
+def domain_row(
+    domain: str,
+    trust_score: float,
+    category: str,
+    bias_level: str,
+    reliability: str,
+    source_type: str,
+    notes: str = ""
+) -> Tuple:
+    """Build a DOMAIN_COLUMNS row; values outside the CHECK constraints (e.g. a netloc passed as source_type) become 'unknown'"""
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return (
+        domain, trust_score, category,
+        bias_level if bias_level in BIAS_LEVELS else 'unknown',
+        reliability if reliability in RELIABILITY_LEVELS else 'unknown',
+        source_type if source_type in SOURCE_TYPES else 'unknown',
+        notes, now, now, now, 1
+    )
+
+
+class StorageBackend(ABC):
+    """Interface for the trust lookup, domain upsert and verification cache storage"""
+
+    @abstractmethod
+    def get_trust_score_from_db(self, key: str, use_full_url: bool = False) -> Optional[float]:
+        pass
+
+    @abstractmethod
+    def insert_domain(
+        self,
+        domain: str,
+        trust_score: float,
+        category: str,
+        bias_level: str,
+        reliability: str,
+        source_type: str,
+        notes: str = ""
+    ):
+        pass
+
+    @abstractmethod
+    def insert_domains_bulk(self, domains: List[Dict[str, Any]]) -> int:
+        """Upsert many domains (dicts with insert_domain's arguments) in one write"""
+
+    @abstractmethod
+    def get_cached_result(self, url: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def insert_cached_result(self, result: Dict[str, Any], processing_time: float):
+        pass
+
+    @abstractmethod
+    def insert_cached_results_bulk(self, results: List[Tuple[Dict[str, Any], float]]) -> int:
+        """Upsert many (result, processing_time) pairs in one write"""
+
+    @abstractmethod
+    def get_simple_cached_result(self, url: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def insert_simple_cached_result(self, url: str, result: Dict[str, Any], processing_time: float):
+        pass
+
+    def might_contain_domain(self, domain: str) -> bool:
+        """False means the domain is definitely unknown; backends without a filter always answer True"""
+        return True
+
+    def might_contain_url(self, url: str) -> bool:
+        return True
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+_shared_backends: Dict[str, StorageBackend] = {}
+
+
+def create_storage(db_manager: StorageBackend) -> StorageBackend:
+    """Return the configured shared store; the local SQLite DatabaseManager itself when storage_backend is sqlite
+
+    Feature tables (reputation, claims, archive index, ...) stay in the local SQLite database either way.
+    """
+    backend = CONFIG["storage_backend"]
+    if backend == "sqlite":
+        return db_manager
+    if backend == "postgres":
+        # One connection pool per process, shared by every caller
+        if backend not in _shared_backends:
+            from postgres_storage import PostgresStorage
+            _shared_backends[backend] = PostgresStorage(CONFIG["postgres_dsn"])
+        return _shared_backends[backend]
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,275 @@
+import argparse
+import html
+import re
+import sys
+from pathlib import Path
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+import dateutil.parser
+from typing import Tuple, Dict, Any, List, Optional, Callable
+
+_DROP_TAGS = {'script', 'style', 'svg', 'iframe', 'noscript'}
+_BLOCK_TAGS = {
+    'p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'div', 'section',
+    'article', 'main', 'br', 'tr', 'td', 'th', 'ul', 'ol', 'table', 'header', 'footer', 'figcaption'
+}
+# Main-content selectors in ContentScraper.clean_html's order: (tag, attribute, value); the first that matches anywhere wins
+_MAIN_SELECTORS = [
+    ('article', None, None), ('main', None, None), (None, 'role', 'main'), (None, 'class', 'content'),
+    (None, 'id', 'content'), (None, 'class', 'post'), (None, 'class', 'article'), (None, 'class', 'article-body'),
+    (None, 'class', 'story-body')
+]
+_AUTHOR_META = {'author', 'article:author', 'article:author_name'}
+_DATE_META = {
+    'article:published_time', 'publish_date', 'publication_date', 'article:published',
+    'datepublished', 'article_date_time', 'og:article:published_time'
+}
+_DESCRIPTION_META = {'description', 'og:description'}
+_BYLINE_CLASS = re.compile(r'author|by-line|byline', re.I)
+
+
+class StreamingHtmlCleaner(HTMLParser):
+    """Incremental HTML cleaner that drops non-content subtrees and emits main-content paragraphs as they are parsed
+
+    The main content is chosen like ContentScraper.clean_html: every element matching the highest-priority
+    selector in _MAIN_SELECTORS. Text inside lower-priority containers (e.g. a .content wrapper) is held
+    until an <article> or <main> shows up and replaces it, so only <article> paragraphs can be emitted to
+    on_paragraph as they are parsed; any other choice is emitted once the document ends.
+    """
+
+    def __init__(self, url: str, on_paragraph: Optional[Callable[[str], None]] = None):
+        super().__init__(convert_charrefs=True)
+        self.on_paragraph = on_paragraph
+        self.original_size = 0
+        self.metadata = {
+            'domain': urlparse(url).netloc,
+            'title': None,
+            'author': None,
+            'publication_date': None,
+            'description': None
+        }
+        self._title_parts = []
+        self._in_title = False
+        self._in_head = False
+        self._drop_tag = None
+        self._drop_nesting = 0
+        self._containers = []
+        self._best_rank = None
+        self._paragraphs_by_rank = {}
+        self._byline_tag = None
+        self._byline_nesting = 0
+        self._byline_parts = []
+        self._buffer = []
+        self.body_paragraphs = []
+
+    def feed(self, data: str):
+        self.original_size += len(data)
+        super().feed(data)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        text = re.sub(r'\s+', ' ', ''.join(self._buffer)).strip()
+        self._buffer = []
+        if not text:
+            return
+        if self._best_rank is None:
+            # Only kept as a fallback until a main-content container shows up
+            self.body_paragraphs.append(text)
+            return
+        if any(container['rank'] == self._best_rank for container in self._containers):
+            self._paragraphs_by_rank[self._best_rank].append(text)
+            if self._best_rank == 0 and self.on_paragraph:
+                self.on_paragraph(text)
+
+    def _handle_meta(self, attrs: Dict[str, str]):
+        key = (attrs.get('name') or attrs.get('property') or attrs.get('itemprop') or '').lower()
+        content = (attrs.get('content') or '').strip()
+        if not content:
+            return
+        if key in _AUTHOR_META and not self.metadata['author']:
+            self.metadata['author'] = content
+        elif key in _DATE_META and not self.metadata['publication_date']:
+            self._set_date(content)
+        elif key in _DESCRIPTION_META and not self.metadata['description']:
+            self.metadata['description'] = content
+
+    def _set_date(self, value: str):
+        try:
+            self.metadata['publication_date'] = dateutil.parser.parse(value).strftime('%Y-%m-%d')
+        except Exception:
+            pass
+
+    @staticmethod
+    def _container_rank(tag: str, attrs: Dict[str, str]) -> Optional[int]:
+        """Position of the first _MAIN_SELECTORS entry the element matches, or None"""
+        for rank, (selector_tag, attribute, value) in enumerate(_MAIN_SELECTORS):
+            if selector_tag:
+                if tag == selector_tag:
+                    return rank
+            elif attribute == 'class':
+                if value in (attrs.get('class') or '').split():
+                    return rank
+            elif attrs.get(attribute) == value:
+                return rank
+        return None
+
+    def _open_container(self, tag: str, rank: int):
+        if self._best_rank is None or rank < self._best_rank:
+            # A higher-priority container replaces everything collected so far
+            self._best_rank = rank
+            self._paragraphs_by_rank = {rank: []}
+            self.body_paragraphs = []
+        self._containers.append({'tag': tag, 'rank': rank, 'nesting': 1})
+
+    def handle_starttag(self, tag: str, attr_list: List[Tuple[str, Optional[str]]]):
+        if self._drop_tag:
+            if tag == self._drop_tag:
+                self._drop_nesting += 1
+            return
+        if tag in _DROP_TAGS:
+            self._drop_tag, self._drop_nesting = tag, 1
+            return
+
+        attrs = {name: value or '' for name, value in attr_list}
+        if tag == 'head':
+            self._in_head = True
+        elif tag == 'body':
+            self._in_head = False
+        elif tag == 'title':
+            self._in_title = True
+        elif tag == 'meta':
+            self._handle_meta(attrs)
+        elif tag == 'time' and not self.metadata['publication_date'] and attrs.get('datetime'):
+            self._set_date(attrs['datetime'])
+
+        rank = self._container_rank(tag, attrs)
+        if tag in _BLOCK_TAGS or rank is not None:
+            self._flush()
+
+        for container in self._containers:
+            if container['tag'] == tag:
+                container['nesting'] += 1
+        # Matches nested in a container of the same selector are already part of it
+        if rank is not None and (self._best_rank is None or rank <= self._best_rank) and not any(
+            container['rank'] == rank for container in self._containers
+        ):
+            self._open_container(tag, rank)
+
+        if self._byline_tag:
+            if tag == self._byline_tag:
+                self._byline_nesting += 1
+        elif not self.metadata['author'] and tag in ('span', 'div', 'p', 'a') and _BYLINE_CLASS.search(attrs.get('class', '')):
+            self._byline_tag, self._byline_nesting, self._byline_parts = tag, 1, []
+
+    def handle_startendtag(self, tag: str, attr_list: List[Tuple[str, Optional[str]]]):
+        if self._drop_tag:
+            return
+        if tag == 'meta':
+            self._handle_meta({name: value or '' for name, value in attr_list})
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag: str):
+        if self._drop_tag:
+            if tag == self._drop_tag:
+                self._drop_nesting -= 1
+                if self._drop_nesting == 0:
+                    self._drop_tag = None
+            return
+
+        if tag == 'title':
+            self._in_title = False
+            title = ''.join(self._title_parts).strip()
+            if title and not self.metadata['title']:
+                self.metadata['title'] = title
+        elif tag == 'head':
+            self._in_head = False
+
+        if tag in _BLOCK_TAGS or any(container['tag'] == tag for container in self._containers):
+            self._flush()
+
+        if self._byline_tag and tag == self._byline_tag:
+            self._byline_nesting -= 1
+            if self._byline_nesting == 0:
+                text = ' '.join(''.join(self._byline_parts).split())
+                if text and len(text) < 100:
+                    self.metadata['author'] = text.replace('By', '').replace('by', '').strip()
+                self._byline_tag = None
+
+        for container in self._containers:
+            if container['tag'] == tag:
+                container['nesting'] -= 1
+        self._containers = [container for container in self._containers if container['nesting'] > 0]
+
+    def handle_data(self, data: str):
+        if self._drop_tag:
+            return
+        if self._in_title:
+            self._title_parts.append(data)
+            return
+        if self._in_head:
+            return
+        if self._byline_tag:
+            self._byline_parts.append(data)
+        self._buffer.append(data)
+
+    def get_result(self) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+        """Return (cleaned_html, stats, metadata) in the same shape as ContentScraper.clean_html"""
+        self._flush()
+        if self._best_rank is None:
+            paragraphs = self.body_paragraphs
+        else:
+            paragraphs = self._paragraphs_by_rank[self._best_rank]
+            if self._best_rank != 0 and self.on_paragraph:
+                for paragraph in paragraphs:
+                    self.on_paragraph(paragraph)
+        cleaned_html = "<html><body>" + ''.join(f"<p>{html.escape(p)}</p>" for p in paragraphs) + "</body></html>"
+        cleaned_size = len(cleaned_html)
+        stats = {
+            'original_size': self.original_size,
+            'cleaned_size': cleaned_size,
+            'reduction_percent': round(((self.original_size - cleaned_size) / self.original_size * 100), 2) if self.original_size else 0.0,
+            'title': self.metadata['title'] or "No title found",
+            'content_found': self._best_rank is not None
+        }
+        return cleaned_html, stats, self.metadata
+
+
+def _words(cleaned_html: str) -> List[str]:
+    return html.unescape(re.sub(r'<[^>]+>', ' ', cleaned_html)).split()
+
+
+def check_parity(html_content: str, url: str) -> Optional[Tuple[str, str]]:
+    """Compare the streamed text with ContentScraper.clean_html's; returns both texts when their words differ"""
+    from content_scraper import ContentScraper
+
+    cleaner = StreamingHtmlCleaner(url)
+    cleaner.feed(html_content)
+    cleaner.close()
+    streamed = _words(cleaner.get_result()[0])
+    reference = _words(ContentScraper().clean_html(html_content, url)[0])
+    if streamed == reference:
+        return None
+    return ' '.join(reference), ' '.join(streamed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the streaming cleaner against ContentScraper.clean_html")
+    parser.add_argument("input_dir", help="Directory of saved .html/.htm files")
+    args = parser.parse_args()
+
+    paths = [path for path in sorted(Path(args.input_dir).rglob('*')) if path.suffix.lower() in ('.html', '.htm')]
+    mismatches = 0
+    for path in paths:
+        mismatch = check_parity(path.read_text(encoding='utf-8', errors='replace'), path.resolve().as_uri())
+        if mismatch:
+            mismatches += 1
+            print(f"MISMATCH {path}\n  clean_html: {mismatch[0][:200]}\n  streaming:  {mismatch[1][:200]}")
+    print(f"{len(paths) - mismatches}/{len(paths)} pages match clean_html")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+_WHITESPACE = ' \t\r\n'
+
+
+class GranulatedContentParser:
+    """Class to parse the deep research JSON incrementally, emitting granulated_content items as they complete
+
+    Feed it response chunks as they stream in. Every object that closes inside
+    granulated_content.<category>[...] is decoded and returned from feed() immediately, and top-level
+    string fields (document_title, narrative_context) are captured once complete, so a truncated response
+    still yields everything that finished before the cut. Text before the opening brace (code fences,
+    prose) is skipped.
+    """
+
+    def __init__(self, items_key: str = "granulated_content"):
+        self.items_key = items_key
+        self.buffer = ''
+        self.position = 0
+        self.stack: List[Dict[str, Any]] = []
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        self.started = False
+        self.complete = False
+        self.fields: Dict[str, Any] = {}
+        self.items: Dict[str, List[Dict[str, Any]]] = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Consume a chunk and return the (category, item) pairs it completed"""
+        self.buffer += chunk
+        emitted = []
+        buffer = self.buffer
+        while self.position < len(buffer) and not self.complete:
+            char = buffer[self.position]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    self._string_closed(buffer[self.string_start:self.position + 1])
+            elif not self.started:
+                if char == '{':
+                    # Only a brace that opens a JSON object ({" or {}) starts the document
+                    lookahead = buffer[self.position + 1:].lstrip(_WHITESPACE)
+                    if not lookahead:
+                        break
+                    if lookahead[0] in '"}':
+                        self.started = True
+                        self._open('{')
+            elif char == '"':
+                self.in_string = True
+                self.string_start = self.position
+            elif char in '{[':
+                self._open(char)
+            elif char in '}]':
+                item = self._close()
+                if item is not None:
+                    emitted.append(item)
+            elif char == ':' and self.stack[-1]['type'] == '{':
+                self.stack[-1]['expect'] = 'value'
+            elif char == ',' and self.stack[-1]['type'] == '{':
+                self.stack[-1]['expect'] = 'key'
+            self.position += 1
+        return emitted
+
+    def _open(self, container: str):
+        parent = self.stack[-1] if self.stack else None
+        self.stack.append({
+            'type': container, 'start': self.position, 'key': None, 'expect': 'key',
+            'path': (parent['path'] + ((parent['key'],) if parent['type'] == '{' else ('[]',))) if parent else ()
+        })
+
+    def _close(self):
+        frame = self.stack.pop()
+        if not self.stack:
+            self.complete = True
+            return None
+        # An item is an object directly inside the list at items_key.<category>
+        if frame['type'] == '{' and len(frame['path']) == 3 and frame['path'][0] == self.items_key and frame['path'][2] == '[]':
+            try:
+                item = json.loads(self.buffer[frame['start']:self.position + 1])
+            except ValueError:
+                return None
+            category = frame['path'][1]
+            self.items.setdefault(category, []).append(item)
+            return category, item
+        return None
+
+    def _string_closed(self, literal: str):
+        frame = self.stack[-1] if self.stack else None
+        if frame is None or frame['type'] != '{':
+            return
+        try:
+            value = json.loads(literal)
+        except ValueError:
+            return
+        if frame['expect'] == 'key':
+            frame['key'] = value
+        elif len(self.stack) == 1:
+            self.fields[frame['key']] = value
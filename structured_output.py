@@ -0,0 +1,146 @@
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "metadata": {
+            "type": "object",
+            "properties": {
+                "domain": {"type": "string"},
+                "title": {"type": "string"},
+                "author": {"type": "string"},
+                "publication_date": {"type": "string"}
+            },
+            "required": ["domain", "title", "author", "publication_date"],
+            "additionalProperties": False
+        },
+        "claims": {"type": "array", "items": {"type": "string"}},
+        "context": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["metadata", "claims", "context"],
+    "additionalProperties": False
+}
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "metadata_assessment": {
+            "type": "object",
+            "properties": {
+                "domain_credibility": {"type": "string"},
+                "author_credibility": {"type": "string"},
+                "date_relevance": {"type": "string"}
+            },
+            "required": ["domain_credibility", "author_credibility", "date_relevance"],
+            "additionalProperties": False
+        },
+        "claims": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "claim_number": {"type": "integer"},
+                    "claim": {"type": "string"},
+                    "status": {"type": "string", "enum": ["Verified", "Disputed", "Unverifiable"]},
+                    "sources": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["claim_number", "claim", "status", "sources"],
+                "additionalProperties": False
+            }
+        },
+        "overall_rating": {
+            "type": "string",
+            "enum": ["Highly Credible", "Moderately Credible", "Low Credibility", "Not Credible"]
+        },
+        "rating_explanation": {"type": "string"},
+        "sources": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["metadata_assessment", "claims", "overall_rating", "rating_explanation", "sources"],
+    "additionalProperties": False
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool
+}
+
+
+def validate(data: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Validate data against the JSON Schema subset used here; returns a list of errors"""
+    expected = _TYPES[schema["type"]]
+    if not isinstance(data, expected) or (schema["type"] in ("integer", "number") and isinstance(data, bool)):
+        return [f"{path}: expected {schema['type']}"]
+
+    errors = []
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append(f"{path}: {data!r} not in {schema['enum']}")
+    if schema["type"] == "object":
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in data:
+                errors.append(f"{path}.{key}: missing")
+        for key, value in data.items():
+            if key in properties:
+                errors.extend(validate(value, properties[key], f"{path}.{key}"))
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{path}.{key}: unexpected property")
+    elif schema["type"] == "array":
+        for i, item in enumerate(data):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def parse_json_output(content: str, schema: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Decode and validate a JSON model response; returns (data, errors)"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError) as e:
+        return None, [f"invalid JSON: {e}"]
+    errors = validate(data, schema)
+    return (data if not errors else None), errors
+
+
+def render_extraction(data: Dict[str, Any]) -> str:
+    """Render structured extraction output in the sectioned text layout the rest of the pipeline reads"""
+    metadata = data["metadata"]
+    lines = [
+        "1. METADATA SECTION:",
+        f"   - Website Domain: {metadata['domain']}",
+        f"   - Article Title: {metadata['title']}",
+        f"   - Author: {metadata['author'] or 'None'}",
+        f"   - Publication Date: {metadata['publication_date'] or 'Not found'}",
+        "",
+        "2. KEY CLAIMS AND FACTS SECTION:"
+    ]
+    lines.extend(f"   {i}. {claim}" for i, claim in enumerate(data["claims"], 1))
+    if data["context"]:
+        lines.extend(["", "3. SUPPORTING CONTEXT:"])
+        lines.extend(f"   - {item}" for item in data["context"])
+    return '\n'.join(lines)
+
+
+def analysis_to_results(data: Dict[str, Any], raw_content: str) -> Dict[str, Any]:
+    """Map structured Perplexity output onto the analysis dict consumed by ConfidenceCalculator"""
+    sources = []
+    for source in data["sources"] + [s for claim in data["claims"] for s in claim["sources"]]:
+        if source not in sources:
+            sources.append(source)
+
+    return {
+        'full_analysis': raw_content,
+        'sources': sources,
+        'credibility_assessment': f"{data['overall_rating']}: {data['rating_explanation']}",
+        'metadata_assessment': data["metadata_assessment"],
+        'fact_verification': [
+            {
+                'claim': f"Claim {claim['claim_number']}: {claim['claim']}",
+                'status': 'Verified' if claim['status'] == 'Verified' else 'Disputed'
+            }
+            for claim in data["claims"]
+        ]
+    }
@@ -0,0 +1,69 @@
+import sqlite3
+from claim_store import ClaimStore
+from migrations import apply_migrations
+
+EXTRACTED = """DOCUMENT METADATA:
+Title: Jobs report
+
+KEY CLAIMS:
+1. Unemployment fell to 3.9% in March.
+   - Source: BLS
+   - Date: April 5
+2. Wages rose 4.1% year over year.
+   * Source: BLS
+3. Hiring slowed in manufacturing.
+
+ADDITIONAL CONTEXT:
+- Seasonally adjusted figures
+"""
+
+
+def make_store():
+    conn = sqlite3.connect(':memory:')
+    apply_migrations(conn)
+    return ClaimStore(conn)
+
+
+def test_sub_bullets_are_not_claims():
+    store = make_store()
+    assert store.extract_claims(EXTRACTED) == [
+        "Unemployment fell to 3.9% in March.",
+        "Wages rose 4.1% year over year.",
+        "Hiring slowed in manufacturing."
+    ]
+    assert store.numbered_claims(EXTRACTED)[2] == "Wages rose 4.1% year over year."
+
+
+def test_verdicts_land_on_the_numbered_claim():
+    store = make_store()
+    facts = [
+        {'claim': 'Claim 2: wages rose 4.1%', 'status': 'Disputed'},
+        {'claim': 'Claim 1: unemployment at 3.9%', 'status': 'Verified'}
+    ]
+    store.store_verdicts(store.numbered_claims(EXTRACTED), facts, [])
+    known = store.lookup_claims(store.extract_claims(EXTRACTED))
+    verdicts = {verdict['claim']: verdict['status'] for verdict in known.values()}
+    assert verdicts == {
+        "Unemployment fell to 3.9% in March.": 'Verified',
+        "Wages rose 4.1% year over year.": 'Disputed'
+    }
+
+
+def test_unnumbered_facts_need_one_per_claim():
+    claims = {1: 'a', 2: 'b', 3: 'c'}
+    fact = {'claim': 'The figure is correct', 'status': 'Verified'}
+    assert ClaimStore.claim_for_fact(claims, 1, fact, 2) is None
+    assert ClaimStore.claim_for_fact(claims, 1, fact, 3) == 'b'
+
+
+def test_known_claims_are_removed_with_their_sub_bullets():
+    store = make_store()
+    known = {store.fingerprint("Unemployment fell to 3.9% in March."): {}}
+    remaining = store.remove_known_claims(EXTRACTED, known)
+    assert "Date: April 5" not in remaining
+    assert store.numbered_claims(remaining) == {
+        1: "Wages rose 4.1% year over year.",
+        2: "Hiring slowed in manufacturing."
+    }
+    assert "   * Source: BLS" in remaining
+    assert "- Seasonally adjusted figures" in remaining
@@ -0,0 +1,55 @@
+from batch_worker import BatchWorker
+from job_queue import JobQueue
+
+URL = 'https://news.example.com/story'
+PARAGRAPHS = [
+    ' '.join(f'Officials described budget item {i} in the annual spending plan.' for i in range(20)),
+    'The council will vote on the plan next week.',
+    'Residents can comment on the plan until Friday.',
+]
+
+
+def page(paragraphs):
+    body = ''.join(f'<p>{p}</p>' for p in paragraphs)
+    return f'<html><head><title>Budget</title></head><body><article>{body}</article></body></html>'
+
+
+def make_worker(db_path, pages):
+    worker = BatchWorker('test', db_path)
+    worker.url_validator.validate_url = lambda url: (True, 'ok')
+    worker.content_scraper.fetch_html_content = lambda url: (
+        True, pages[url], {'content_type': 'text/html', 'content_length': len(pages[url])}
+    )
+    # Echo the paragraphs handed to extraction, so a partial run only sees the changed ones
+    worker.pipeline.content_analyzer.extract_text_with_openai = lambda html, metadata: (
+        True, 'KEY CLAIMS:\n1. ' + html, {'tokens_used': 10}
+    )
+    worker.pipeline.content_analyzer.analyze_with_perplexity = lambda text: (True, {
+        'full_analysis': 'checked', 'sources': ['https://a.example.org', 'https://b.example.org'],
+        'credibility_assessment': 'ok', 'metadata_assessment': {}, 'fact_verification': []
+    })
+    return worker
+
+
+def test_editing_one_paragraph_keeps_score_and_word_count(tmp_path):
+    db_path = str(tmp_path / 'news.db')
+    pages = {URL: page(PARAGRAPHS)}
+    worker = make_worker(db_path, pages)
+    queue = JobQueue(db_path)
+
+    queue.enqueue(URL)
+    assert worker.run() == 1
+    first = worker.storage.get_cached_result(URL)
+    first_word_count = worker.pipeline.feature_store.load(URL).word_count
+    assert first_word_count >= 100
+
+    pages[URL] = page(PARAGRAPHS[:2] + ['Residents can comment on the plan until Monday.'])
+    queue.enqueue(URL)
+    assert worker.run() == 1
+    second = worker.storage.get_cached_result(URL)
+
+    assert worker.pipeline.feature_store.load(URL).word_count == first_word_count
+    assert second['confidence_score'] == first['confidence_score']
+    # The cached extraction still covers the unchanged paragraphs, plus the re-extracted one
+    assert 'budget item 19' in second['extracted_text']
+    assert 'until Monday' in second['extracted_text']
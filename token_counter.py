@@ -0,0 +1,83 @@
+import re
+from typing import List
+from config import CONFIG
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# GPT-style pre-tokenization; the fallback estimate counts BPE tokens per piece from it. The estimate is
+# only used, with a logged warning, when tiktoken (in requirements.txt) or its vocabulary cannot be loaded
+_PIECE_PATTERN = re.compile(r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d+| ?[^\s\w]+|\s+")
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]?(?=\s|$)')
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """Load the configured tiktoken encoding once; None when tiktoken or its vocabulary file is unavailable"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is None:
+            print("tiktoken is not installed (see requirements.txt), estimating token counts")
+        else:
+            try:
+                _encoding = tiktoken.get_encoding(CONFIG["tokenizer_encoding"])
+            except Exception as e:
+                print(f"Tokenizer {CONFIG['tokenizer_encoding']} unavailable, estimating token counts: {e}")
+    return _encoding
+
+
+def _piece_tokens(piece: str) -> int:
+    word = piece.strip()
+    if not word:
+        return 1
+    if word.isdigit():
+        # Numbers are split into groups of up to three digits
+        return -(-len(word) // 3)
+    if word[0].isalpha():
+        return 1 if len(word) <= 8 else -(-len(word) // 5)
+    return len(word)
+
+
+def _pieces(text: str) -> List[str]:
+    return _PIECE_PATTERN.findall(text)
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens text encodes to; a close, slightly high estimate without the tokenizer vocabulary"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(_piece_tokens(piece) for piece in _pieces(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text that fits in max_tokens"""
+    if max_tokens <= 0:
+        return ''
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    used, end = 0, 0
+    for piece in _pieces(text):
+        used += _piece_tokens(piece)
+        if used > max_tokens:
+            break
+        end += len(piece)
+    return text[:end]
+
+
+def truncate_at_sentence(text: str, max_tokens: int) -> str:
+    """Prefix of text that fits in max_tokens and ends on a sentence boundary; empty if no full sentence fits"""
+    prefix = truncate_to_tokens(text, max_tokens)
+    if len(prefix) == len(text):
+        return text
+    ends = [match.end() for match in _SENTENCE_END.finditer(prefix)]
+    return prefix[:ends[-1]] if ends else ''
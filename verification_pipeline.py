@@ -0,0 +1,277 @@
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from content_analyzer import ContentAnalyzer
+from source_credibility_evaluator import SourceCredibilityEvaluator
+from confidence_calculator import ConfidenceCalculator
+from database_manager import DatabaseManager
+from storage_backend import StorageBackend, AUTO_ADDED_DOMAIN_NOTES
+from near_duplicate_detector import NearDuplicateDetector
+from claim_store import ClaimStore
+from incremental_verifier import IncrementalVerifier
+from scoring_features import FeatureStore, extract_scoring_features
+from domain_reputation import DomainReputation
+
+
+class VerificationError(Exception):
+    """Raised when the extraction or analysis step fails; stage names the step that failed"""
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+
+class VerificationPipeline:
+    """Class holding the verification steps shared by the Streamlit app and the batch worker
+
+    Fetching and cleaning stay with the callers, which differ in how they report progress and where the
+    raw HTML comes from. From the cleaned page on, both call these methods in order: plan_reuse,
+    run_analysis, score_and_record and store. Plans and stage artifacts are plain dicts, so the batch
+    worker can checkpoint them.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, storage: StorageBackend, content_analyzer: ContentAnalyzer):
+        self.db_manager = db_manager
+        self.storage = storage
+        self.content_analyzer = content_analyzer
+        self.near_duplicate_detector = NearDuplicateDetector(db_manager.conn)
+        self.claim_store = ClaimStore(db_manager.conn)
+        self.incremental_verifier = IncrementalVerifier()
+        self.feature_store = FeatureStore(db_manager.conn)
+        self.domain_reputation = DomainReputation(db_manager.conn)
+        self.source_credibility_evaluator = SourceCredibilityEvaluator()
+        self.confidence_calculator = ConfidenceCalculator()
+
+    def check_domain_trust(self, domain: str) -> Tuple[Optional[float], str]:
+        """Return (trust_score, reason) when the domain's score can answer without verifying, else (None, reason)
+
+        A curated score from an imported credibility list answers first; otherwise the domain reputation
+        aggregate answers once it is stable enough.
+        """
+        curated_score = self.db_manager.get_curated_trust_score(domain)
+        if curated_score is not None:
+            return curated_score, "curated credibility list"
+        reputation = self.domain_reputation.get(domain) if self.db_manager.might_have_reputation(domain) else None
+        can_skip, reason = self.domain_reputation.can_skip_verification(reputation)
+        return (reputation['ewma_score'] if can_skip else None), reason
+
+    def plan_reuse(self, url: str, cleaned_html: str, paragraphs: List[str]) -> Dict[str, Any]:
+        """Decide what earlier work a verification can reuse
+
+        A re-fetched URL is diffed paragraph by paragraph against its cached verification; any other page
+        is looked up in the near-duplicate index.
+        """
+        previous_result = self.storage.get_cached_result(url)
+        if previous_result and previous_result.get('paragraph_hashes'):
+            previous_extracted_text = previous_result.get('extracted_text') or ''
+            previous_features = self.feature_store.load(url)
+            return {
+                'incremental': True,
+                'changed_indices': self.incremental_verifier.find_changed_paragraphs(previous_result['paragraph_hashes'], paragraphs),
+                'kept_facts': self.incremental_verifier.keep_unchanged_facts(previous_result.get('fact_verification_results') or [], paragraphs),
+                'kept_sources': previous_result.get('sources_used') or [],
+                'previous_full_analysis': previous_result.get('full_perplexity_analysis') or '',
+                'previous_extracted_text': previous_extracted_text,
+                'previous_word_count': previous_features.word_count if previous_features else len(previous_extracted_text.split()),
+                'previous_paragraph_count': len(previous_result['paragraph_hashes'])
+            }
+        plan = {'incremental': False, 'changed_indices': list(range(len(paragraphs))), 'kept_facts': [], 'kept_sources': []}
+        match = self.near_duplicate_detector.find_duplicate(cleaned_html, exclude_url=url)
+        if match:
+            plan.update({'near_duplicate_of': match[0], 'near_duplicate_similarity': match[1]})
+        return plan
+
+    def extract(self, cleaned_html: str, metadata: Dict[str, Any], paragraphs: List[str], plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract text with OpenAI, limited to the new or changed paragraphs on re-verification"""
+        extraction_html = (
+            self.incremental_verifier.build_partial_html(paragraphs, plan['changed_indices'])
+            if plan['incremental'] else cleaned_html
+        )
+        success, extracted_text, extract_metadata = self.content_analyzer.extract_text_with_openai(extraction_html, metadata)
+        if not success:
+            raise VerificationError('extraction', extracted_text)
+        return {'text': extracted_text, 'extract_metadata': extract_metadata}
+
+    def analyze(self, url: str, extracted_text: str) -> Dict[str, Any]:
+        """Reuse stored claim verdicts and send only unseen claims to Perplexity"""
+        claims = self.claim_store.extract_claims(extracted_text)
+        known_claims = self.claim_store.lookup_claims(claims)
+        unseen_claims = [claim for claim in claims if self.claim_store.fingerprint(claim) not in known_claims]
+        sent_claims = {}
+        if claims and not unseen_claims:
+            analysis_results = {
+                'full_analysis': '',
+                'sources': [],
+                'credibility_assessment': f"All {len(claims)} key claims matched previously verified claims",
+                'metadata_assessment': {},
+                'fact_verification': []
+            }
+            perplexity_calls_made = 0
+        else:
+            analysis_text = self.claim_store.remove_known_claims(extracted_text, known_claims)
+            sent_claims = self.claim_store.numbered_claims(analysis_text)
+            success, analysis_results = self.content_analyzer.analyze_with_perplexity(analysis_text)
+            if not success:
+                raise VerificationError('analysis', analysis_results.get('error', 'Analysis failed'))
+            self.claim_store.store_verdicts(
+                sent_claims, analysis_results.get('fact_verification', []), analysis_results.get('sources', []), url
+            )
+            perplexity_calls_made = 1
+        return {
+            'analysis': analysis_results,
+            'known_facts': [{'claim': verdict['claim'], 'status': verdict['status']} for verdict in known_claims.values()],
+            'known_sources': [source for verdict in known_claims.values() for source in verdict['sources']],
+            # Pairs rather than a dict: checkpoints are JSON, which would turn the claim numbers into strings
+            'sent_claims': list(sent_claims.items()),
+            'perplexity_calls_made': perplexity_calls_made
+        }
+
+    def run_analysis(
+        self,
+        url: str,
+        cleaned_html: str,
+        metadata: Dict[str, Any],
+        paragraphs: List[str],
+        plan: Dict[str, Any],
+        run_stage: Optional[Callable[[str, Callable[[], Dict[str, Any]]], Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Reuse or produce the extraction and analysis of a page, merged with what the plan keeps
+
+        run_stage(stage, run) wraps the "extracted_text" and "perplexity_analysis" steps, e.g. to
+        checkpoint them or report progress; by default it just calls run().
+        """
+        run_stage = run_stage or (lambda stage, run: run())
+        changed_indices = plan['changed_indices']
+        reused_url = url if plan['incremental'] and not changed_indices else plan.get('near_duplicate_of')
+        reused_result = self.storage.get_cached_result(reused_url) if reused_url else None
+        if reused_result:
+            # Reuse the earlier extraction and analysis; only source credibility and the score are recomputed
+            analyzed = {
+                'reused': True,
+                'extracted_text': reused_result.get('extracted_text') or '',
+                'extract_metadata': {'tokens_used': 0, 'extraction_model': reused_result.get('extraction_model', 'gpt-4o-mini')},
+                'analysis': {
+                    'full_analysis': reused_result.get('full_perplexity_analysis') or '',
+                    'sources': reused_result.get('sources_used') or [],
+                    'credibility_assessment': reused_result.get('credibility_assessment') or 'N/A',
+                    'metadata_assessment': reused_result.get('metadata_assessment') or {},
+                    'fact_verification': plan['kept_facts'] if plan['incremental'] else reused_result.get('fact_verification_results') or []
+                },
+                'perplexity_calls_made': 0
+            }
+            if plan['incremental']:
+                analyzed['word_count'] = plan.get('previous_word_count', len(analyzed['extracted_text'].split()))
+            else:
+                analyzed.update({
+                    'near_duplicate_of': plan['near_duplicate_of'],
+                    'near_duplicate_similarity': plan['near_duplicate_similarity']
+                })
+            return analyzed
+
+        extracted = run_stage("extracted_text", lambda: self.extract(cleaned_html, metadata, paragraphs, plan))
+        claims_analysis = run_stage("perplexity_analysis", lambda: self.analyze(url, extracted['text']))
+        analysis_results = dict(claims_analysis['analysis'])
+
+        # Merge new claims with stored verdicts and with prior results from unchanged paragraphs
+        analysis_results['fact_verification'] = (
+            plan['kept_facts']
+            + self.incremental_verifier.attribute_facts(claims_analysis['known_facts'], paragraphs, changed_indices)
+            + self.incremental_verifier.attribute_facts(
+                analysis_results.get('fact_verification', []), paragraphs, changed_indices,
+                dict(claims_analysis.get('sent_claims', []))
+            )
+        )
+        analysis_results['sources'] = list(dict.fromkeys(
+            analysis_results.get('sources', []) + claims_analysis['known_sources'] + plan['kept_sources']
+        ))
+        analyzed = {
+            'reused': False,
+            'extracted_text': extracted['text'],
+            'extract_metadata': extracted['extract_metadata'],
+            'analysis': analysis_results,
+            'perplexity_calls_made': claims_analysis['perplexity_calls_made']
+        }
+        if plan['incremental']:
+            # The new analysis only covers the changed paragraphs; keep the prior analysis of the unchanged ones
+            analysis_results['full_analysis'] = '\n\nUPDATED CONTENT ANALYSIS:\n'.join(filter(None, [
+                plan['previous_full_analysis'], analysis_results.get('full_analysis', '')
+            ]))
+            analyzed.update(self.merge_partial_extraction(plan, extracted['text'], len(paragraphs)))
+        return analyzed
+
+    @staticmethod
+    def merge_partial_extraction(plan: Dict[str, Any], fragment: str, paragraph_count: int) -> Dict[str, Any]:
+        """Combine a changed-paragraphs extraction with the prior one, so scoring and the cache see the whole article
+
+        The prior extracted text is kept while some paragraphs are unchanged, with the new extraction
+        appended like the analysis. word_count keeps the prior article's count, scaled down when paragraphs
+        were removed: the fragment alone would undercount and halve the score below 100 words, and the
+        appended text would count edited paragraphs twice.
+        """
+        if len(plan['changed_indices']) >= paragraph_count or 'previous_extracted_text' not in plan:
+            # Nothing unchanged (or a plan from before these fields): the fragment is the whole extraction
+            return {'extracted_text': fragment}
+        scale = min(1.0, paragraph_count / max(plan['previous_paragraph_count'], 1))
+        return {
+            'extracted_text': '\n\nUPDATED CONTENT:\n'.join(filter(None, [plan['previous_extracted_text'], fragment])),
+            'word_count': max(round(plan['previous_word_count'] * scale), len(fragment.split()))
+        }
+
+    def result_fields(self, analyzed: Dict[str, Any], paragraphs: List[str]) -> Dict[str, Any]:
+        """The VerificationResult fields that come from run_analysis"""
+        analysis_results = analyzed['analysis']
+        fields = {
+            'extracted_text': analyzed['extracted_text'],
+            'credibility_assessment': analysis_results.get('credibility_assessment', 'N/A'),
+            'sources': analysis_results.get('sources', []),
+            'full_analysis': analysis_results.get('full_analysis', ''),
+            'metadata_assessment': analysis_results.get('metadata_assessment', {}),
+            'fact_verification': analysis_results.get('fact_verification', []),
+            'openai_tokens_used': analyzed['extract_metadata'].get('tokens_used', 0),
+            'extraction_model': analyzed['extract_metadata'].get('extraction_model', 'gpt-4o-mini'),
+            'perplexity_calls_made': analyzed['perplexity_calls_made'],
+            'paragraph_hashes': self.incremental_verifier.hash_paragraphs(paragraphs)
+        }
+        if 'near_duplicate_of' in analyzed:
+            fields.update({
+                'near_duplicate_of': analyzed['near_duplicate_of'],
+                'near_duplicate_similarity': analyzed['near_duplicate_similarity']
+            })
+        return fields
+
+    def score_and_record(self, url: str, analyzed: Dict[str, Any], extracted_metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Score the verification, save its features and fold the score into the domain aggregate
+
+        The smoothed aggregate score is what goes into domain_credibility. Returns the confidence_score,
+        confidence_level and score_components fields of the result.
+        """
+        analysis_results = analyzed['analysis']
+        source_credibility_score = self.source_credibility_evaluator.evaluate_source_credibility(extracted_metadata)
+        scoring_features = extract_scoring_features(
+            analysis_results, analyzed['extracted_text'], extracted_metadata, source_credibility_score
+        )
+        if 'word_count' in analyzed:
+            # Partial re-verification: the article's word count, see merge_partial_extraction
+            scoring_features.word_count = analyzed['word_count']
+        confidence_score, confidence_explanation, score_components = self.confidence_calculator.score_features(scoring_features)
+        self.feature_store.save(url, scoring_features)
+
+        domain = extracted_metadata.get('domain', '')
+        reputation = self.domain_reputation.record(domain, confidence_score, analysis_results.get('fact_verification', []))
+        self.db_manager.note_reputation_domain(domain)
+        # A curated list score is left as it is; only automatically added domains track the aggregate
+        if self.db_manager.get_curated_trust_score(domain) is None:
+            notes = f"{AUTO_ADDED_DOMAIN_NOTES}: {analysis_results.get('credibility_assessment', 'No assessment')}"
+            self.storage.insert_domain(
+                domain, reputation['ewma_score'] if reputation else confidence_score, extracted_metadata.get('category', 'general'),
+                extracted_metadata.get('bias_level', 'unknown'), extracted_metadata.get('reliability', 'unknown'),
+                self.source_credibility_evaluator.classify_source_type(domain), notes
+            )
+        return {
+            'confidence_score': confidence_score,
+            'confidence_level': confidence_explanation,
+            'score_components': score_components
+        }
+
+    def store(self, result: Dict[str, Any], processing_time: float, cleaned_html: str):
+        """Cache the result and index the article so near-duplicates of it can reuse the verdicts"""
+        self.storage.insert_cached_result(result, processing_time)
+        self.near_duplicate_detector.add_document(result['url'], cleaned_html)
@@ -0,0 +1,68 @@
+from dataclasses import dataclass, field, fields, asdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+
+def _empty_components() -> Dict[str, float]:
+    return {'source_credibility': 0.0, 'content_consistency': 0.0, 'verification_coverage': 0.0}
+
+
+@dataclass(slots=True)
+class VerificationResult:
+    """Typed verification result; also supports the dict-style access the display and storage code use"""
+    url: str
+    timestamp: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    confidence_score: float = 0.0
+    confidence_level: str = "🔴 Confidence Level: NONE (0%)"
+    score_components: Dict[str, float] = field(default_factory=_empty_components)
+    extracted_text: str = ''
+    credibility_assessment: str = ''
+    sources: List[str] = field(default_factory=list)
+    full_analysis: str = ''
+    metadata_assessment: Dict[str, str] = field(default_factory=dict)
+    fact_verification: List[Dict[str, Any]] = field(default_factory=list)
+    source_type: Optional[str] = None
+    domain: Optional[str] = None
+    title: Optional[str] = None
+    author: Optional[str] = None
+    publication_date: Optional[str] = None
+    content_type: Optional[str] = None
+    content_length: int = 0
+    openai_tokens_used: int = 0
+    extraction_model: str = 'gpt-4o-mini'
+    perplexity_calls_made: int = 0
+    paragraph_hashes: List[str] = field(default_factory=list)
+    raw_content_hash: Optional[str] = None
+    near_duplicate_of: Optional[str] = None
+    near_duplicate_similarity: Optional[float] = None
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def update(self, values: Dict[str, Any]):
+        for key, value in values.items():
+            self[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'VerificationResult':
+        """Build from a stored or legacy dict, ignoring keys this version does not know"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})